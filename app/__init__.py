@@ -2,22 +2,34 @@ import os
 
 from flask import Flask, jsonify
 from flask_smorest import Api
-from flask_jwt_extended import JWTManager
 from flask_migrate import Migrate
 
 from .config import config_mapping
+from .pooling import engine_options
 from .blocklist import BLOCKLIST
 from .db import db
-from . import models
+from . import auth_cache
+from . import catalog
+from . import hashing
+from . import instrumentation
+from . import jobs
+from . import response_cache
+from . import routing
+from . import sqlite_tuning
 
 from .resources.store import blp as StoreBlueprint
 from .resources.item import blp as ItemBlueprint
 from .resources.tag import blp as TagBlueprint
 from .resources.user import blp as UserBlueprint
+from .resources.admin import blp as AdminBlueprint
+from .resources.job import blp as JobBlueprint
+from .resources.catalog import blp as CatalogBlueprint
 
 #FIXME: missing load_dotenv(), which affects .env use in tests or local dev
 # might be reason for some failing tests
-def create_app(config_name: str = None, db_url: str = None):
+def create_app(
+    config_name: str = None, db_url: str = None, replica_url: str = None, sqlite_pragmas: dict = None
+):
 
     app = Flask(__name__, instance_relative_config=True)
 
@@ -36,16 +48,40 @@ def create_app(config_name: str = None, db_url: str = None):
     if db_url:
         app.config["SQLALCHEMY_DATABASE_URI"] = db_url
 
+    # optional read replica, used by GET requests (see app/routing.py)
+    replica_url = replica_url or os.getenv("DATABASE_REPLICA_URL")
+    if replica_url:
+        app.config["SQLALCHEMY_REPLICA_URI"] = replica_url
+
+    # for SQLITE_PRAGMAS overrides, applied when the engines are created below
+    if sqlite_pragmas is not None:
+        app.config["SQLITE_PRAGMAS"] = sqlite_pragmas
+
+    # an explicit SQLALCHEMY_ENGINE_OPTIONS (instance config) wins over the profile
+    if "SQLALCHEMY_ENGINE_OPTIONS" not in app.config:
+        app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options(
+            app.config["SQLALCHEMY_POOL_PROFILE"], app.config["SQLALCHEMY_DATABASE_URI"]
+        )
+
     db.init_app(app)
+    routing.init_app(app)
+    sqlite_tuning.init_app(app)
+    instrumentation.init_app(app)
+    BLOCKLIST.init_app(app)
+    hashing.init_app(app)
+    auth_cache.init_app(app)
+    jobs.init_app(app)
+    catalog.init_app(app)
+    response_cache.init_app(app)
 
     api = Api(app)
 
-    jwt = JWTManager(app)
+    jwt = auth_cache.CachingJWTManager(app)
 
     @jwt.additional_claims_loader
     def is_admin_claim(identity):
-        user = models.UserModel.query.get_or_404(identity)
-        return {"is_admin": user.is_admin}
+        # cached and dropped on user update/delete, so /refresh never copies a stale flag
+        return {"is_admin": auth_cache.is_admin(identity)}
 
     @jwt.token_in_blocklist_loader
     def check_if_token_terminated(jwt_header, jwt_payload):
@@ -88,6 +124,9 @@ def create_app(config_name: str = None, db_url: str = None):
     api.register_blueprint(ItemBlueprint)
     api.register_blueprint(TagBlueprint)
     api.register_blueprint(UserBlueprint)
+    api.register_blueprint(AdminBlueprint)
+    api.register_blueprint(JobBlueprint)
+    api.register_blueprint(CatalogBlueprint)
 
     @app.route("/")
     def home():
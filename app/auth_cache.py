@@ -0,0 +1,106 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app, has_app_context
+from flask_jwt_extended import JWTManager
+from sqlalchemy import event
+
+from .models import UserModel
+
+
+class TTLCache:
+    """Thread-safe LRU with a per-entry expiry time."""
+
+    def __init__(self, maxsize=1024, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            value, expires_at = entry
+            if expires_at <= time.time():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, expires_at=None):
+        if self.maxsize <= 0:
+            return
+        expires_at = min(time.time() + self.ttl, expires_at or float("inf"))
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class CachingJWTManager(JWTManager):
+    """
+    JWTManager that keeps verified payloads by token hash, so a client
+    sending the same token again skips the signature check. Entries never
+    outlive the token's exp. The blocklist is still checked on every
+    request by flask-jwt-extended, after decoding.
+    """
+
+    def init_app(self, app, add_context_processor=False):
+        super().init_app(app, add_context_processor)
+        app.extensions["jwt_decode_cache"] = TTLCache(
+            maxsize=app.config.get("JWT_DECODE_CACHE_SIZE", 4096),
+            ttl=app.config.get("JWT_DECODE_CACHE_TTL", 300),
+        )
+
+    def _decode_jwt_from_config(self, encoded_token, csrf_value=None, allow_expired=False):
+        if csrf_value is not None or allow_expired:
+            return super()._decode_jwt_from_config(encoded_token, csrf_value, allow_expired)
+
+        cache = current_app.extensions["jwt_decode_cache"]
+        key = hashlib.sha256(encoded_token.encode()).digest()
+        payload = cache.get(key)
+        if payload is None:
+            payload = super()._decode_jwt_from_config(encoded_token)
+            cache.set(key, payload, expires_at=payload.get("exp"))
+        return dict(payload)
+
+
+def init_app(app):
+    app.extensions["admin_flag_cache"] = TTLCache(
+        maxsize=app.config.get("ADMIN_FLAG_CACHE_SIZE", 1024),
+        ttl=app.config.get("ADMIN_FLAG_CACHE_TTL", 60),
+    )
+
+
+def is_admin(identity):
+    """Admin flag of user `identity`, 404 if there is no such user."""
+    cache = current_app.extensions["admin_flag_cache"]
+    flag = cache.get(str(identity))
+    if flag is None:
+        flag = bool(UserModel.query.get_or_404(identity).is_admin)
+        cache.set(str(identity), flag)
+    return flag
+
+
+@event.listens_for(UserModel, "after_update")
+@event.listens_for(UserModel, "after_delete")
+def invalidate_admin_flag(mapper, connection, user):
+    # only this worker's cache, the ttl bounds how long other workers lag
+    if has_app_context() and "admin_flag_cache" in current_app.extensions:
+        current_app.extensions["admin_flag_cache"].pop(str(user.user_id))
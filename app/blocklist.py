@@ -1 +1,150 @@
-BLOCKLIST = set()
\ No newline at end of file
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app
+
+
+class MemoryBlocklist:
+    """
+    Revoked jtis of this process only, for development and tests.
+    Entries are dropped once their token has expired.
+    """
+
+    def __init__(self, purge_interval=60):
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._purge_interval = purge_interval
+        self._next_purge = 0
+
+    def add(self, jti, exp):
+        with self._lock:
+            self._entries[jti] = exp
+            self._purge(time.time())
+
+    def __contains__(self, jti):
+        exp = self._entries.get(jti)
+        return exp is not None and exp > time.time()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _purge(self, now):
+        if now < self._next_purge:
+            return
+        self._entries = {jti: exp for jti, exp in self._entries.items() if exp > now}
+        self._next_purge = now + self._purge_interval
+
+
+class SQLiteBlocklist:
+    """
+    Revoked jtis in a SQLite file shared by every worker on the host.
+
+    Revocations are final until the token expires, so hits are kept in a
+    small per-worker LRU and repeated checks of a revoked token never touch
+    the file. Misses always go to the file, so a logout in one worker is
+    seen by the others on their next request. Expired rows are deleted
+    every `purge_interval` seconds, which keeps the table (and the cache,
+    bounded by `cache_size`) as small as the set of live revoked tokens.
+    """
+
+    def __init__(self, path, cache_size=1024, purge_interval=60):
+        self.path = path
+        self._cache = OrderedDict()
+        self._cache_size = cache_size
+        self._purge_interval = purge_interval
+        self._next_purge = 0
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+
+    def _connection(self):
+        # connections must not cross a fork (gunicorn --preload)
+        if self._conn is None or self._pid != os.getpid():
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS blocklist (jti TEXT PRIMARY KEY, exp INTEGER NOT NULL) WITHOUT ROWID"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_blocklist_exp ON blocklist (exp)")
+            self._conn, self._pid = conn, os.getpid()
+            self._cache.clear()
+        return self._conn
+
+    def _remember(self, jti, exp):
+        self._cache[jti] = exp
+        self._cache.move_to_end(jti)
+        while len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+
+    def add(self, jti, exp):
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute("INSERT OR REPLACE INTO blocklist (jti, exp) VALUES (?, ?)", (jti, int(exp)))
+            self._remember(jti, exp)
+            if now >= self._next_purge:
+                conn.execute("DELETE FROM blocklist WHERE exp <= ?", (int(now),))
+                self._next_purge = now + self._purge_interval
+
+    def __contains__(self, jti):
+        now = time.time()
+        with self._lock:
+            exp = self._cache.get(jti)
+            if exp is not None:
+                if exp > now:
+                    self._cache.move_to_end(jti)
+                    return True
+                del self._cache[jti]
+                return False
+            row = self._connection().execute(
+                "SELECT exp FROM blocklist WHERE jti = ? AND exp > ?", (jti, int(now))
+            ).fetchone()
+            if row is None:
+                return False
+            self._remember(jti, row[0])
+            return True
+
+    def __len__(self):
+        with self._lock:
+            return self._connection().execute("SELECT COUNT(*) FROM blocklist").fetchone()[0]
+
+
+class Blocklist:
+    """
+    Revoked JWTs, backed by BLOCKLIST_BACKEND ("memory" or "sqlite").
+    Wired up in create_app like db, each app gets its own backend.
+    """
+
+    def init_app(self, app):
+        backend = app.config.get("BLOCKLIST_BACKEND", "memory")
+        purge_interval = app.config.get("BLOCKLIST_PURGE_INTERVAL", 60)
+        if backend == "memory":
+            store = MemoryBlocklist(purge_interval=purge_interval)
+        elif backend == "sqlite":
+            path = app.config.get("BLOCKLIST_SQLITE_PATH") or os.path.join(app.instance_path, "blocklist.db")
+            store = SQLiteBlocklist(
+                path,
+                cache_size=app.config.get("BLOCKLIST_CACHE_SIZE", 1024),
+                purge_interval=purge_interval,
+            )
+        else:
+            raise ValueError(f"Unknown blocklist backend: {backend}.")
+        app.extensions["blocklist"] = store
+
+    @property
+    def store(self):
+        return current_app.extensions["blocklist"]
+
+    def add(self, jti, exp):
+        self.store.add(jti, exp)
+
+    def __contains__(self, jti):
+        return jti in self.store
+
+
+BLOCKLIST = Blocklist()
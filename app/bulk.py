@@ -0,0 +1,206 @@
+import json
+from collections import Counter
+
+from flask import request
+from flask_smorest import abort
+from sqlalchemy.dialects import postgresql, sqlite
+
+from .db import db
+from .models import ItemModel, StoreModel
+
+CREATED = "created"
+UPDATED = "updated"
+CONFLICT = "conflict"
+INVALID_STORE = "invalid_store"
+ROLLED_BACK = "rolled_back"
+
+
+def chunked(rows, size):
+    for start in range(0, len(rows), size):
+        yield start, rows[start:start + size]
+
+
+def request_rows(max_rows):
+    """
+    Rows of a JSON array or NDJSON (application/x-ndjson) request body,
+    413 past `max_rows`, 400 if the body cannot be parsed.
+    """
+    if request.mimetype == "application/x-ndjson":
+        rows = []
+        for number, line in enumerate(request.stream, start=1):
+            if not line.strip():
+                continue
+            if len(rows) == max_rows:
+                abort(413, message=f"At most {max_rows} rows per request.")
+            try:
+                rows.append(json.loads(line))
+            except ValueError:
+                abort(400, message=f"Line {number} is not valid JSON.")
+        return rows
+
+    rows = request.get_json(silent=True)
+    if not isinstance(rows, list):
+        abort(400, message="Expected a JSON array or an application/x-ndjson body.")
+    if len(rows) > max_rows:
+        abort(413, message=f"At most {max_rows} rows per request.")
+    return rows
+
+
+def _insert_statement(model, dialect):
+    # rows inserted by a concurrent request in between are skipped, not an error
+    if dialect == "sqlite":
+        return sqlite.insert(model).on_conflict_do_nothing()
+    if dialect == "postgresql":
+        return postgresql.insert(model).on_conflict_do_nothing()
+    return db.insert(model)
+
+
+def insert_items(rows, chunk_size):
+    """
+    Inserts item rows (dicts loaded by ItemSchema) with one executemany
+    per chunk of `chunk_size`, in the session's transaction, and returns one
+    {"index", "status", "item_id"} result per row. Rows whose store does
+    not exist or whose (item_name, store_id) is taken, earlier in `rows`
+    included, are skipped.
+    """
+    results = [{"index": index, "status": CREATED, "item_id": None} for index in range(len(rows))]
+    dialect = db.session.get_bind().dialect.name
+    seen = set()
+
+    for start, chunk in chunked(rows, chunk_size):
+        store_ids = {row["store_id"] for row in chunk}
+        stores = set(db.session.scalars(
+            db.select(StoreModel.store_id).where(StoreModel.store_id.in_(store_ids))
+        ))
+        keys = {(row["item_name"], row["store_id"]) for row in chunk}
+        # two IN lists use uq_item_store, a row-value IN makes SQLite scan the table
+        existing = keys & set(db.session.execute(
+            db.select(ItemModel.item_name, ItemModel.store_id).where(
+                ItemModel.item_name.in_({name for name, _ in keys}),
+                ItemModel.store_id.in_(store_ids),
+            )
+        ).tuples())
+
+        pending = {}
+        for index, row in enumerate(chunk, start=start):
+            key = (row["item_name"], row["store_id"])
+            if row["store_id"] not in stores:
+                results[index]["status"] = INVALID_STORE
+            elif key in existing or key in seen:
+                results[index]["status"] = CONFLICT
+            else:
+                seen.add(key)
+                pending[key] = index
+        if not pending:
+            continue
+
+        statement = _insert_statement(ItemModel, dialect).returning(
+            ItemModel.item_id, ItemModel.item_name, ItemModel.store_id
+        )
+        inserted = db.session.execute(statement, [rows[index] for index in pending.values()])
+        for item_id, item_name, store_id in inserted:
+            results[pending.pop((item_name, store_id))]["item_id"] = item_id
+        for index in pending.values():
+            results[index]["status"] = CONFLICT
+
+    return results
+
+
+def upsert_statement(model, update_columns):
+    """
+    INSERT ... ON CONFLICT (primary key) DO UPDATE of `update_columns`, for
+    one row or an executemany. Add .returning() to get the rows back.
+    """
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "sqlite":
+        statement = sqlite.insert(model)
+    elif dialect == "postgresql":
+        statement = postgresql.insert(model)
+    else:
+        raise ValueError(f"Upserts are not supported on {dialect}.")
+    key = model.__mapper__.primary_key[0].name
+    return statement.on_conflict_do_update(
+        index_elements=[key],
+        set_={column: statement.excluded[column] for column in update_columns},
+    )
+
+
+def upsert_rows(model, rows, unique, chunk_size, check_store=False):
+    """
+    Upserts full rows of `model` by primary key with one executemany per
+    chunk, in the session's transaction, and returns one {"index", "status",
+    <primary key>} result per row: created, updated, conflict (the `unique`
+    columns belong to another row, or an earlier row of `rows` took them)
+    or, with `check_store`, invalid_store.
+    """
+    key = model.__mapper__.primary_key[0].name
+    columns = [column for column in rows[0] if column != key] if rows else []
+    results = [{"index": index, "status": None, key: row[key]} for index, row in enumerate(rows)]
+    claimed_keys, claimed_unique = set(), set()
+
+    for start, chunk in chunked(rows, chunk_size):
+        ids = {row[key] for row in chunk}
+        existing = set(db.session.scalars(db.select(getattr(model, key)).where(getattr(model, key).in_(ids))))
+        stores = None
+        if check_store:
+            stores = set(db.session.scalars(
+                db.select(StoreModel.store_id).where(StoreModel.store_id.in_({row["store_id"] for row in chunk}))
+            ))
+        # every IN list is served by the unique index on `unique`
+        owners = {
+            tuple(found[:-1]): found[-1]
+            for found in db.session.execute(
+                db.select(*(getattr(model, column) for column in unique), getattr(model, key)).where(
+                    *(getattr(model, column).in_({row[column] for row in chunk}) for column in unique)
+                )
+            )
+        }
+
+        pending = []
+        for index, row in enumerate(chunk, start=start):
+            values = tuple(row[column] for column in unique)
+            owner = owners.get(values, row[key])
+            if stores is not None and row["store_id"] not in stores:
+                results[index]["status"] = INVALID_STORE
+            elif owner != row[key] or values in claimed_unique or row[key] in claimed_keys:
+                results[index]["status"] = CONFLICT
+            else:
+                claimed_keys.add(row[key])
+                claimed_unique.add(values)
+                results[index]["status"] = UPDATED if row[key] in existing else CREATED
+                pending.append(row)
+        if pending:
+            db.session.execute(upsert_statement(model, columns), pending)
+
+    return results
+
+
+def commit_bulk(results, atomic=False, generated_key=None):
+    """
+    Commits the rows of a bulk request and returns (summary, status code).
+    With `atomic`, a rejected row rolls everything back instead, accepted
+    rows are reported as rolled_back (losing their `generated_key` id) and
+    the status is 409.
+    """
+    accepted = (CREATED, UPDATED)
+    if atomic and any(result["status"] not in accepted for result in results):
+        db.session.rollback()
+        for result in results:
+            if result["status"] in accepted:
+                result["status"] = ROLLED_BACK
+                if generated_key:
+                    result[generated_key] = None
+        return bulk_summary(results), 409
+    db.session.commit()
+    return bulk_summary(results), 200
+
+
+def bulk_summary(results):
+    counts = Counter(result["status"] for result in results)
+    return {
+        "created": counts[CREATED],
+        "updated": counts[UPDATED],
+        "conflict": counts[CONFLICT],
+        "invalid_store": counts[INVALID_STORE],
+        "results": results,
+    }
@@ -0,0 +1,368 @@
+import csv
+import io
+import json
+import os
+import time
+import zlib
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from marshmallow import Schema, ValidationError, fields
+from sqlalchemy.dialects import postgresql, sqlite
+
+from .db import db
+from .jobs import job_handler
+from .models import ItemModel, ItemTagModel, StoreModel, TagModel
+
+FORMATS = ("csv", "ndjson")
+# CSV column holding an item's tag names, separated by TAG_SEPARATOR
+TAG_SEPARATOR = "|"
+# validation errors kept in an import report, the rest are only counted
+MAX_REPORTED_ERRORS = 20
+
+
+class CatalogRowSchema(Schema):
+    store_id = fields.Int(required=True)
+    item_name = fields.Str(required=True)
+    item_price = fields.Float(required=True)
+    tags = fields.List(fields.Str(), load_default=list)
+
+
+def read_rows(stream, fmt):
+    """
+    Yields (line number, raw row) from a binary stream of CSV (with a
+    store_id,item_name,item_price,tags header) or NDJSON, one line at a
+    time, so the input is never held in memory. Lines that are not valid
+    JSON are yielded as None.
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8", newline="")
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        for row in reader:
+            tags = row.get("tags") or ""
+            row["tags"] = [tag for tag in tags.split(TAG_SEPARATOR) if tag]
+            yield reader.line_num, row
+        return
+
+    for number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield number, json.loads(line)
+        except ValueError:
+            yield number, None
+
+
+class CatalogImport:
+    """
+    Upserts catalog rows onto items (on uq_item_store, updating the price),
+    tags (on uq_tag_store) and item_tag links, `chunk_size` rows per
+    transaction. Postgres loads each chunk with COPY into temporary staging
+    tables, other databases with executemany.
+    """
+
+    def __init__(self, chunk_size=5000, progress=None):
+        self.chunk_size = chunk_size
+        self.progress = progress
+        self.report = {
+            "rows": 0,
+            "items_upserted": 0,
+            "tags_created": 0,
+            "links_created": 0,
+            "invalid_rows": 0,
+            "invalid_store": 0,
+            "errors": [],
+        }
+        self._schema = CatalogRowSchema()
+
+    def run(self, rows):
+        """Imports (line number, raw row) pairs, see read_rows, and returns the report."""
+        start = time.perf_counter()
+        chunk = []
+        for number, raw in rows:
+            self.report["rows"] += 1
+            row = self._load(number, raw)
+            if row is not None:
+                chunk.append(row)
+            if len(chunk) == self.chunk_size:
+                self._write(chunk)
+                chunk = []
+        if chunk:
+            self._write(chunk)
+
+        elapsed = time.perf_counter() - start
+        self.report["seconds"] = round(elapsed, 3)
+        self.report["rows_per_s"] = round(self.report["rows"] / elapsed, 1) if elapsed else 0.0
+        return self.report
+
+    def _load(self, number, raw):
+        try:
+            if raw is None:
+                raise ValidationError("Not valid JSON.")
+            return self._schema.load(raw, unknown="exclude")
+        except ValidationError as e:
+            self.report["invalid_rows"] += 1
+            if len(self.report["errors"]) < MAX_REPORTED_ERRORS:
+                self.report["errors"].append({"line": number, "errors": e.messages})
+            return None
+
+    def _write(self, chunk):
+        dialect = db.session.get_bind().dialect.name
+        if dialect not in ("sqlite", "postgresql"):
+            raise ValueError(f"Catalog import does not support {dialect}.")
+
+        store_ids = {row["store_id"] for row in chunk}
+        stores = set(db.session.scalars(
+            db.select(StoreModel.store_id).where(StoreModel.store_id.in_(store_ids))
+        ))
+        valid = [row for row in chunk if row["store_id"] in stores]
+        self.report["invalid_store"] += len(chunk) - len(valid)
+
+        # the last row wins when an item appears twice in a chunk
+        items = {(row["item_name"], row["store_id"]): row["item_price"] for row in valid}
+        tag_keys = {(tag, row["store_id"]) for row in valid for tag in row["tags"]}
+
+        if dialect == "postgresql":
+            item_ids = self._copy_items(items)
+        else:
+            item_ids = self._upsert_items(items)
+        tag_ids = self._insert_tags(tag_keys)
+
+        links = {
+            (item_ids[(row["item_name"], row["store_id"])], tag_ids[(tag, row["store_id"])])
+            for row in valid
+            for tag in row["tags"]
+        }
+        if dialect == "postgresql":
+            self.report["links_created"] += self._copy_links(links)
+        else:
+            self.report["links_created"] += self._insert_links(links)
+
+        db.session.commit()
+        self.report["items_upserted"] += len(items)
+        if self.progress is not None:
+            self.progress(self.report["rows"])
+
+    def _upsert_items(self, items):
+        if not items:
+            return {}
+        statement = sqlite.insert(ItemModel)
+        statement = statement.on_conflict_do_update(
+            index_elements=["item_name", "store_id"],
+            set_={"item_price": statement.excluded.item_price},
+        ).returning(ItemModel.item_id, ItemModel.item_name, ItemModel.store_id)
+        rows = db.session.execute(
+            statement,
+            [{"item_name": name, "store_id": store_id, "item_price": price}
+             for (name, store_id), price in items.items()],
+        )
+        return {(name, store_id): item_id for item_id, name, store_id in rows}
+
+    def _insert_tags(self, keys):
+        if not keys:
+            return {}
+        insert = postgresql.insert if db.session.get_bind().dialect.name == "postgresql" else sqlite.insert
+        # core execution, an ORM bulk insert result has no rowcount
+        result = db.session.connection().execute(
+            insert(TagModel).on_conflict_do_nothing(),
+            [{"tag_name": name, "store_id": store_id} for name, store_id in keys],
+        )
+        self.report["tags_created"] += max(result.rowcount, 0)
+        # two IN lists use uq_tag_store, a row-value IN makes SQLite scan the table
+        rows = db.session.execute(
+            db.select(TagModel.tag_id, TagModel.tag_name, TagModel.store_id).where(
+                TagModel.tag_name.in_({name for name, _ in keys}),
+                TagModel.store_id.in_({store_id for _, store_id in keys}),
+            )
+        )
+        return {(name, store_id): tag_id for tag_id, name, store_id in rows if (name, store_id) in keys}
+
+    def _insert_links(self, links):
+        if not links:
+            return 0
+        result = db.session.connection().execute(
+            sqlite.insert(ItemTagModel).on_conflict_do_nothing(),
+            [{"item_id": item_id, "tag_id": tag_id} for item_id, tag_id in links],
+        )
+        return max(result.rowcount, 0)
+
+    # Postgres: COPY the chunk into a temporary table, then one INSERT ... SELECT
+
+    def _copy(self, staging, columns, rows):
+        cursor = db.session.connection().connection.dbapi_connection.cursor()
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        buffer.seek(0)
+        cursor.copy_expert(f"COPY {staging} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+    def _copy_items(self, items):
+        if not items:
+            return {}
+        db.session.execute(db.text(
+            "CREATE TEMP TABLE IF NOT EXISTS import_items "
+            "(item_name VARCHAR(80), item_price FLOAT, store_id INTEGER) ON COMMIT DELETE ROWS"
+        ))
+        self._copy(
+            "import_items",
+            ("item_name", "item_price", "store_id"),
+            [(name, price, store_id) for (name, store_id), price in items.items()],
+        )
+        rows = db.session.execute(db.text(
+            "INSERT INTO items (item_name, item_price, store_id) "
+            "SELECT item_name, item_price, store_id FROM import_items "
+            "ON CONFLICT ON CONSTRAINT uq_item_store DO UPDATE SET item_price = EXCLUDED.item_price "
+            "RETURNING item_id, item_name, store_id"
+        ))
+        return {(name, store_id): item_id for item_id, name, store_id in rows}
+
+    def _copy_links(self, links):
+        if not links:
+            return 0
+        db.session.execute(db.text(
+            "CREATE TEMP TABLE IF NOT EXISTS import_links (item_id INTEGER, tag_id INTEGER) ON COMMIT DELETE ROWS"
+        ))
+        self._copy("import_links", ("item_id", "tag_id"), links)
+        result = db.session.execute(db.text(
+            "INSERT INTO item_tag (item_id, tag_id) SELECT item_id, tag_id FROM import_links "
+            "ON CONFLICT DO NOTHING"
+        ))
+        return max(result.rowcount, 0)
+
+
+def import_catalog(stream, fmt, chunk_size=None, progress=None):
+    """Streams a CSV or NDJSON catalog from a binary stream into the database."""
+    chunk_size = chunk_size or current_app.config.get("IMPORT_CHUNK_SIZE", 5000)
+    return CatalogImport(chunk_size, progress).run(read_rows(stream, fmt))
+
+
+@job_handler("import_catalog")
+def import_catalog_job(params, progress):
+    # upserts, so a job restarted after a crash just runs the file again
+    try:
+        with open(params["path"], "rb") as stream:
+            return import_catalog(stream, params["format"], progress=progress)
+    finally:
+        os.remove(params["path"])
+
+
+EXPORT_COLUMNS = ("store_id", "store_name", "item_id", "item_name", "item_price", "tags")
+
+
+def export_rows(store_id=None, batch_size=1000):
+    """
+    Yields one dict per item (with its store name and tag names), in item_id
+    order. Items are read in keyset batches of `batch_size` plus one tag
+    query per batch, so memory stays flat. The read transaction ends after
+    each batch is fetched, before it is yielded, so none is held open while
+    the client downloads. Each batch is read from its own snapshot.
+    """
+    last_id = 0
+    while True:
+        query = (
+            db.select(StoreModel.store_id, StoreModel.store_name, ItemModel.item_id,
+                      ItemModel.item_name, ItemModel.item_price)
+            .join(StoreModel, StoreModel.store_id == ItemModel.store_id)
+            .where(ItemModel.item_id > last_id)
+            .order_by(ItemModel.item_id)
+            .limit(batch_size)
+        )
+        if store_id is not None:
+            query = query.where(ItemModel.store_id == store_id)
+        items = db.session.execute(query).all()
+        if not items:
+            return
+
+        tags = {}
+        for item_id, tag_name in db.session.execute(
+            db.select(ItemTagModel.item_id, TagModel.tag_name)
+            .join(TagModel, TagModel.tag_id == ItemTagModel.tag_id)
+            .where(ItemTagModel.item_id.in_([item.item_id for item in items]))
+            .order_by(ItemTagModel.item_id, TagModel.tag_name)
+        ):
+            tags.setdefault(item_id, []).append(tag_name)
+        # only reads here, ends the transaction (and its SQLite read lock / snapshot)
+        db.session.commit()
+
+        for item in items:
+            yield {**item._asdict(), "tags": tags.get(item.item_id, [])}
+        last_id = items[-1].item_id
+
+
+def encode_rows(rows, fmt):
+    """Yields CSV (tags joined with TAG_SEPARATOR) or NDJSON text, one row at a time."""
+    if fmt == "ndjson":
+        for row in rows:
+            yield json.dumps(row) + "\n"
+        return
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for row in rows:
+        row = {**row, "tags": TAG_SEPARATOR.join(row["tags"])}
+        writer.writerow([row[column] for column in EXPORT_COLUMNS])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def gzip_chunks(chunks, level=6, min_size=64 * 1024):
+    """Gzips text chunks as a stream, yielding about every `min_size` bytes of input."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    pending = []
+    size = 0
+    for chunk in chunks:
+        data = chunk.encode()
+        pending.append(data)
+        size += len(data)
+        if size >= min_size:
+            yield compressor.compress(b"".join(pending))
+            pending, size = [], 0
+    yield compressor.compress(b"".join(pending)) + compressor.flush()
+
+
+@click.command("import-catalog")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--format", "fmt", type=click.Choice(FORMATS), default=None, help="defaults to the file extension")
+@click.option("--chunk-size", type=int, default=None, help="rows per transaction")
+@with_appcontext
+def import_catalog_command(path, fmt, chunk_size):
+    """Import a CSV or NDJSON catalog of items and their tags."""
+    fmt = fmt or ("csv" if path.endswith(".csv") else "ndjson")
+
+    def echo_progress(rows):
+        click.echo(f"{rows} rows...", err=True)
+
+    with open(path, "rb") as stream:
+        report = import_catalog(stream, fmt, chunk_size, progress=echo_progress)
+    click.echo(
+        f"{report['rows']} rows in {report['seconds']}s ({report['rows_per_s']} rows/s): "
+        f"{report['items_upserted']} items upserted, {report['tags_created']} tags and "
+        f"{report['links_created']} links created, {report['invalid_rows']} invalid rows, "
+        f"{report['invalid_store']} rows with an unknown store"
+    )
+    for error in report["errors"]:
+        click.echo(f"line {error['line']}: {error['errors']}", err=True)
+
+
+@click.command("export-catalog")
+@click.argument("path", type=click.Path(dir_okay=False, allow_dash=True), default="-")
+@click.option("--format", "fmt", type=click.Choice(FORMATS), default="ndjson")
+@click.option("--store-id", type=int, default=None, help="only this store's items")
+@click.option("--gzip", "compress", is_flag=True, help="gzip the output")
+@with_appcontext
+def export_catalog_command(path, fmt, store_id, compress):
+    """Export items with their store and tag names as CSV or NDJSON."""
+    batch_size = current_app.config.get("EXPORT_BATCH_SIZE", 1000)
+    chunks = encode_rows(export_rows(store_id, batch_size), fmt)
+    chunks = gzip_chunks(chunks) if compress else (chunk.encode() for chunk in chunks)
+    with click.open_file(path, "wb") as out:
+        for chunk in chunks:
+            out.write(chunk)
+
+
+def init_app(app):
+    app.cli.add_command(import_catalog_command)
+    app.cli.add_command(export_catalog_command)
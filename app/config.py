@@ -1,6 +1,49 @@
 import os
 import secrets
 
+
+# SQLAlchemy pool settings, picked per environment with SQLALCHEMY_POOL_PROFILE
+POOL_PROFILES = {
+    # gunicorn sync workers serve one request at a time, one connection each is enough,
+    # overflow covers the odd CLI or background thread
+    "sync-worker": {
+        "pool_size": 1,
+        "max_overflow": 2,
+        "pool_timeout": 5,
+        "pool_recycle": 1800,
+        "pool_pre_ping": True,
+    },
+    # threaded servers (flask run, gunicorn --threads)
+    "threaded": {
+        "pool_size": 5,
+        "max_overflow": 10,
+        "pool_timeout": 30,
+        "pool_recycle": 1800,
+        "pool_pre_ping": True,
+    },
+    "test": {
+        "pool_pre_ping": False,
+    },
+}
+
+
+# applied to every new SQLite connection, see app/sqlite_tuning.py
+SQLITE_PRAGMAS = {
+    # readers do not block the writer, and the other way round
+    "journal_mode": "WAL",
+    # with WAL, fsync at checkpoints only, still safe against app crashes
+    "synchronous": "NORMAL",
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", 256 * 1024 * 1024)),
+    # negative is KiB, 64 MiB page cache per connection
+    "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", -64000)),
+    # workers wait for the write lock instead of failing with "database is locked"
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT", 5000)),
+    # store deletes rely on ON DELETE CASCADE for items, tags and links
+    "foreign_keys": "ON",
+    "temp_store": "MEMORY",
+}
+
+
 class BaseConfig:
     PROPAGATE_EXCEPTIONS = True
     API_TITLE = "simple-flask-somorest-api"
@@ -10,7 +53,59 @@ class BaseConfig:
     OPENAPI_SWAGGER_UI_PATH = "/swagger-ui"
     OPENAPI_SWAGGER_UI_URL = "https://cdn.jsdelivr.net/npm/swagger-ui-dist/"
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_POOL_PROFILE = os.getenv("SQLALCHEMY_POOL_PROFILE", "threaded")
+    SQLITE_PRAGMAS = SQLITE_PRAGMAS
+    # seconds a client keeps reading from the primary after a write
+    DB_REPLICA_STICKY_SECONDS = int(os.getenv("DB_REPLICA_STICKY_SECONDS", 5))
     JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", str(secrets.SystemRandom().getrandbits(128)))
+    PAGINATION_DEFAULT_LIMIT = int(os.getenv("PAGINATION_DEFAULT_LIMIT", 100))
+    PAGINATION_MAX_LIMIT = int(os.getenv("PAGINATION_MAX_LIMIT", 1000))
+    SQL_INSTRUMENTATION = os.getenv("SQL_INSTRUMENTATION", "true").lower() == "true"
+    BLOCKLIST_BACKEND = os.getenv("BLOCKLIST_BACKEND", "memory")
+    # defaults to <instance folder>/blocklist.db, point it at /dev/shm to keep it in memory
+    BLOCKLIST_SQLITE_PATH = os.getenv("BLOCKLIST_SQLITE_PATH")
+    BLOCKLIST_CACHE_SIZE = int(os.getenv("BLOCKLIST_CACHE_SIZE", 1024))
+    BLOCKLIST_PURGE_INTERVAL = int(os.getenv("BLOCKLIST_PURGE_INTERVAL", 60))
+    # pbkdf2 runs in this many processes per worker, 0 hashes inline
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", 0))
+    PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", 16))
+    PASSWORD_HASH_RETRY_AFTER = int(os.getenv("PASSWORD_HASH_RETRY_AFTER", 1))
+    # pbkdf2 cost for new hashes, older hashes are upgraded on login (see `flask hash-report`)
+    PASSWORD_HASH_ROUNDS = int(os.getenv("PASSWORD_HASH_ROUNDS", 29000))
+    JWT_DECODE_CACHE_SIZE = int(os.getenv("JWT_DECODE_CACHE_SIZE", 4096))
+    JWT_DECODE_CACHE_TTL = int(os.getenv("JWT_DECODE_CACHE_TTL", 300))
+    ADMIN_FLAG_CACHE_SIZE = int(os.getenv("ADMIN_FLAG_CACHE_SIZE", 1024))
+    ADMIN_FLAG_CACHE_TTL = int(os.getenv("ADMIN_FLAG_CACHE_TTL", 60))
+    # POST /item/bulk: rows per request and per executemany
+    BULK_MAX_ROWS = int(os.getenv("BULK_MAX_ROWS", 50000))
+    BULK_CHUNK_SIZE = int(os.getenv("BULK_CHUNK_SIZE", 1000))
+    # catalog import (app/catalog.py): rows per transaction, and where
+    # ?async=true uploads wait for their job, <instance folder>/imports by default
+    IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", 5000))
+    IMPORT_SPOOL_DIR = os.getenv("IMPORT_SPOOL_DIR")
+    # items read per query while streaming GET /catalog/export
+    EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", 1000))
+    # background jobs (app/jobs.py), queued in <instance folder>/jobs.db by default
+    JOBS_SQLITE_PATH = os.getenv("JOBS_SQLITE_PATH")
+    # worker threads per process, 0 runs jobs inline in the submitting request
+    JOBS_WORKERS = int(os.getenv("JOBS_WORKERS", 1))
+    JOBS_POLL_INTERVAL = float(os.getenv("JOBS_POLL_INTERVAL", 1.0))
+    # a running job without progress for this long is handed to another worker
+    JOBS_STALE_AFTER = int(os.getenv("JOBS_STALE_AFTER", 300))
+    JOBS_MAX_ATTEMPTS = int(os.getenv("JOBS_MAX_ATTEMPTS", 3))
+    # rows per commit in jobs that delete or import in bulk
+    JOBS_CHUNK_SIZE = int(os.getenv("JOBS_CHUNK_SIZE", 5000))
+    # GET /item/<id>, /store/<id> and /tag/<id> (app/response_cache.py): "memory", "mmap", "sqlite" or "none"
+    RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "memory")
+    RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", 4096))
+    RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+    # writes in another worker are only seen after this long with the memory backend
+    RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", 60))
+    # defaults to <instance folder>/responses.db, point it at /dev/shm to keep it in memory
+    RESPONSE_CACHE_SQLITE_PATH = os.getenv("RESPONSE_CACHE_SQLITE_PATH")
+    # mmap backend: RESPONSE_CACHE_SIZE slots of this many bytes, larger responses are not cached
+    RESPONSE_CACHE_MMAP_PATH = os.getenv("RESPONSE_CACHE_MMAP_PATH")
+    RESPONSE_CACHE_SLOT_BYTES = int(os.getenv("RESPONSE_CACHE_SLOT_BYTES", 16384))
 
 
 class DevelopmentConfig(BaseConfig):
@@ -20,15 +115,24 @@ class DevelopmentConfig(BaseConfig):
 
 class TestingConfig(BaseConfig):
     TESTING = True
+    SQLALCHEMY_POOL_PROFILE = os.getenv("SQLALCHEMY_POOL_PROFILE", "test")
     SQLALCHEMY_DATABASE_URI = "sqlite:///:memory:"
     JWT_SECRET_KEY = "test_secret"
+    JOBS_SQLITE_PATH = ":memory:"
+    JOBS_WORKERS = 0
 
 
 class ProductionConfig(BaseConfig):
     PROPOGATE_EXCEPTIONS = False
     DEBUG = False
     SQLALCHEMY_DATABASE_URI = "sqlite:///data.db"
+    SQLALCHEMY_POOL_PROFILE = os.getenv("SQLALCHEMY_POOL_PROFILE", "sync-worker")
     JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY")
+    # shared by all gunicorn workers
+    BLOCKLIST_BACKEND = os.getenv("BLOCKLIST_BACKEND", "sqlite")
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", 2))
+    # one warm cache for all gunicorn workers, invalidated for all of them on write
+    RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "mmap")
 
 
 config_mapping = {
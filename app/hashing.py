@@ -0,0 +1,174 @@
+import multiprocessing
+import os
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import click
+from flask import current_app, g
+from flask.cli import with_appcontext
+from passlib.hash import pbkdf2_sha256
+
+from .db import db
+from .models import UserModel
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hash queue is full, turned into a 503 by the app."""
+
+
+# both return (result, seconds waiting for a process, seconds hashing)
+def _hash(password, rounds, submitted_at):
+    started = time.time()
+    hashed = pbkdf2_sha256.using(rounds=rounds).hash(password)
+    return hashed, started - submitted_at, time.time() - started
+
+
+def _verify(password, hashed, submitted_at):
+    started = time.time()
+    valid = pbkdf2_sha256.verify(password, hashed)
+    return valid, started - submitted_at, time.time() - started
+
+
+class PasswordHasher:
+    """
+    Runs pbkdf2 hashing and verification in a process pool of
+    PASSWORD_HASH_WORKERS processes (0 runs them inline), with at most
+    PASSWORD_HASH_MAX_QUEUE calls waiting for a free process. Calls past
+    that are rejected right away with 503 and Retry-After instead of piling
+    up behind each other.
+
+    Each gunicorn worker owns its pool, started on first use so it is never
+    inherited across a fork. Queue wait and hash time of the current request
+    are added to its Server-Timing header, totals are kept in `stats`.
+    """
+
+    def __init__(self, workers=0, max_queue=16, retry_after=1, rounds=pbkdf2_sha256.default_rounds):
+        self.workers = workers
+        self.rounds = rounds
+        self.retry_after = retry_after
+        self._slots = threading.BoundedSemaphore(max(workers, 1) + max_queue)
+        self._lock = threading.Lock()
+        self._pool = None
+        self._pid = None
+        self.stats = {"calls": 0, "rejected": 0, "wait_total_ms": 0.0, "wait_max_ms": 0.0}
+
+    def _executor(self):
+        with self._lock:
+            if self._pool is None or self._pid != os.getpid():
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+                self._pid = os.getpid()
+            return self._pool
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.stats["rejected"] += 1
+            raise PasswordHasherBusy()
+        try:
+            start = time.time()
+            if self.workers:
+                result, wait, run = self._executor().submit(fn, *args, start).result()
+            else:
+                result, wait, run = fn(*args, start)
+        finally:
+            self._slots.release()
+
+        wait_ms = wait * 1000
+        with self._lock:
+            self.stats["calls"] += 1
+            self.stats["wait_total_ms"] += wait_ms
+            self.stats["wait_max_ms"] = max(self.stats["wait_max_ms"], wait_ms)
+        g.hash_timing = g.get("hash_timing", []) + [(wait_ms, run * 1000)]
+        return result
+
+    def hash(self, password):
+        return self._run(_hash, password, self.rounds)
+
+    def verify(self, password, hashed):
+        return self._run(_verify, password, hashed)
+
+    def needs_rehash(self, hashed):
+        """True when `hashed` was not made with the configured scheme and rounds."""
+        return hash_parameters(hashed) != ("pbkdf2-sha256", self.rounds)
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None and self._pid == os.getpid():
+                self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+def init_app(app):
+    hasher = PasswordHasher(
+        workers=app.config.get("PASSWORD_HASH_WORKERS", 0),
+        max_queue=app.config.get("PASSWORD_HASH_MAX_QUEUE", 16),
+        retry_after=app.config.get("PASSWORD_HASH_RETRY_AFTER", 1),
+        rounds=app.config.get("PASSWORD_HASH_ROUNDS", pbkdf2_sha256.default_rounds),
+    )
+    app.extensions["password_hasher"] = hasher
+    app.cli.add_command(hash_report)
+
+    @app.errorhandler(PasswordHasherBusy)
+    def password_hasher_busy(error):
+        return (
+            {
+                "code": 503,
+                "status": "Service Unavailable",
+                "message": "Too many login requests, please retry shortly.",
+            },
+            503,
+            {"Retry-After": str(hasher.retry_after)},
+        )
+
+    @app.after_request
+    def add_hash_timing_header(response):
+        timings = g.get("hash_timing")
+        if timings:
+            wait_ms = sum(wait for wait, _ in timings)
+            hash_ms = sum(run for _, run in timings)
+            timing = f"hash-queue;dur={wait_ms:.2f}, hash;dur={hash_ms:.2f}"
+            if response.headers.get("Server-Timing"):
+                timing = response.headers["Server-Timing"] + ", " + timing
+            response.headers["Server-Timing"] = timing
+        return response
+
+
+def hash_parameters(hashed):
+    """(scheme, rounds) of a stored password, ("unknown", None) if it is not pbkdf2."""
+    try:
+        return "pbkdf2-sha256", pbkdf2_sha256.from_string(hashed).rounds
+    except (ValueError, TypeError):
+        return "unknown", None
+
+
+@click.command("hash-report")
+@with_appcontext
+def hash_report():
+    """Count users per password hash scheme and rounds."""
+    target = current_app.extensions["password_hasher"].rounds
+    passwords = db.session.execute(
+        db.select(UserModel.password).execution_options(yield_per=1000)
+    ).scalars()
+    counts = Counter(hash_parameters(password) for password in passwords)
+    if not counts:
+        click.echo("No users.")
+        return
+    for (scheme, rounds), users in sorted(counts.items(), key=lambda entry: -entry[1]):
+        marker = " (target)" if rounds == target else ""
+        click.echo(f"{scheme} rounds={rounds}: {users} users{marker}")
+
+
+def hash_password(password):
+    return current_app.extensions["password_hasher"].hash(password)
+
+
+def verify_password(password, hashed):
+    return current_app.extensions["password_hasher"].verify(password, hashed)
+
+
+def password_needs_rehash(hashed):
+    return current_app.extensions["password_hasher"].needs_rehash(hashed)
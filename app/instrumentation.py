@@ -0,0 +1,63 @@
+import time
+
+from flask import g, has_request_context
+from sqlalchemy import event
+
+from .db import db
+
+
+def init_app(app):
+    """
+    Counts the SQL statements each request runs and how long they take,
+    and reports them in the `X-Query-Count` and `Server-Timing` headers.
+    Disabled with SQL_INSTRUMENTATION = False.
+    """
+    if not app.config.get("SQL_INSTRUMENTATION"):
+        return
+
+    with app.app_context():
+        engines = list(db.engines.values())
+    if "db_replica" in app.extensions:
+        engines.append(app.extensions["db_replica"])
+    for engine in engines:
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
+
+    @app.before_request
+    def start_query_stats():
+        g.query_count = 0
+        g.query_time = 0.0
+
+    @app.after_request
+    def add_query_stats_headers(response):
+        count = g.get("query_count", 0)
+        duration_ms = g.get("query_time", 0.0) * 1000
+        response.headers["X-Query-Count"] = str(count)
+        timing = f'db;dur={duration_ms:.2f};desc="{count} queries"'
+        if response.headers.get("Server-Timing"):
+            timing = response.headers["Server-Timing"] + ", " + timing
+        response.headers["Server-Timing"] = timing
+        return response
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _record(conn)
+
+
+def _handle_error(exception_context):
+    # failed statements never reach after_cursor_execute
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_start_time"):
+        _record(conn)
+
+
+def _record(conn):
+    elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+    if has_request_context():
+        g.query_count = g.get("query_count", 0) + 1
+        g.query_time = g.get("query_time", 0.0) + elapsed
@@ -0,0 +1,306 @@
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from datetime import datetime, timezone
+
+from flask import current_app
+
+from .db import db
+
+# kind -> handler(params, progress), see job_handler
+HANDLERS = {}
+
+
+def job_handler(kind):
+    """
+    Registers the function that runs jobs of `kind`. It is called in an app
+    context with the job's params and a `progress(done, total=None)`
+    callback, and returns the job's JSON-serializable result. The runner
+    keeps the job's heartbeat fresh while the handler runs, so a handler
+    that does not report progress is not taken for a dead one. Handlers
+    must be safe to run again from the start: a job whose worker died is
+    picked up by another one.
+    """
+
+    def register(fn):
+        HANDLERS[kind] = fn
+        return fn
+
+    return register
+
+
+class JobStore:
+    """
+    Durable job queue in a SQLite file shared by every worker on the host.
+
+    A worker claims the oldest queued job, or a running one whose heartbeat
+    is older than `stale_after` seconds (its worker was killed or
+    restarted), in a single write transaction, so two workers never claim
+    the same job. A job claimed `max_attempts` times without finishing is
+    marked failed instead of being retried forever.
+    """
+
+    def __init__(self, path, stale_after=300, max_attempts=3):
+        self.path = path
+        self.stale_after = stale_after
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+
+    def _connection(self):
+        # connections must not cross a fork (gunicorn --preload)
+        if self._conn is None or self._pid != os.getpid():
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    params TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    done INTEGER NOT NULL DEFAULT 0,
+                    total INTEGER,
+                    result TEXT,
+                    error TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    owner TEXT,
+                    heartbeat REAL,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                ) WITHOUT ROWID
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_jobs_status_created_at ON jobs (status, created_at)")
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    def enqueue(self, kind, params):
+        now = time.time()
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._connection().execute(
+                "INSERT INTO jobs (job_id, kind, params, status, created_at, updated_at) "
+                "VALUES (?, ?, ?, 'queued', ?, ?)",
+                (job_id, kind, json.dumps(params), now, now),
+            )
+        return job_id
+
+    def get(self, job_id):
+        """The job as a dict, None if there is no such job."""
+        with self._lock:
+            row = self._connection().execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return None if row is None else self._to_dict(row)
+
+    def claim(self, owner):
+        """(job_id, kind, params) of the next job to run, None if there is none."""
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT job_id, kind, params, attempts FROM jobs "
+                    "WHERE status = 'queued' OR (status = 'running' AND heartbeat < ?) "
+                    "ORDER BY created_at LIMIT 1",
+                    (now - self.stale_after,),
+                ).fetchone()
+                if row is not None and row["attempts"] >= self.max_attempts:
+                    conn.execute(
+                        "UPDATE jobs SET status = 'failed', error = ?, updated_at = ? WHERE job_id = ?",
+                        (f"Gave up after {row['attempts']} attempts.", now, row["job_id"]),
+                    )
+                    row = None
+                elif row is not None:
+                    conn.execute(
+                        "UPDATE jobs SET status = 'running', owner = ?, heartbeat = ?, "
+                        "attempts = attempts + 1, updated_at = ? WHERE job_id = ?",
+                        (owner, now, now, row["job_id"]),
+                    )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        return row["job_id"], row["kind"], json.loads(row["params"])
+
+    def _update(self, job_id, owner, **values):
+        # a job reclaimed by another worker no longer belongs to `owner`
+        values.update(updated_at=time.time(), heartbeat=time.time())
+        assignments = ", ".join(f"{column} = ?" for column in values)
+        with self._lock:
+            cursor = self._connection().execute(
+                f"UPDATE jobs SET {assignments} WHERE job_id = ? AND owner = ? AND status = 'running'",
+                (*values.values(), job_id, owner),
+            )
+        return cursor.rowcount == 1
+
+    def heartbeat(self, job_id, owner):
+        """Tells the other workers `owner` is still running the job, False if it no longer owns it."""
+        with self._lock:
+            cursor = self._connection().execute(
+                "UPDATE jobs SET heartbeat = ? WHERE job_id = ? AND owner = ? AND status = 'running'",
+                (time.time(), job_id, owner),
+            )
+        return cursor.rowcount == 1
+
+    def progress(self, job_id, owner, done, total=None):
+        if total is None:
+            return self._update(job_id, owner, done=done)
+        return self._update(job_id, owner, done=done, total=total)
+
+    def finish(self, job_id, owner, result):
+        return self._update(job_id, owner, status="succeeded", result=json.dumps(result))
+
+    def fail(self, job_id, owner, error):
+        return self._update(job_id, owner, status="failed", error=error)
+
+    @staticmethod
+    def _to_dict(row):
+        def timestamp(value):
+            return datetime.fromtimestamp(value, timezone.utc)
+
+        return {
+            "job_id": row["job_id"],
+            "kind": row["kind"],
+            "status": row["status"],
+            "progress": {"done": row["done"], "total": row["total"]},
+            "result": None if row["result"] is None else json.loads(row["result"]),
+            "error": row["error"],
+            "attempts": row["attempts"],
+            "created_at": timestamp(row["created_at"]),
+            "updated_at": timestamp(row["updated_at"]),
+        }
+
+
+class JobRunner:
+    """
+    Runs queued jobs in JOBS_WORKERS daemon threads per process (0 runs each
+    job inline, in the request that submits it). Threads are started on the
+    first request of each process, so a restarted worker resumes the queue
+    without waiting for a new job to be submitted.
+    """
+
+    def __init__(self, app, store, workers=1, poll_interval=1.0):
+        self.app = app
+        self.store = store
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self._wakeup = threading.Event()
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def submit(self, kind, **params):
+        """Queues a job of `kind` and returns its id."""
+        if kind not in HANDLERS:
+            raise ValueError(f"Unknown job kind: {kind}.")
+        job_id = self.store.enqueue(kind, params)
+        if self.workers:
+            self.ensure_started()
+            self._wakeup.set()
+        else:
+            self.run_next(owner=self._owner())
+        return job_id
+
+    def ensure_started(self):
+        if not self.workers or self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            for n in range(self.workers):
+                threading.Thread(target=self._loop, name=f"job-worker-{n}", daemon=True).start()
+            self._pid = os.getpid()
+
+    def _owner(self):
+        return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+    def _loop(self):
+        owner = self._owner()
+        while True:
+            try:
+                if self.run_next(owner):
+                    continue
+            except Exception:
+                # the queue file was unavailable, try again later
+                traceback.print_exc()
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+    def run_next(self, owner):
+        """Claims and runs one job, False if the queue is empty."""
+        claimed = self.store.claim(owner)
+        if claimed is None:
+            return False
+        job_id, kind, params = claimed
+
+        def progress(done, total=None):
+            self.store.progress(job_id, owner, done, total)
+
+        finished = threading.Event()
+        beating = threading.Thread(
+            target=self._beat, args=(job_id, owner, finished), name=f"job-heartbeat-{job_id}", daemon=True
+        )
+        beating.start()
+        try:
+            with self.app.app_context():
+                try:
+                    result = HANDLERS[kind](params, progress)
+                except Exception as e:
+                    db.session.rollback()
+                    self.store.fail(job_id, owner, f"{type(e).__name__}: {e}")
+                else:
+                    self.store.finish(job_id, owner, result)
+        finally:
+            finished.set()
+            beating.join()
+        return True
+
+    def _beat(self, job_id, owner, finished):
+        # three beats per stale_after, so one late beat does not get the job reclaimed
+        while not finished.wait(self.store.stale_after / 3):
+            try:
+                if not self.store.heartbeat(job_id, owner):
+                    return
+            except Exception:
+                # the queue file was unavailable, try again at the next beat
+                traceback.print_exc()
+
+
+def init_app(app):
+    path = app.config.get("JOBS_SQLITE_PATH") or os.path.join(app.instance_path, "jobs.db")
+    store = JobStore(
+        path,
+        stale_after=app.config.get("JOBS_STALE_AFTER", 300),
+        max_attempts=app.config.get("JOBS_MAX_ATTEMPTS", 3),
+    )
+    runner = JobRunner(
+        app,
+        store,
+        workers=app.config.get("JOBS_WORKERS", 1),
+        poll_interval=app.config.get("JOBS_POLL_INTERVAL", 1.0),
+    )
+    app.extensions["job_runner"] = runner
+
+    @app.before_request
+    def start_job_workers():
+        runner.ensure_started()
+
+
+def submit_job(kind, **params):
+    return current_app.extensions["job_runner"].submit(kind, **params)
+
+
+def get_job(job_id):
+    return current_app.extensions["job_runner"].store.get(job_id)
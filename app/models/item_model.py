@@ -11,7 +11,14 @@ class ItemModel(db.Model):
     item_id = db.Column(db.Integer, primary_key=True)
     item_name = db.Column(db.String(80), unique=False, nullable=False)
     item_price = db.Column(db.Float(precision=2), unique=False, nullable=False)
-    store_id = db.Column(db.Integer, db.ForeignKey("stores.store_id"), unique=False, nullable=False)
+    store_id = db.Column(
+        db.Integer,
+        db.ForeignKey("stores.store_id", ondelete="CASCADE"),
+        unique=False,
+        nullable=False,
+        index=True,
+    )
 
     store = db.relationship("StoreModel", back_populates="items")
-    tags = db.relationship("TagModel", back_populates="items", secondary="item_tag")
+    # item_tag rows go with the item through ON DELETE CASCADE
+    tags = db.relationship("TagModel", back_populates="items", secondary="item_tag", passive_deletes=True)
@@ -1,13 +1,73 @@
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+
 from app.db import db
 
 
 class ItemTagModel(db.Model):
     __tablename__ = "item_tag"
 
+    # the (item_id, tag_id) primary key is the table itself (WITHOUT ROWID on SQLite),
+    # the reverse index serves tag -> items lookups without touching the table
     __table_args__ = (
-        db.UniqueConstraint("item_id", "tag_id", name="uq_item_tag_pair"),
+        db.Index("ix_item_tag_tag_id_item_id", "tag_id", "item_id"),
+        {"sqlite_with_rowid": False},
     )
-    
-    item_tag_id = db.Column(db.Integer, primary_key=True)
-    item_id = db.Column(db.Integer, db.ForeignKey("items.item_id"), unique=False, nullable=False)
-    tag_id = db.Column(db.Integer, db.ForeignKey("tags.tag_id"), unique=False, nullable=False)
+
+    item_id = db.Column(db.Integer, db.ForeignKey("items.item_id", ondelete="CASCADE"), primary_key=True)
+    tag_id = db.Column(db.Integer, db.ForeignKey("tags.tag_id"), primary_key=True)
+
+    @staticmethod
+    def _invalidates(pairs):
+        # the cached responses showing either side (see app/response_cache.py)
+        return {"cache_invalidates": tuple(
+            {f"item_id:{item_id}" for item_id, _ in pairs} | {f"tag_id:{tag_id}" for _, tag_id in pairs}
+        )}
+
+    @classmethod
+    def link(cls, item_id, tag_id):
+        """
+        Inserts the (item_id, tag_id) row without loading either collection.
+        Returns False if the link already exists, concurrent inserts of the
+        same pair are settled by the primary key.
+        """
+        values = {"item_id": item_id, "tag_id": tag_id}
+        dialect = db.session.get_bind().dialect.name
+        if dialect in ("sqlite", "postgresql"):
+            insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+            statement = insert(cls).values(**values).on_conflict_do_nothing()
+            statement = statement.execution_options(**cls._invalidates([(item_id, tag_id)]))
+            return db.session.execute(statement).rowcount == 1
+
+        try:
+            with db.session.begin_nested():
+                db.session.execute(
+                    db.insert(cls).values(**values), execution_options=cls._invalidates([(item_id, tag_id)])
+                )
+        except IntegrityError:
+            return False
+        return True
+
+    @classmethod
+    def link_all(cls, pairs):
+        """
+        Inserts every (item_id, tag_id) of `pairs` in one multi-row
+        statement and returns the pairs it created, links that exist already
+        (or were added concurrently) are skipped.
+        """
+        if not pairs:
+            return set()
+        values = [{"item_id": item_id, "tag_id": tag_id} for item_id, tag_id in pairs]
+        dialect = db.session.get_bind().dialect.name
+        if dialect in ("sqlite", "postgresql"):
+            insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+            statement = insert(cls).values(values).on_conflict_do_nothing().returning(cls.item_id, cls.tag_id)
+            return set(db.session.execute(statement, execution_options=cls._invalidates(pairs)).tuples())
+
+        return {pair for pair in pairs if cls.link(*pair)}
+
+    @classmethod
+    def unlink(cls, item_id, tag_id):
+        """Deletes the (item_id, tag_id) row, False if there was none."""
+        statement = db.delete(cls).where(cls.item_id == item_id, cls.tag_id == tag_id)
+        return db.session.execute(statement, execution_options=cls._invalidates([(item_id, tag_id)])).rowcount == 1
@@ -7,15 +7,19 @@ class StoreModel(db.Model):
     store_id = db.Column(db.Integer, primary_key=True)
     store_name = db.Column(db.String(80), unique=True, nullable=False)
 
+    # the database deletes a store's items, tags and their links (ON DELETE
+    # CASCADE), the ORM only deletes the store row
     items = db.relationship(
         "ItemModel",
         back_populates="store",
         lazy="dynamic",
-        cascade="all, delete, delete-orphan"
+        cascade="all, delete, delete-orphan",
+        passive_deletes=True,
     )
     tags = db.relationship(
         "TagModel",
         back_populates="store",
         lazy="dynamic",
-        cascade="all, delete, delete-orphan"
+        cascade="all, delete, delete-orphan",
+        passive_deletes=True,
     )
@@ -10,7 +10,13 @@ class TagModel(db.Model):
 
     tag_id = db.Column(db.Integer, primary_key=True)
     tag_name = db.Column(db.String(80), unique=False, nullable=False)
-    store_id = db.Column(db.Integer, db.ForeignKey("stores.store_id"), unique=False, nullable=False)
+    store_id = db.Column(
+        db.Integer,
+        db.ForeignKey("stores.store_id", ondelete="CASCADE"),
+        unique=False,
+        nullable=False,
+        index=True,
+    )
 
     store = db.relationship("StoreModel", back_populates="tags")
     items = db.relationship("ItemModel", back_populates="tags", secondary="item_tag")
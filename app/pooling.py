@@ -0,0 +1,78 @@
+import os
+import threading
+import time
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long checkouts wait for a free connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.wait_stats = {
+            "checkouts": 0,
+            "timeouts": 0,
+            "wait_total_ms": 0.0,
+            "wait_max_ms": 0.0,
+            "peak_checked_out": 0,
+        }
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except Exception:
+            with self._stats_lock:
+                self.wait_stats["timeouts"] += 1
+            raise
+        wait_ms = (time.perf_counter() - start) * 1000
+        with self._stats_lock:
+            stats = self.wait_stats
+            stats["checkouts"] += 1
+            stats["wait_total_ms"] += wait_ms
+            stats["wait_max_ms"] = max(stats["wait_max_ms"], wait_ms)
+            stats["peak_checked_out"] = max(stats["peak_checked_out"], self.checkedout())
+        return conn
+
+    def recreate(self):
+        # keeps wait stats of the pool that gets disposed
+        pool = super().recreate()
+        pool.wait_stats = dict(self.wait_stats)
+        return pool
+
+
+def engine_options(profile, db_url):
+    """
+    SQLALCHEMY_ENGINE_OPTIONS for pool `profile` (see POOL_PROFILES in
+    config.py). SQLite picks its own pool, so only pre-ping and recycle
+    are kept there.
+    """
+    from .config import POOL_PROFILES
+
+    if profile not in POOL_PROFILES:
+        raise ValueError(f"Unknown pool profile: {profile}.")
+    options = dict(POOL_PROFILES[profile])
+    if db_url and make_url(db_url).get_backend_name() == "sqlite":
+        return {key: options[key] for key in ("pool_pre_ping", "pool_recycle") if key in options}
+    options.setdefault("poolclass", InstrumentedQueuePool)
+    return options
+
+
+def pool_stats(engine):
+    """Live numbers for the pool of `engine` in this worker."""
+    pool = engine.pool
+    stats = {"pid": os.getpid(), "pool": type(pool).__name__, "status": pool.status()}
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=max(pool.overflow(), 0),
+            max_overflow=pool._max_overflow,
+            timeout=pool.timeout(),
+        )
+    stats.update(getattr(pool, "wait_stats", {}))
+    return stats
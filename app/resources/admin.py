@@ -0,0 +1,42 @@
+from flask import current_app
+from flask.views import MethodView
+from flask_smorest import Blueprint, abort
+from flask_jwt_extended import jwt_required, get_jwt
+
+from app.db import db
+from app.pooling import pool_stats
+
+
+blp = Blueprint("Admin", __name__, description="Operational stats, admin only")
+
+
+@blp.route("/admin/db-pool")
+class DatabasePool(MethodView):
+    @jwt_required()
+    @blp.response(200)
+    def get(self):
+        """
+        Pool checkout, overflow and wait stats of the worker that serves
+        the request. Call it a few times to sample every gunicorn worker.
+        """
+        if get_jwt().get("is_admin"):
+            return pool_stats(db.engine)
+        abort(401, message="Admin privilege required.")
+
+
+@blp.route("/admin/response-cache")
+class ResponseCache(MethodView):
+    @jwt_required()
+    @blp.response(200)
+    def get(self):
+        """
+        Entries, hits, misses and evictions of the response cache. With the
+        mmap backend they cover every worker of the host, otherwise only the
+        worker that serves the request.
+        """
+        if not get_jwt().get("is_admin"):
+            abort(401, message="Admin privilege required.")
+        cache = current_app.extensions.get("response_cache")
+        if cache is None:
+            return {"backend": "none"}
+        return cache.stats()
@@ -0,0 +1,83 @@
+import os
+import shutil
+import uuid
+
+from flask import Response, current_app, request, stream_with_context, url_for
+from flask.views import MethodView
+from flask_smorest import Blueprint, abort
+from flask_jwt_extended import jwt_required
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.catalog import encode_rows, export_rows, gzip_chunks, import_catalog
+from app.db import db
+from app.jobs import submit_job, get_job
+from app.schemas import CatalogImportArgsSchema, CatalogImportReportSchema, CatalogExportArgsSchema, JobSchema
+
+
+blp = Blueprint("catalog", __name__, description="Catalog import and export.")
+
+CONTENT_TYPES = {"text/csv": "csv", "application/x-ndjson": "ndjson"}
+MIMETYPES = {fmt: mimetype for mimetype, fmt in CONTENT_TYPES.items()}
+
+
+@blp.route("/catalog/import")
+class CatalogImport(MethodView):
+    @jwt_required()
+    @blp.arguments(CatalogImportArgsSchema, location="query")
+    @blp.response(200, CatalogImportReportSchema)
+    @blp.alt_response(
+        202,
+        schema=JobSchema,
+        description="With async=true, the body is imported by a background job, "
+        "poll the job in the Location header.",
+    )
+    def post(self, args):
+        """
+        Upserts items (by name and store), their tags and links from a CSV
+        (store_id,item_name,item_price,tags with tags separated by |) or
+        NDJSON body, read as a stream and committed in chunks.
+        """
+        fmt = args.get("format") or CONTENT_TYPES.get(request.mimetype)
+        if fmt is None:
+            abort(415, message="Send text/csv or application/x-ndjson, or pass ?format=.")
+
+        if args["run_async"]:
+            spool_dir = current_app.config.get("IMPORT_SPOOL_DIR") or os.path.join(
+                current_app.instance_path, "imports"
+            )
+            os.makedirs(spool_dir, exist_ok=True)
+            path = os.path.join(spool_dir, f"{uuid.uuid4().hex}.{fmt}")
+            with open(path, "wb") as spool:
+                shutil.copyfileobj(request.stream, spool)
+            job_id = submit_job("import_catalog", path=path, format=fmt)
+            location = url_for("jobs.Job", job_id=job_id)
+            return JobSchema().dump(get_job(job_id)), 202, {"Location": location}
+
+        try:
+            return import_catalog(request.stream, fmt)
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            abort(500, message="Database Error: " + str(e))
+
+
+@blp.route("/catalog/export")
+class CatalogExport(MethodView):
+    @jwt_required()
+    @blp.arguments(CatalogExportArgsSchema, location="query")
+    @blp.response(200, description="One row per item: store, item and tag names, streamed as CSV or NDJSON.")
+    def get(self, args):
+        """
+        Streams every item (or one store's) with its store and tag names, in
+        the format POST /catalog/import reads. Rows are written as they are
+        read, in batches of EXPORT_BATCH_SIZE items, so memory does not grow
+        with the catalog.
+        """
+        fmt = args["format"]
+        rows = export_rows(args.get("store_id"), current_app.config.get("EXPORT_BATCH_SIZE", 1000))
+        chunks = encode_rows(rows, fmt)
+        mimetype, filename = MIMETYPES[fmt], f"catalog.{fmt}"
+        if args["gzip"]:
+            # a .gz file to save as is: with Content-Encoding, clients would decompress it on the way
+            chunks, mimetype, filename = gzip_chunks(chunks), "application/gzip", f"{filename}.gz"
+        headers = {"Content-Disposition": f"attachment; filename={filename}"}
+        return Response(stream_with_context(chunks), mimetype=mimetype, headers=headers)
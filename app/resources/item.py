@@ -1,23 +1,38 @@
+from flask import current_app
 from flask.views import MethodView
 from flask_smorest import Blueprint, abort
+from marshmallow import ValidationError
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
+from sqlalchemy.orm import joinedload, selectinload
 from flask_jwt_extended import jwt_required
 
+from app.bulk import commit_bulk, insert_items, request_rows, upsert_rows, upsert_statement
 from app.db import db
 from app.models import ItemModel
-from app.schemas import ItemSchema, ItemUpdateSchema
+from app.pagination import keyset_page
+from app.response_cache import cached
+from app.schemas import (
+    ItemSchema, ItemUpdateSchema, ItemUpsertSchema, CursorPageArgsSchema, BulkItemArgsSchema,
+    BulkItemResponseSchema
+)
 
 
 blp = Blueprint("items", __name__, description="Operations on items")
 
+# loads what ItemSchema dumps (store, tags) in a fixed number of queries
+ITEM_SCHEMA_OPTIONS = (joinedload(ItemModel.store), selectinload(ItemModel.tags))
+
 
 # /item
 @blp.route("/item")
 class ItemList(MethodView):
+    @blp.arguments(CursorPageArgsSchema, location="query")
     @blp.response(200, ItemSchema(many=True))
-    def get(self):
-        items = ItemModel.query.all()
-        return items
+    def get(self, page_args):
+        items, headers = keyset_page(
+            ItemModel.query.options(*ITEM_SCHEMA_OPTIONS), ItemModel.item_id, page_args
+        )
+        return items, headers
 
     
     @jwt_required()
@@ -40,14 +55,69 @@ class ItemList(MethodView):
             abort(500, message="Database Error: " + str(e.orig))
         return item
 
+    @jwt_required()
+    @blp.arguments(BulkItemArgsSchema, location="query")
+    @blp.response(200, BulkItemResponseSchema)
+    @blp.alt_response(409, schema=BulkItemResponseSchema, description="atomic=true and a row was rejected.")
+    @blp.alt_response(413, description="More than BULK_MAX_ROWS rows.")
+    def put(self, args):
+        """
+        Creates or replaces items by item_id from a JSON array or an NDJSON
+        body, with one INSERT ... ON CONFLICT DO UPDATE per chunk. Each row
+        gets a result: created, updated, conflict (name taken in the store)
+        or invalid_store.
+        """
+        rows = request_rows(current_app.config["BULK_MAX_ROWS"])
+        try:
+            rows = ItemUpsertSchema(many=True).load(rows)
+        except ValidationError as e:
+            abort(422, errors={"json": e.messages})
+
+        try:
+            results = upsert_rows(
+                ItemModel, rows, ("item_name", "store_id"), current_app.config["BULK_CHUNK_SIZE"], check_store=True
+            )
+            return commit_bulk(results, args["atomic"])
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            abort(500, message="Database Error: " + str(e))
+
+
+# /item/bulk
+@blp.route("/item/bulk")
+class ItemBulk(MethodView):
+    @jwt_required()
+    @blp.arguments(BulkItemArgsSchema, location="query")
+    @blp.response(200, BulkItemResponseSchema)
+    @blp.alt_response(409, schema=BulkItemResponseSchema, description="atomic=true and a row was rejected.")
+    @blp.alt_response(413, description="More than BULK_MAX_ROWS rows.")
+    def post(self, args):
+        """
+        Creates items from a JSON array or an NDJSON body of ItemSchema rows,
+        in one transaction. Each row gets a result: created (with its
+        item_id), conflict (name taken in the store) or invalid_store.
+        """
+        rows = request_rows(current_app.config["BULK_MAX_ROWS"])
+        try:
+            rows = ItemSchema(many=True).load(rows)
+        except ValidationError as e:
+            abort(422, errors={"json": e.messages})
+
+        try:
+            results = insert_items(rows, current_app.config["BULK_CHUNK_SIZE"])
+            return commit_bulk(results, args["atomic"], generated_key="item_id")
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            abort(500, message="Database Error: " + str(e))
 
 
 # /item/<item_id>
 @blp.route("/item/<int:item_id>")
 class Store(MethodView):
+    @cached
     @blp.response(200, ItemSchema)
     def get(self, item_id):
-        item = ItemModel.query.get_or_404(item_id)
+        item = ItemModel.query.options(*ITEM_SCHEMA_OPTIONS).get_or_404(item_id)
         return item
 
     def delete(self, item_id):
@@ -60,16 +130,22 @@ class Store(MethodView):
     @blp.arguments(ItemUpdateSchema)
     @blp.response(200, ItemSchema)
     def put(self, item_data, item_id):
-        item = ItemModel.query.get(item_id)
-        if item:
-            for field in ["item_name", "item_price", "store_id"]:
-                if field in item_data:
-                    setattr(item, field, item_data[field])
+        # one statement: an upsert for a whole item, an UPDATE for some fields
+        if all(field in item_data for field in ("item_name", "item_price", "store_id")):
+            statement = upsert_statement(ItemModel, item_data).values(item_id=item_id, **item_data)
+        elif item_data:
+            statement = db.update(ItemModel).where(ItemModel.item_id == item_id).values(**item_data)
         else:
-            item = ItemModel(item_id=item_id, **item_data)
-            db.session.add(item)
+            statement = db.select(ItemModel).where(ItemModel.item_id == item_id)
 
         try:
+            if not statement.is_select:
+                statement = statement.returning(ItemModel)
+            # the old store's response shows the item, so item_id covers it
+            invalidates = {f"item_id:{item_id}", f"store_id:{item_data.get('store_id')}"}
+            item = db.session.scalars(
+                statement, execution_options={"populate_existing": True, "cache_invalidates": tuple(invalidates)}
+            ).one_or_none()
             db.session.commit()
         except IntegrityError as e:
             db.session.rollback()
@@ -77,13 +153,10 @@ class Store(MethodView):
                 abort(409, message="This item already exists in this store.")
             elif "FOREIGN KEY constraint" in str(e.orig):
                 abort(409, message="Store referenced does not exist.")
-            elif "NOT NULL constraint" in str(e.orig):
-                abort(
-                    409,
-                    message="This item does not exist neither can be created due to invalid load"
-                )
             abort(400, message="Database Integrity Error: " + str(e.orig))
 
+        if item is None:
+            abort(409, message="This item does not exist neither can be created due to invalid load")
         return item
 
 
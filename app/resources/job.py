@@ -0,0 +1,20 @@
+from flask.views import MethodView
+from flask_smorest import Blueprint, abort
+
+from app.jobs import get_job
+from app.schemas import JobSchema
+
+
+blp = Blueprint("jobs", __name__, description="Status of background jobs.")
+
+
+@blp.route("/jobs/<string:job_id>")
+class Job(MethodView):
+    @blp.response(200, JobSchema)
+    @blp.alt_response(404, description="Job not found.", example={"message": "Job not found."})
+    def get(self, job_id):
+        """Status, progress and, once it has finished, the result or error of a job."""
+        job = get_job(job_id)
+        if job is None:
+            abort(404, message="Job not found.")
+        return job
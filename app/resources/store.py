@@ -1,11 +1,20 @@
+from flask import current_app, url_for
 from flask.views import MethodView
 from flask_smorest import Blueprint, abort
+from marshmallow import ValidationError
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from flask_jwt_extended import jwt_required
 
+from app.bulk import commit_bulk, request_rows, upsert_rows, upsert_statement
 from app.db import db
-from app.models import StoreModel
-from app.schemas import StoreSchema, StoreUpdateSchema, PlainStoreSchema
+from app.jobs import job_handler, submit_job, get_job
+from app.models import StoreModel, ItemModel, TagModel
+from app.pagination import keyset_page
+from app.response_cache import cached
+from app.schemas import (
+    StoreSchema, StoreUpdateSchema, PlainStoreSchema, CursorPageArgsSchema, StoreDeleteArgsSchema, JobSchema,
+    StoreUpsertSchema, BulkItemArgsSchema, BulkStoreResponseSchema
+)
 
 
 blp = Blueprint("stores", __name__, description="Operations on stores")
@@ -14,10 +23,11 @@ blp = Blueprint("stores", __name__, description="Operations on stores")
 # /store
 @blp.route("/store")
 class StoreList(MethodView):
+    @blp.arguments(CursorPageArgsSchema, location="query")
     @blp.response(200, PlainStoreSchema(many=True))
-    def get(self):
-        stores = StoreModel.query.all()
-        return stores
+    def get(self, page_args):
+        stores, headers = keyset_page(StoreModel.query, StoreModel.store_id, page_args)
+        return stores, headers
 
     @jwt_required()
     @blp.arguments(PlainStoreSchema)
@@ -39,17 +49,55 @@ class StoreList(MethodView):
 
         return new_store
 
+    @jwt_required()
+    @blp.arguments(BulkItemArgsSchema, location="query")
+    @blp.response(200, BulkStoreResponseSchema)
+    @blp.alt_response(409, schema=BulkStoreResponseSchema, description="atomic=true and a row was rejected.")
+    @blp.alt_response(413, description="More than BULK_MAX_ROWS rows.")
+    def put(self, args):
+        """
+        Creates or renames stores by store_id from a JSON array or an NDJSON
+        body, with one INSERT ... ON CONFLICT DO UPDATE per chunk. Each row
+        gets a result: created, updated or conflict (name taken).
+        """
+        rows = request_rows(current_app.config["BULK_MAX_ROWS"])
+        try:
+            rows = StoreUpsertSchema(many=True).load(rows)
+        except ValidationError as e:
+            abort(422, errors={"json": e.messages})
+
+        try:
+            results = upsert_rows(StoreModel, rows, ("store_name",), current_app.config["BULK_CHUNK_SIZE"])
+            return commit_bulk(results, args["atomic"])
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            abort(500, message="Database Error: " + str(e))
+
 
 # /store/<store_id>
 @blp.route("/store/<int:store_id>")
 class Store(MethodView):
+    @cached
     @blp.response(200, StoreSchema)
     def get(self, store_id):
         store = StoreModel.query.get_or_404(store_id)
         return store
 
-    def delete(self, store_id):
+    @blp.arguments(StoreDeleteArgsSchema, location="query")
+    @blp.alt_response(
+        202,
+        schema=JobSchema,
+        description="With async=true, the store is deleted by a background job, "
+        "poll the job in the Location header.",
+    )
+    def delete(self, args, store_id):
         store = StoreModel.query.get_or_404(store_id)
+        if args["run_async"]:
+            job_id = submit_job("delete_store", store_id=store_id)
+            location = url_for("jobs.Job", job_id=job_id)
+            return JobSchema().dump(get_job(job_id)), 202, {"Location": location}
+
+        # one DELETE, the database cascades to items, tags and item_tag
         db.session.delete(store)
         db.session.commit()
         return {"message": "Store deleted"}, 200
@@ -57,13 +105,13 @@ class Store(MethodView):
     @blp.arguments(StoreUpdateSchema)
     @blp.response(200, StoreSchema)
     def put(self, store_data, store_id):
-        store = StoreModel.query.get(store_id)
-        if store:
-            store.store_name = store_data["store_name"]
-        else:
-            store = StoreModel(store_id=store_id, **store_data)
-            db.session.add(store)
+        # one INSERT ... ON CONFLICT DO UPDATE, whether the store exists or not
+        statement = upsert_statement(StoreModel, store_data).values(store_id=store_id, **store_data)
         try:
+            store = db.session.scalars(
+                statement.returning(StoreModel),
+                execution_options={"populate_existing": True, "cache_invalidates": (f"store_id:{store_id}",)},
+            ).one()
             db.session.commit()
         except IntegrityError as e:
                 db.session.rollback()
@@ -71,3 +119,34 @@ class Store(MethodView):
                     abort(409, message="A store with this name already exists.")
                 abort(400, message="Database constraint violated: " + str(e.orig))
         return store
+
+
+@job_handler("delete_store")
+def delete_store_job(params, progress):
+    """
+    Deletes the store's items JOBS_CHUNK_SIZE at a time, one commit per
+    chunk (item_tag rows cascade), then its tags and the store itself.
+    """
+    store_id = params["store_id"]
+    chunk_size = current_app.config.get("JOBS_CHUNK_SIZE", 5000)
+    total = db.session.scalar(
+        db.select(db.func.count()).select_from(ItemModel).where(ItemModel.store_id == store_id)
+    )
+    progress(0, total)
+
+    deleted = 0
+    while True:
+        item_ids = db.session.scalars(
+            db.select(ItemModel.item_id).where(ItemModel.store_id == store_id).limit(chunk_size)
+        ).all()
+        if not item_ids:
+            break
+        db.session.execute(db.delete(ItemModel).where(ItemModel.item_id.in_(item_ids)))
+        db.session.commit()
+        deleted += len(item_ids)
+        progress(deleted, total)
+
+    tags = db.session.execute(db.delete(TagModel).where(TagModel.store_id == store_id)).rowcount
+    stores = db.session.execute(db.delete(StoreModel).where(StoreModel.store_id == store_id)).rowcount
+    db.session.commit()
+    return {"store_id": store_id, "store_deleted": bool(stores), "items_deleted": deleted, "tags_deleted": tags}
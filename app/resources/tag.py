@@ -1,14 +1,23 @@
 from flask.views import MethodView
 from flask_smorest import Blueprint, abort
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
+from sqlalchemy.orm import joinedload, selectinload
 
 from app.db import db
-from app.models import TagModel, StoreModel, ItemModel
-from app.schemas import TagSchema, PlainTagSchema, ItemSchema, TagAndItemSchema
+from app.models import TagModel, StoreModel, ItemModel, ItemTagModel
+from app.pagination import keyset_page
+from app.response_cache import cached
+from app.schemas import (
+    TagSchema, PlainTagSchema, ItemSchema, TagAndItemSchema, CursorPageArgsSchema, TagDeleteArgsSchema,
+    TagIdsSchema, ItemIdsSchema, BatchLinkSchema
+)
 
 
 blp = Blueprint("tags", __name__, description="Operations on tags.")
 
+# loads what TagSchema dumps (store, items) in a fixed number of queries
+TAG_SCHEMA_OPTIONS = (joinedload(TagModel.store), selectinload(TagModel.items))
+
 
 @blp.route("/store/<int:store_id>/tag")
 class TagsInStore(MethodView):
@@ -43,23 +52,29 @@ class TagsInStore(MethodView):
 
 @blp.route("/tag")
 class TagList(MethodView):
+    @blp.arguments(CursorPageArgsSchema, location="query")
     @blp.response(200, TagSchema(many=True))
-    def get(self):
-        tags = TagModel.query.all()
-        return tags
+    def get(self, page_args):
+        tags, headers = keyset_page(
+            TagModel.query.options(*TAG_SCHEMA_OPTIONS), TagModel.tag_id, page_args
+        )
+        return tags, headers
 
 
 @blp.route("/tag/<int:tag_id>")
 class Tag(MethodView):
+    @cached
     @blp.response(200, TagSchema)
     def get(self, tag_id):
-        tag =TagModel.query.get_or_404(tag_id)
+        tag = TagModel.query.options(*TAG_SCHEMA_OPTIONS).get_or_404(tag_id)
         return tag
     
+    @blp.arguments(TagDeleteArgsSchema, location="query")
     @blp.response(
         202,
-        description="Deletes a tag if no item is tagged with it.",
-        example={"message": "Tag deleted."},
+        description="Deletes a tag if no item is tagged with it, "
+        "with force=true unlinks its items first.",
+        example={"message": "Tag deleted.", "unlinked": 0},
     )
     @blp.alt_response(
         404,
@@ -70,22 +85,47 @@ class Tag(MethodView):
         400,
         description="tag is not deleted, unlink item/s first.",
     )
-    def delete(self, tag_id):
-        tag = TagModel.query.get_or_404(tag_id)
-
-        if not tag.items:
-            db.session.delete(tag)
+    def delete(self, args, tag_id):
+        TagModel.query.get_or_404(tag_id)
+
+        # a bounded EXISTS instead of loading tag.items
+        linked = db.session.query(
+            db.select(ItemTagModel).where(ItemTagModel.tag_id == tag_id).exists()
+        ).scalar()
+        if linked and not args["force"]:
+            abort(
+                400,
+                message="tag is not deleted, unlink item/s first."  # noqa: E501
+            )
+
+        # set-based, so the ORM never loads the tag's items to clear the links
+        try:
+            # the items' responses show the tag, so tag_id covers them
+            invalidates = {"cache_invalidates": (f"tag_id:{tag_id}",)}
+            unlinked = 0
+            if linked:
+                unlinked = db.session.execute(
+                    db.delete(ItemTagModel).where(ItemTagModel.tag_id == tag_id), execution_options=invalidates
+                ).rowcount
+            db.session.execute(db.delete(TagModel).where(TagModel.tag_id == tag_id), execution_options=invalidates)
             db.session.commit()
-            return {"message": "Tag deleted."}
-        abort(
-            400,
-            message="tag is not deleted, unlink item/s first."  # noqa: E501
-        )
+        except IntegrityError:
+            # an item was linked after the check
+            db.session.rollback()
+            abort(400, message="tag is not deleted, unlink item/s first.")
+        except SQLAlchemyError as e:
+            abort(500, message="Database Error: " + str(e))
+        return {"message": "Tag deleted.", "unlinked": unlinked}
 
 
 @blp.route("/item/<int:item_id>/tag/<int:tag_id>")
 class ItemTag(MethodView):
     @blp.response(201, ItemSchema)
+    @blp.alt_response(
+        409,
+        description="Item is already linked to the tag.",
+        example={"message": "Item is already linked to Furniture."},
+    )
     def post(self, item_id, tag_id):
         item = ItemModel.query.get_or_404(item_id)
         tag = TagModel.query.get_or_404(tag_id)
@@ -94,30 +134,113 @@ class ItemTag(MethodView):
         if tag.store_id != item.store_id:
             abort(400, message="item and tag must be in the same store.")
 
-        item.tags.append(tag)
-        #TODO: linking the same item twice should raise 409 conflict
+        # one association row, the item's other tags are never loaded
         try:
+            linked = ItemTagModel.link(item_id, tag_id)
             db.session.commit()
         except SQLAlchemyError as e:
             abort(500, message="Database Error: " + str(e))
+        if not linked:
+            abort(409, message=f"Item is already linked to {tag.tag_name}.")
         return item
 
     @blp.response(200, TagAndItemSchema)
-    def delete(sefl, item_id, tag_id):
+    def delete(self, item_id, tag_id):
         item = ItemModel.query.get_or_404(item_id)
         tag = TagModel.query.get_or_404(tag_id)
 
         try:
-            item.tags.remove(tag)
+            unlinked = ItemTagModel.unlink(item_id, tag_id)
             db.session.commit()
-        except ValueError as e:
-            abort(400, message=f"Item is not linked to {tag.tag_name}")
         except SQLAlchemyError as e:
             abort(500, message="Database Error: " + str(e))
-        
+        if not unlinked:
+            abort(400, message=f"Item is not linked to {tag.tag_name}")
+
         message = "Tag was unlinked from item successfully"
 
         return {"message": message, "tag": tag, "item": item}
 
+
+@blp.route("/item/<int:item_id>/tags")
+class ItemTags(MethodView):
+    @blp.arguments(TagIdsSchema)
+    @blp.response(200, BatchLinkSchema)
+    def post(self, data, item_id):
+        """
+        Links the item to every tag of tag_ids in one statement. Tags that do
+        not exist, belong to another store or are linked already are skipped.
+        """
+        store_id = db.session.scalar(db.select(ItemModel.store_id).where(ItemModel.item_id == item_id))
+        if store_id is None:
+            abort(404, message="Item not found.")
+
+        # store and existing link of every tag in one query
+        candidates = db.session.execute(
+            db.select(TagModel.tag_id, TagModel.store_id, ItemTagModel.item_id.is_not(None))
+            .outerjoin(
+                ItemTagModel,
+                (ItemTagModel.tag_id == TagModel.tag_id) & (ItemTagModel.item_id == item_id),
+            )
+            .where(TagModel.tag_id.in_(data["tag_ids"]))
+        ).tuples()
+        return _link_batch(
+            data["tag_ids"], store_id, candidates, lambda tag_id: (item_id, tag_id), lambda pair: pair[1]
+        )
+
+
+@blp.route("/tag/<int:tag_id>/items")
+class TagItems(MethodView):
+    @blp.arguments(ItemIdsSchema)
+    @blp.response(200, BatchLinkSchema)
+    def post(self, data, tag_id):
+        """
+        Links every item of item_ids to the tag in one statement. Items that
+        do not exist, belong to another store or are linked already are skipped.
+        """
+        store_id = db.session.scalar(db.select(TagModel.store_id).where(TagModel.tag_id == tag_id))
+        if store_id is None:
+            abort(404, message="Tag not found.")
+
+        candidates = db.session.execute(
+            db.select(ItemModel.item_id, ItemModel.store_id, ItemTagModel.tag_id.is_not(None))
+            .outerjoin(
+                ItemTagModel,
+                (ItemTagModel.item_id == ItemModel.item_id) & (ItemTagModel.tag_id == tag_id),
+            )
+            .where(ItemModel.item_id.in_(data["item_ids"]))
+        ).tuples()
+        return _link_batch(
+            data["item_ids"], store_id, candidates, lambda item_id: (item_id, tag_id), lambda pair: pair[0]
+        )
+
+
+def _link_batch(ids, store_id, candidates, pair_for, id_of):
+    """
+    Links the ids whose candidate row (id, store_id, already linked) is in
+    `store_id` and not linked yet, and reports the others as skipped.
+    """
+    found = {candidate_id: (candidate_store, linked) for candidate_id, candidate_store, linked in candidates}
+    skipped, pairs = [], []
+    for candidate_id in dict.fromkeys(ids):
+        if candidate_id not in found:
+            skipped.append({"id": candidate_id, "reason": "not_found"})
+        elif found[candidate_id][0] != store_id:
+            skipped.append({"id": candidate_id, "reason": "other_store"})
+        elif found[candidate_id][1]:
+            skipped.append({"id": candidate_id, "reason": "already_linked"})
+        else:
+            pairs.append(pair_for(candidate_id))
+
+    try:
+        created = ItemTagModel.link_all(pairs)
+        db.session.commit()
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        abort(500, message="Database Error: " + str(e))
+
+    # linked by a concurrent request between the lookup and the insert
+    skipped += [{"id": id_of(pair), "reason": "already_linked"} for pair in pairs if pair not in created]
+    return {"linked": [id_of(pair) for pair in pairs if pair in created], "skipped": skipped}
+
 # TODO: re-consider error handling (using error message is db specific)
-# alos, consider race condition
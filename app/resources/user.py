@@ -1,10 +1,17 @@
 from flask.views import MethodView
 from flask_smorest import Blueprint, abort
-from passlib.hash import pbkdf2_sha256
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt
-
+from flask_jwt_extended import (
+    create_access_token,
+    create_refresh_token,
+    get_jwt,
+    get_jwt_identity,
+    jwt_required,
+)
+
+from ..auth_cache import is_admin
 from ..blocklist import BLOCKLIST
 from ..db import db
+from ..hashing import PasswordHasherBusy, hash_password, verify_password, password_needs_rehash
 from ..schemas import UserSchema
 from ..models import UserModel
 
@@ -23,7 +30,7 @@ class UserRegister(MethodView):
 
         user = UserModel(
             username=user_data["username"],
-            password=pbkdf2_sha256.hash(user_data["password"])
+            password=hash_password(user_data["password"])
         )
         db.session.add(user)
         db.session.commit()
@@ -42,7 +49,7 @@ class AdminRegister(MethodView):
             abort(409, message="A user with the given username already exists.")
         
         admin = UserModel(username=admin_data["username"],
-            password=pbkdf2_sha256.hash(admin_data["password"]), 
+            password=hash_password(admin_data["password"]), 
             is_admin=True)
 
         db.session.add(admin)
@@ -58,19 +65,47 @@ class UserLogin(MethodView):
             UserModel.username == user_data["username"]
         ).first()
 
-        if user and pbkdf2_sha256.verify(user_data["password"], user.password):
+        if user and verify_password(user_data["password"], user.password):
+            # move old hashes to the configured rounds while we have the password
+            if password_needs_rehash(user.password):
+                try:
+                    user.password = hash_password(user_data["password"])
+                    db.session.commit()
+                except PasswordHasherBusy:
+                    # the password was right: the upgrade waits for a quieter login
+                    pass
             access_token = create_access_token(identity=str(user.user_id))
-            return {"access_token": access_token}, 200
+            refresh_token = create_refresh_token(identity=str(user.user_id))
+            return {"access_token": access_token, "refresh_token": refresh_token}, 200
         
         abort(401, message="Invalid credentials.")
 
 
+@blp.route("/refresh")
+class TokenRefresh(MethodView):
+    @jwt_required(refresh=True)
+    def post(self):
+        """
+        Trades a refresh token for a new access and refresh token pair,
+        no password check. The used refresh token is revoked (rotation).
+        The user must still exist, and the admin claim is read again.
+        """
+        jwt = get_jwt()
+        # 404 for a deleted user, from the cache (no pbkdf2, no query while warm)
+        is_admin(get_jwt_identity())
+        access_token = create_access_token(identity=get_jwt_identity())
+        refresh_token = create_refresh_token(identity=get_jwt_identity())
+        BLOCKLIST.add(jwt["jti"], jwt["exp"])
+        return {"access_token": access_token, "refresh_token": refresh_token}, 200
+
+
 @blp.route("/logout")
 class UserLogout(MethodView):
-    @jwt_required()
+    # revokes whichever token is sent, access or refresh
+    @jwt_required(verify_type=False)
     def post(self):
-        jti = get_jwt().get("jti")
-        BLOCKLIST.add(jti)
+        jwt = get_jwt()
+        BLOCKLIST.add(jwt["jti"], jwt["exp"])
         return {"message": "Successfully logged out"}, 200
 
 
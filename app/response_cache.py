@@ -0,0 +1,743 @@
+import contextlib
+import fcntl
+import functools
+import hashlib
+import json
+import mmap
+import os
+import sqlite3
+import struct
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app, g, has_app_context, request
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import TextClause
+
+from .models import ItemModel, ItemTagModel, StoreModel, TagModel
+
+# ids in a response body that make it depend on that row
+DEPENDENCY_KEYS = ("store_id", "item_id", "tag_id")
+
+# model -> its columns that cached responses depend on
+WATCHED = {
+    ItemModel: ("item_id", "store_id"),
+    StoreModel: ("store_id",),
+    TagModel: ("tag_id", "store_id"),
+    ItemTagModel: ("item_id", "tag_id"),
+}
+WATCHED_TABLES = {model.__tablename__ for model in WATCHED}
+
+# invalidates every entry, for writes whose rows are not known
+EVERYTHING = "*"
+
+
+class MemoryResponseCache:
+    """
+    Serialized responses of this process, least recently used first out,
+    bounded by `maxsize` entries and `max_bytes` of bodies. Each entry
+    keeps the "column:id" dependencies of its body, so a write drops the
+    responses that show the rows it changed and nothing else.
+
+    With `replica_lag`, the time of each invalidation is kept that long:
+    a response read from a replica that may not have caught up yet with
+    the write is not stored.
+    """
+
+    def __init__(self, maxsize=4096, max_bytes=64 * 1024 * 1024, ttl=60, replica_lag=0):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.replica_lag = replica_lag
+        self.generation = 0
+        self._entries = OrderedDict()
+        # dependency -> time of its last invalidation, oldest first
+        self._invalidated = OrderedDict()
+        self._keys_by_dependency = {}
+        self._bytes = 0
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """(body, mimetype), None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[3] <= time.time():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self._counters["misses"] += 1
+                return None
+            self._counters["hits"] += 1
+            self._entries.move_to_end(key)
+            return entry[0], entry[1]
+
+    def set(self, key, body, mimetype, dependencies, generation, replica=False):
+        """
+        Stores a response read at `generation`, unless a write invalidated
+        something since, or, read from a replica, one of its dependencies
+        within the last `replica_lag` seconds.
+        """
+        if self.maxsize <= 0 or len(body) > self.max_bytes:
+            return
+        with self._lock:
+            if generation != self.generation:
+                return
+            if replica and self.replica_lag > 0:
+                settled = time.time() - self.replica_lag
+                if any(self._invalidated.get(dependency, 0) > settled for dependency in (*dependencies, EVERYTHING)):
+                    return
+            self._remove(key)
+            self._entries[key] = (body, mimetype, dependencies, time.time() + self.ttl)
+            self._bytes += len(body)
+            for dependency in dependencies:
+                self._keys_by_dependency.setdefault(dependency, set()).add(key)
+            while len(self._entries) > self.maxsize or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self._counters["evictions"] += 1
+
+    def invalidate(self, dependencies):
+        with self._lock:
+            self.generation += 1
+            if self.replica_lag > 0:
+                now = time.time()
+                for dependency in dependencies:
+                    self._invalidated.pop(dependency, None)
+                    self._invalidated[dependency] = now
+                while self._invalidated and next(iter(self._invalidated.values())) <= now - self.replica_lag:
+                    self._invalidated.popitem(last=False)
+            if EVERYTHING in dependencies:
+                self._entries.clear()
+                self._keys_by_dependency.clear()
+                self._bytes = 0
+                return
+            for dependency in dependencies:
+                for key in self._keys_by_dependency.pop(dependency, ()):
+                    self._remove(key)
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        body, _, dependencies, _ = entry
+        self._bytes -= len(body)
+        for dependency in dependencies:
+            keys = self._keys_by_dependency.get(dependency)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_dependency[dependency]
+
+    def stats(self):
+        return _stats("memory", len(self), self.maxsize, **self._counters)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteResponseCache:
+    """
+    Serialized responses in a SQLite file shared by every worker on the
+    host, so a write in one worker invalidates the responses cached by all
+    of them. Past `maxsize` entries, the ones closest to expiry go first.
+    Invalidation times are kept `replica_lag` seconds, like in
+    MemoryResponseCache.
+    """
+
+    def __init__(self, path, maxsize=4096, ttl=60, replica_lag=0):
+        self.path = path
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.replica_lag = replica_lag
+        # of this process, the file only holds the entries
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0}
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+
+    def _connection(self):
+        # connections must not cross a fork (gunicorn --preload)
+        if self._conn is None or self._pid != os.getpid():
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    body BLOB NOT NULL,
+                    mimetype TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS ix_responses_expires_at ON responses (expires_at);
+                CREATE TABLE IF NOT EXISTS dependencies (
+                    dependency TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    PRIMARY KEY (dependency, key)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS ix_dependencies_key ON dependencies (key);
+                CREATE TABLE IF NOT EXISTS invalidations (
+                    dependency TEXT PRIMARY KEY,
+                    invalidated_at REAL NOT NULL
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS generation (id INTEGER PRIMARY KEY CHECK (id = 0), value INTEGER NOT NULL);
+                INSERT OR IGNORE INTO generation VALUES (0, 0);
+                """
+            )
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    @property
+    def generation(self):
+        with self._lock:
+            return self._connection().execute("SELECT value FROM generation").fetchone()[0]
+
+    def get(self, key):
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT body, mimetype FROM responses WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+            self._counters["misses" if row is None else "hits"] += 1
+        return None if row is None else (row[0], row[1])
+
+    def set(self, key, body, mimetype, dependencies, generation, replica=False):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if conn.execute("SELECT value FROM generation").fetchone()[0] == generation and not (
+                    replica and self.replica_lag > 0 and self._settling(conn, dependencies)
+                ):
+                    conn.execute(
+                        "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                        (key, body, mimetype, time.time() + self.ttl),
+                    )
+                    conn.execute("DELETE FROM dependencies WHERE key = ?", (key,))
+                    conn.executemany(
+                        "INSERT INTO dependencies VALUES (?, ?)", [(dependency, key) for dependency in dependencies]
+                    )
+                    self._evict(conn)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def _settling(self, conn, dependencies):
+        """Whether one of `dependencies` was invalidated within the last `replica_lag` seconds."""
+        dependencies = (*dependencies, EVERYTHING)
+        marks = ", ".join("?" * len(dependencies))
+        return conn.execute(
+            f"SELECT 1 FROM invalidations WHERE dependency IN ({marks}) AND invalidated_at > ? LIMIT 1",
+            (*dependencies, time.time() - self.replica_lag),
+        ).fetchone() is not None
+
+    def _evict(self, conn):
+        excess = conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0] - self.maxsize
+        if excess > 0:
+            self._counters["evictions"] += excess
+            conn.execute(
+                "CREATE TEMP TABLE IF NOT EXISTS evicted (key TEXT PRIMARY KEY) WITHOUT ROWID"
+            )
+            conn.execute(
+                "INSERT INTO evicted SELECT key FROM responses ORDER BY expires_at LIMIT ?", (excess,)
+            )
+            conn.execute("DELETE FROM responses WHERE key IN (SELECT key FROM evicted)")
+            conn.execute("DELETE FROM dependencies WHERE key IN (SELECT key FROM evicted)")
+            conn.execute("DELETE FROM evicted")
+
+    def invalidate(self, dependencies):
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute("UPDATE generation SET value = value + 1")
+                if self.replica_lag > 0:
+                    now = time.time()
+                    conn.execute("DELETE FROM invalidations WHERE invalidated_at <= ?", (now - self.replica_lag,))
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO invalidations VALUES (?, ?)",
+                        [(dependency, now) for dependency in dependencies],
+                    )
+                if EVERYTHING in dependencies:
+                    conn.execute("DELETE FROM responses")
+                    conn.execute("DELETE FROM dependencies")
+                else:
+                    marks = ", ".join("?" * len(dependencies))
+                    conn.execute(
+                        f"DELETE FROM responses WHERE key IN "
+                        f"(SELECT key FROM dependencies WHERE dependency IN ({marks}))",
+                        tuple(dependencies),
+                    )
+                    conn.execute(
+                        f"DELETE FROM dependencies WHERE key IN "
+                        f"(SELECT key FROM dependencies WHERE dependency IN ({marks}))",
+                        tuple(dependencies),
+                    )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def stats(self):
+        return _stats("sqlite", len(self), self.maxsize, **self._counters)
+
+    def __len__(self):
+        with self._lock:
+            return self._connection().execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+
+def _hash(value):
+    # stable across processes, unlike hash(); never 0, which marks an empty slot
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "little") or 1
+
+
+class MmapResponseCache:
+    """
+    Serialized responses in a fixed-size memory-mapped file shared by every
+    worker on the host (point RESPONSE_CACHE_MMAP_PATH at /dev/shm): a
+    restarted worker starts warm, and a write in one worker invalidates the
+    responses of all of them.
+
+    The file holds `slots` slots of `slot_bytes`, in buckets of WAYS slots
+    picked by key hash, a full bucket evicts its oldest slot. Writers lock
+    one of STRIPES stripes, an fcntl byte-range lock between processes plus
+    a thread lock. Readers take no lock: a slot's sequence number is odd
+    while it is being written, and a read that saw it change is a miss.
+
+    Invalidation bumps the version stamp of each dependency (hashed to one
+    of `stamps`) instead of looking for the entries. An entry is served
+    only while the stamps it was stored with are current, and an epoch
+    bump invalidates every entry at once. Next to each stamp is the time of
+    its last bump, for `replica_lag` (see MemoryResponseCache). Hit, miss
+    and eviction counters are kept per process in the file, so stats()
+    covers every worker.
+    """
+
+    MAGIC = b"RSPCACH2"
+    WAYS = 4
+    STRIPES = 64
+    MAX_PROCESSES = 64
+    # magic, slots, slot bytes, stamps, epoch, generation
+    HEADER = struct.Struct("<8sIIIQQ")
+    # pid, hits, misses, evictions of one process, from offset COUNTERS_OFFSET
+    COUNTERS = struct.Struct("<QQQQ")
+    COUNTERS_OFFSET = 64
+    HITS, MISSES, EVICTIONS = 1, 2, 3
+    HEADER_BYTES = 4096
+    # seq, key hash, epoch, expires at, stored at, key, mimetype, dependency and body lengths
+    SLOT = struct.Struct("<QQQddHHHI")
+    # stamp index, stamp
+    DEPENDENCY = struct.Struct("<IQ")
+    STAMP = struct.Struct("<Q")
+    # time of a stamp's last bump, after the stamps
+    BUMPED_AT = struct.Struct("<d")
+    # fcntl lock offsets, stripes first, then the header lock
+    HEADER_LOCK = STRIPES
+
+    def __init__(self, path, slots=4096, slot_bytes=16384, stamps=65536, ttl=60, replica_lag=0):
+        self.path = path
+        self.slots = max(slots - slots % self.WAYS, self.WAYS)
+        self.slot_bytes = slot_bytes
+        self.stamps = stamps
+        self.ttl = ttl
+        self.replica_lag = replica_lag
+        self._stamps_offset = self.HEADER_BYTES
+        self._bumped_at_offset = self._stamps_offset + stamps * self.STAMP.size
+        self._slots_offset = self._bumped_at_offset + stamps * self.BUMPED_AT.size
+        self._size = self._slots_offset + self.slots * slot_bytes
+        self._pid = None
+
+    def _map(self):
+        # a forked worker maps the file again, with its own locks and counters
+        if self._pid != os.getpid():
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+            fcntl.lockf(fd, fcntl.LOCK_EX, 1, self.HEADER_LOCK)
+            try:
+                expected = (self.MAGIC, self.slots, self.slot_bytes, self.stamps)
+                if (
+                    os.fstat(fd).st_size != self._size
+                    or self.HEADER.unpack(os.pread(fd, self.HEADER.size, 0))[:4] != expected
+                ):
+                    # new file, or one laid out by another configuration: start empty
+                    os.ftruncate(fd, 0)
+                    os.ftruncate(fd, self._size)
+                    os.pwrite(fd, self.HEADER.pack(*expected, 0, 0), 0)
+            finally:
+                fcntl.lockf(fd, fcntl.LOCK_UN, 1, self.HEADER_LOCK)
+            self._fd = fd
+            self._mm = mmap.mmap(fd, self._size)
+            self._locks = [threading.Lock() for _ in range(self.STRIPES + 1)]
+            self._counter_lock = threading.Lock()
+            self._counter_offset = self._claim_counters(fd)
+            self._pid = os.getpid()
+        return self._mm
+
+    @contextlib.contextmanager
+    def _locked(self, stripe):
+        # fcntl locks exclude other processes only, the thread lock the other threads
+        with self._locks[stripe]:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, 1, stripe)
+            try:
+                yield
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, 1, stripe)
+
+    def _claim_counters(self, fd):
+        """Offset of this process's counters: its own slot, a free one or one of a dead process."""
+        mm = self._mm
+        with self._locked(self.HEADER_LOCK):
+            claimed = None
+            for n in range(self.MAX_PROCESSES):
+                offset = self.COUNTERS_OFFSET + n * self.COUNTERS.size
+                pid = self.COUNTERS.unpack_from(mm, offset)[0]
+                if pid == os.getpid():
+                    return offset
+                if claimed is None and (pid == 0 or not _alive(pid)):
+                    claimed = offset
+            # past MAX_PROCESSES, the last slot is shared and its counts are approximate
+            claimed = claimed if claimed is not None else offset
+            # counts of a dead process are kept, the totals stay cumulative
+            _, hits, misses, evictions = self.COUNTERS.unpack_from(mm, claimed)
+            self.COUNTERS.pack_into(mm, claimed, os.getpid(), hits, misses, evictions)
+            return claimed
+
+    def _count(self, field, n=1):
+        # only this process writes its slot, the thread lock is enough
+        with self._counter_lock:
+            counters = list(self.COUNTERS.unpack_from(self._mm, self._counter_offset))
+            counters[field] += n
+            self.COUNTERS.pack_into(self._mm, self._counter_offset, *counters)
+
+    def _header(self):
+        _, _, _, _, epoch, generation = self.HEADER.unpack_from(self._map(), 0)
+        return epoch, generation
+
+    @property
+    def generation(self):
+        return self._header()[1]
+
+    def _stamp(self, index):
+        return self.STAMP.unpack_from(self._mm, self._stamps_offset + index * self.STAMP.size)[0]
+
+    def _bumped_at(self, index):
+        return self.BUMPED_AT.unpack_from(self._mm, self._bumped_at_offset + index * self.BUMPED_AT.size)[0]
+
+    def _bucket(self, key_hash):
+        """(bucket number, slot offsets) of a key."""
+        bucket = key_hash % (self.slots // self.WAYS)
+        first = self._slots_offset + bucket * self.WAYS * self.slot_bytes
+        return bucket, [first + way * self.slot_bytes for way in range(self.WAYS)]
+
+    def _read(self, offset, epoch):
+        """(key, mimetype, body) of a slot that holds a current entry, None otherwise."""
+        mm = self._mm
+        seq, key_hash, slot_epoch, expires_at, _, key_len, mime_len, dependency_count, body_len = (
+            self.SLOT.unpack_from(mm, offset)
+        )
+        if seq & 1 or key_hash == 0 or slot_epoch != epoch or expires_at <= time.time():
+            return None
+        # lengths read mid-write may be garbage: never let them reach past the slot
+        size = self.SLOT.size + dependency_count * self.DEPENDENCY.size + key_len + mime_len + body_len
+        if size > self.slot_bytes:
+            return None
+        start = offset + self.SLOT.size
+        dependencies = [
+            self.DEPENDENCY.unpack_from(mm, start + n * self.DEPENDENCY.size) for n in range(dependency_count)
+        ]
+        start += dependency_count * self.DEPENDENCY.size
+        data = mm[start:start + key_len + mime_len + body_len]
+        if self.STAMP.unpack_from(mm, offset)[0] != seq:
+            # rewritten while we were reading
+            return None
+        if any(index >= self.stamps or self._stamp(index) != stamp for index, stamp in dependencies):
+            return None
+        return key_hash, data[:key_len], data[key_len:key_len + mime_len], data[key_len + mime_len:]
+
+    def get(self, key):
+        epoch, _ = self._header()
+        key_hash, encoded = _hash(key), key.encode()
+        for offset in self._bucket(key_hash)[1]:
+            entry = self._read(offset, epoch)
+            if entry is not None and entry[0] == key_hash and entry[1] == encoded:
+                self._count(self.HITS)
+                return entry[3], entry[2].decode()
+        self._count(self.MISSES)
+        return None
+
+    def set(self, key, body, mimetype, dependencies, generation, replica=False):
+        self._map()
+        key_hash, encoded, mime = _hash(key), key.encode(), mimetype.encode()
+        size = self.SLOT.size + len(dependencies) * self.DEPENDENCY.size + len(encoded) + len(mime) + len(body)
+        if size > self.slot_bytes:
+            return
+        if replica and self.replica_lag > 0:
+            # bump times are written before the generation: if ours is still current, they are visible
+            settled = time.time() - self.replica_lag
+            indexes = [_hash(dependency) % self.stamps for dependency in (*dependencies, EVERYTHING)]
+            if any(self._bumped_at(index) > settled for index in indexes):
+                return
+        number, bucket = self._bucket(key_hash)
+        with self._locked(number % self.STRIPES):
+            mm = self._mm
+            # stamps first, then the generation: see invalidate()
+            indexes = [_hash(dependency) % self.stamps for dependency in dependencies]
+            stamps = [(index, self._stamp(index)) for index in indexes]
+            epoch, current = self._header()
+            if current != generation:
+                return
+
+            target, evicted = None, False
+            for offset in bucket:
+                entry = self._read(offset, epoch)
+                if entry is None or (entry[0] == key_hash and entry[1] == encoded):
+                    target = offset
+                    break
+            if target is None:
+                target = min(bucket, key=lambda offset: self.SLOT.unpack_from(mm, offset)[4])
+                evicted = True
+
+            # odd while writing; a worker killed mid-write leaves it odd, `| 1` recovers from that
+            seq = self.STAMP.unpack_from(mm, target)[0] | 1
+            self.STAMP.pack_into(mm, target, seq)
+            now = time.time()
+            self.SLOT.pack_into(
+                mm, target, seq, key_hash, epoch, now + self.ttl, now,
+                len(encoded), len(mime), len(stamps), len(body),
+            )
+            start = target + self.SLOT.size
+            for index, stamp in stamps:
+                self.DEPENDENCY.pack_into(mm, start, index, stamp)
+                start += self.DEPENDENCY.size
+            mm[start:start + len(encoded) + len(mime) + len(body)] = encoded + mime + body
+            self.STAMP.pack_into(mm, target, seq + 1)
+        if evicted:
+            self._count(self.EVICTIONS)
+
+    def invalidate(self, dependencies):
+        mm = self._map()
+        with self._locked(self.HEADER_LOCK):
+            # the generation goes before the stamps: a set() that still sees the
+            # old generation read the stamps before they are bumped below. The
+            # bump times go before the generation: a set() that sees the new
+            # generation sees them too
+            magic, slots, slot_bytes, stamps, epoch, generation = self.HEADER.unpack_from(mm, 0)
+            if self.replica_lag > 0:
+                now = time.time()
+                for dependency in dependencies:
+                    offset = self._bumped_at_offset + _hash(dependency) % self.stamps * self.BUMPED_AT.size
+                    self.BUMPED_AT.pack_into(mm, offset, now)
+            if EVERYTHING in dependencies:
+                epoch += 1
+            self.HEADER.pack_into(mm, 0, magic, slots, slot_bytes, stamps, epoch, generation + 1)
+            if EVERYTHING not in dependencies:
+                for dependency in dependencies:
+                    offset = self._stamps_offset + _hash(dependency) % self.stamps * self.STAMP.size
+                    self.STAMP.pack_into(mm, offset, self.STAMP.unpack_from(mm, offset)[0] + 1)
+
+    def stats(self):
+        mm = self._map()
+        hits = misses = evictions = 0
+        for n in range(self.MAX_PROCESSES):
+            _, process_hits, process_misses, process_evictions = self.COUNTERS.unpack_from(
+                mm, self.COUNTERS_OFFSET + n * self.COUNTERS.size
+            )
+            hits, misses, evictions = hits + process_hits, misses + process_misses, evictions + process_evictions
+        return _stats("mmap", len(self), self.slots, hits=hits, misses=misses, evictions=evictions)
+
+    def __len__(self):
+        epoch, _ = self._header()
+        return sum(
+            self._read(self._slots_offset + n * self.slot_bytes, epoch) is not None for n in range(self.slots)
+        )
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _stats(backend, entries, capacity, hits, misses, evictions):
+    lookups = hits + misses
+    return {
+        "backend": backend,
+        "entries": entries,
+        "capacity": capacity,
+        "hits": hits,
+        "misses": misses,
+        "evictions": evictions,
+        "hit_ratio": round(hits / lookups, 4) if lookups else None,
+    }
+
+
+def init_app(app):
+    """
+    Response cache of the views decorated with `cached`, backed by
+    RESPONSE_CACHE_BACKEND: "memory" (per process), "mmap" or "sqlite"
+    (shared by the workers of a host) or "none". With a replica, responses
+    read from it are not cached for DB_REPLICA_STICKY_SECONDS after a
+    write to their rows, the lag app/routing.py already allows it.
+    """
+    backend = app.config.get("RESPONSE_CACHE_BACKEND", "memory")
+    maxsize = app.config.get("RESPONSE_CACHE_SIZE", 4096)
+    ttl = app.config.get("RESPONSE_CACHE_TTL", 60)
+    replica_lag = app.config.get("DB_REPLICA_STICKY_SECONDS", 5) if app.config.get("SQLALCHEMY_REPLICA_URI") else 0
+    if backend == "none":
+        return
+    if backend == "memory":
+        cache = MemoryResponseCache(
+            maxsize=maxsize,
+            max_bytes=app.config.get("RESPONSE_CACHE_MAX_BYTES", 64 * 1024 * 1024),
+            ttl=ttl,
+            replica_lag=replica_lag,
+        )
+    elif backend == "sqlite":
+        path = app.config.get("RESPONSE_CACHE_SQLITE_PATH") or os.path.join(app.instance_path, "responses.db")
+        cache = SQLiteResponseCache(path, maxsize=maxsize, ttl=ttl, replica_lag=replica_lag)
+    elif backend == "mmap":
+        path = app.config.get("RESPONSE_CACHE_MMAP_PATH") or os.path.join(app.instance_path, "responses.mmap")
+        cache = MmapResponseCache(
+            path,
+            slots=maxsize,
+            slot_bytes=app.config.get("RESPONSE_CACHE_SLOT_BYTES", 16384),
+            ttl=ttl,
+            replica_lag=replica_lag,
+        )
+    else:
+        raise ValueError(f"Unknown response cache backend: {backend}.")
+    app.extensions["response_cache"] = cache
+
+
+def _cache():
+    if has_app_context():
+        return current_app.extensions.get("response_cache")
+    return None
+
+
+def cache_key():
+    """The endpoint and arguments of the current request."""
+    arguments = json.dumps(request.view_args, sort_keys=True)
+    return f"{request.endpoint}:{arguments}?{request.query_string.decode()}"
+
+
+def dependencies(body):
+    """ "column:id" of every store, item and tag shown in a JSON body."""
+    found = set()
+    pending = [body]
+    while pending:
+        value = pending.pop()
+        if isinstance(value, list):
+            pending.extend(value)
+        elif isinstance(value, dict):
+            for key, nested in value.items():
+                if key in DEPENDENCY_KEYS and isinstance(nested, int):
+                    found.add(f"{key}:{nested}")
+                else:
+                    pending.append(nested)
+    return found
+
+
+def cached(view):
+    """
+    Serves 200 responses of `view` from the response cache, keyed by
+    endpoint and arguments. Goes above @blp.response, so that the
+    serialized body is cached. Adds an X-Cache: HIT or MISS header.
+    Clients kept on the primary after a write (app/routing.py) bypass the
+    cache, so they read their own writes. What the others read from the
+    replica is only cached once it has had time to catch up with the last
+    write to the rows shown.
+    """
+
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        cache = _cache()
+        if cache is None or ("db_replica" in current_app.extensions and not g.get("db_use_replica")):
+            return view(*args, **kwargs)
+
+        key = cache_key()
+        hit = cache.get(key)
+        if hit is not None:
+            response = current_app.response_class(hit[0], 200, mimetype=hit[1])
+            response.headers["X-Cache"] = "HIT"
+            return response
+
+        # a write committed while the view runs must not be overwritten by what it read
+        generation = cache.generation
+        replica = bool(g.get("db_use_replica"))
+        response = view(*args, **kwargs)
+        if response.status_code == 200 and not response.is_streamed:
+            body = response.get_data()
+            cache.set(key, body, response.mimetype, dependencies(json.loads(body)), generation, replica=replica)
+            response.headers["X-Cache"] = "MISS"
+        return response
+
+    return wrapper
+
+
+def _row_dependencies(obj):
+    state = inspect(obj)
+    return {
+        f"{column}:{state.dict[column]}"
+        for column in WATCHED[type(obj)]
+        if state.dict.get(column) is not None
+    }
+
+
+def _invalidate(session, dependencies):
+    cache = _cache()
+    if cache is None or not dependencies:
+        return
+    cache.invalidate(dependencies)
+    # dropped again after commit, a concurrent read may have cached the old rows meanwhile
+    session.info.setdefault("response_cache_invalidated", set()).update(dependencies)
+
+
+@event.listens_for(Session, "after_flush")
+def invalidate_flushed_rows(session, flush_context):
+    found = set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if type(obj) in WATCHED:
+            found |= _row_dependencies(obj)
+    _invalidate(session, found)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def invalidate_statement_rows(orm_execute_state):
+    """
+    INSERT/UPDATE/DELETE statements run with session.execute() bypass the
+    flush. They invalidate the "column:id" strings of their
+    `cache_invalidates` execution option, or the whole cache.
+    """
+    statement = orm_execute_state.statement
+    if isinstance(statement, TextClause):
+        if statement.text.lstrip().upper().startswith("SELECT"):
+            return
+        found = {EVERYTHING}
+    elif not statement.is_dml or statement.table.name not in WATCHED_TABLES:
+        return
+    else:
+        found = set(orm_execute_state.execution_options.get("cache_invalidates", {EVERYTHING}))
+    _invalidate(orm_execute_state.session, found)
+
+
+@event.listens_for(Session, "after_commit")
+def invalidate_committed_rows(session):
+    found = session.info.pop("response_cache_invalidated", None)
+    cache = _cache()
+    if found and cache is not None:
+        cache.invalidate(found)
+
+
+@event.listens_for(Session, "after_rollback")
+def forget_rolled_back_rows(session):
+    session.info.pop("response_cache_invalidated", None)
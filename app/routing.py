@@ -0,0 +1,58 @@
+import time
+
+import sqlalchemy as sa
+from flask import current_app, g, has_request_context, request
+from flask_sqlalchemy.session import Session
+
+from .pooling import engine_options
+
+READ_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+STICKY_COOKIE = "db_primary_until"
+
+
+class RoutingSession(Session):
+    """
+    Sends the reads of read-only requests to the replica engine when one is
+    configured (SQLALCHEMY_REPLICA_URI / DATABASE_REPLICA_URL). Writes, flushes and everything after
+    the first write of a request stay on the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_request_context() and g.get("db_use_replica"):
+            if self._flushing or getattr(clause, "is_dml", False):
+                # read-after-write: the rest of this request reads the primary too
+                g.db_use_replica = False
+            else:
+                return current_app.extensions["db_replica"]
+        return super().get_bind(mapper, clause=clause, bind=bind, **kwargs)
+
+
+def init_app(app):
+    """
+    Picks the bind per request. GET/HEAD/OPTIONS read from the replica
+    unless the client wrote within the last DB_REPLICA_STICKY_SECONDS,
+    which a cookie set on successful writes keeps track of across workers.
+    """
+    replica_url = app.config.get("SQLALCHEMY_REPLICA_URI")
+    if not replica_url:
+        return
+    # not a Flask-SQLAlchemy bind: binds register metadata shared by every app
+    options = engine_options(app.config["SQLALCHEMY_POOL_PROFILE"], replica_url)
+    app.extensions["db_replica"] = sa.create_engine(replica_url, **options)
+    window = app.config.get("DB_REPLICA_STICKY_SECONDS", 5)
+
+    @app.before_request
+    def choose_database():
+        try:
+            primary_until = float(request.cookies.get(STICKY_COOKIE, 0))
+        except ValueError:
+            primary_until = 0
+        g.db_use_replica = request.method in READ_METHODS and time.time() >= primary_until
+
+    @app.after_request
+    def stick_to_primary_after_write(response):
+        if request.method not in READ_METHODS and response.status_code < 400 and window > 0:
+            response.set_cookie(
+                STICKY_COOKIE, f"{time.time() + window:.3f}", max_age=window, httponly=True, samesite="Lax"
+            )
+        return response
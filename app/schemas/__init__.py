@@ -1,5 +1,13 @@
-from .store_schema import (PlainStoreSchema, StoreUpdateSchema, StoreSchema)
-from .item_schema import (PlainItemSchema, ItemUpdateSchema, ItemSchema)
-from .tag_schema import (PlainTagSchema, TagSchema)
+from .store_schema import (
+    PlainStoreSchema, StoreUpdateSchema, StoreSchema, StoreDeleteArgsSchema, StoreUpsertSchema,
+    BulkStoreResponseSchema
+)
+from .item_schema import (
+    PlainItemSchema, ItemUpdateSchema, ItemSchema, ItemUpsertSchema, BulkItemArgsSchema, BulkItemResponseSchema
+)
+from .tag_schema import (PlainTagSchema, TagSchema, TagDeleteArgsSchema)
 from .user_schema import (UserSchema)
-from .shared_schema import (TagAndItemSchema)
+from .shared_schema import (TagAndItemSchema, TagIdsSchema, ItemIdsSchema, BatchLinkSchema)
+from .pagination_schema import (CursorPageArgsSchema)
+from .job_schema import (JobSchema)
+from .catalog_schema import (CatalogImportArgsSchema, CatalogImportReportSchema, CatalogExportArgsSchema)
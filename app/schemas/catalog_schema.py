@@ -0,0 +1,32 @@
+from marshmallow import Schema, fields, validate
+
+
+class CatalogImportArgsSchema(Schema):
+    # defaults to the Content-Type, text/csv or application/x-ndjson
+    format = fields.Str(validate=validate.OneOf(["csv", "ndjson"]))
+    # ?async=true spools the body to disk and imports it in a background job
+    run_async = fields.Bool(data_key="async", load_default=False)
+
+
+class CatalogExportArgsSchema(Schema):
+    format = fields.Str(validate=validate.OneOf(["csv", "ndjson"]), load_default="ndjson")
+    # only the items of this store
+    store_id = fields.Int()
+    gzip = fields.Bool(load_default=False)
+
+
+class CatalogRowErrorSchema(Schema):
+    line = fields.Int(dump_only=True)
+    errors = fields.Raw(dump_only=True)
+
+
+class CatalogImportReportSchema(Schema):
+    rows = fields.Int(dump_only=True)
+    items_upserted = fields.Int(dump_only=True)
+    tags_created = fields.Int(dump_only=True)
+    links_created = fields.Int(dump_only=True)
+    invalid_rows = fields.Int(dump_only=True)
+    invalid_store = fields.Int(dump_only=True)
+    errors = fields.List(fields.Nested(CatalogRowErrorSchema), dump_only=True)
+    seconds = fields.Float(dump_only=True)
+    rows_per_s = fields.Float(dump_only=True)
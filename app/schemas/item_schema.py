@@ -17,3 +17,27 @@ class ItemUpdateSchema(Schema):
 class ItemSchema(PlainItemSchema):
     store = fields.Nested("PlainStoreSchema", dump_only=True)
     tags = fields.List(fields.Nested("PlainTagSchema"), dump_only=True)
+
+
+class ItemUpsertSchema(PlainItemSchema):
+    # PUT /item replaces whole items, by id
+    item_id = fields.Int(required=True)
+
+
+class BulkItemArgsSchema(Schema):
+    # all-or-nothing: any conflict or invalid store rolls the whole request back
+    atomic = fields.Bool(load_default=False)
+
+
+class BulkItemResultSchema(Schema):
+    index = fields.Int(dump_only=True)
+    status = fields.Str(dump_only=True)
+    item_id = fields.Int(dump_only=True, allow_none=True)
+
+
+class BulkItemResponseSchema(Schema):
+    created = fields.Int(dump_only=True)
+    updated = fields.Int(dump_only=True)
+    conflict = fields.Int(dump_only=True)
+    invalid_store = fields.Int(dump_only=True)
+    results = fields.List(fields.Nested(BulkItemResultSchema), dump_only=True)
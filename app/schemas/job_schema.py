@@ -0,0 +1,18 @@
+from marshmallow import Schema, fields
+
+
+class JobProgressSchema(Schema):
+    done = fields.Int(dump_only=True)
+    total = fields.Int(dump_only=True, allow_none=True)
+
+
+class JobSchema(Schema):
+    job_id = fields.Str(dump_only=True)
+    kind = fields.Str(dump_only=True)
+    status = fields.Str(dump_only=True)
+    progress = fields.Nested(JobProgressSchema, dump_only=True)
+    result = fields.Dict(dump_only=True, allow_none=True)
+    error = fields.Str(dump_only=True, allow_none=True)
+    attempts = fields.Int(dump_only=True)
+    created_at = fields.DateTime(dump_only=True)
+    updated_at = fields.DateTime(dump_only=True)
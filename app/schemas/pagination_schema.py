@@ -0,0 +1,27 @@
+from flask import current_app
+from marshmallow import Schema, ValidationError, fields, validates
+
+from app.pagination import decode_cursor
+
+
+class Cursor(fields.Field):
+    """Opaque keyset cursor, loaded as the primary key to resume after."""
+
+    def _deserialize(self, value, attr, data, **kwargs):
+        if not isinstance(value, str):
+            raise ValidationError("Invalid cursor.")
+        try:
+            return decode_cursor(value)
+        except ValueError as e:
+            raise ValidationError(str(e)) from e
+
+
+class CursorPageArgsSchema(Schema):
+    limit = fields.Int()
+    cursor = Cursor()
+
+    @validates("limit")
+    def validate_limit(self, value, **kwargs):
+        max_limit = current_app.config["PAGINATION_MAX_LIMIT"]
+        if not 1 <= value <= max_limit:
+            raise ValidationError(f"Must be between 1 and {max_limit}.")
@@ -1,7 +1,26 @@
-from marshmallow import Schema, fields
+from marshmallow import Schema, fields, validate
 
 
 class TagAndItemSchema(Schema):
     message = fields.Str(dump_only=True)
     item = fields.Nested("PlainItemSchema", dump_only=True)
     tag = fields.Nested("PlainTagSchema", dump_only=True)
+
+
+class TagIdsSchema(Schema):
+    tag_ids = fields.List(fields.Int(), required=True, validate=validate.Length(min=1, max=1000))
+
+
+class ItemIdsSchema(Schema):
+    item_ids = fields.List(fields.Int(), required=True, validate=validate.Length(min=1, max=1000))
+
+
+class SkippedLinkSchema(Schema):
+    id = fields.Int(dump_only=True)
+    # not_found, other_store or already_linked
+    reason = fields.Str(dump_only=True)
+
+
+class BatchLinkSchema(Schema):
+    linked = fields.List(fields.Int(), dump_only=True)
+    skipped = fields.List(fields.Nested(SkippedLinkSchema), dump_only=True)
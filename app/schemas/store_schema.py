@@ -13,3 +13,26 @@ class StoreUpdateSchema(Schema):
 class StoreSchema(PlainStoreSchema):
     items = fields.List(fields.Nested("PlainItemSchema"), dump_only=True)
     tags = fields.List(fields.Nested("PlainTagSchema"), dump_only=True)
+
+
+class StoreUpsertSchema(PlainStoreSchema):
+    # PUT /store replaces whole stores, by id
+    store_id = fields.Int(required=True)
+
+
+class BulkStoreResultSchema(Schema):
+    index = fields.Int(dump_only=True)
+    status = fields.Str(dump_only=True)
+    store_id = fields.Int(dump_only=True)
+
+
+class BulkStoreResponseSchema(Schema):
+    created = fields.Int(dump_only=True)
+    updated = fields.Int(dump_only=True)
+    conflict = fields.Int(dump_only=True)
+    results = fields.List(fields.Nested(BulkStoreResultSchema), dump_only=True)
+
+
+class StoreDeleteArgsSchema(Schema):
+    # ?async=true deletes the store in a background job
+    run_async = fields.Bool(data_key="async", load_default=False)
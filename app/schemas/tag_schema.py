@@ -9,3 +9,7 @@ class PlainTagSchema(Schema):
 class TagSchema(PlainTagSchema):
     store = fields.Nested("PlainStoreSchema", dump_only=True)
     items = fields.List(fields.Nested("PlainItemSchema"), dump_only=True)
+
+
+class TagDeleteArgsSchema(Schema):
+    force = fields.Bool(load_default=False)
@@ -0,0 +1,34 @@
+from sqlalchemy import event
+
+from .db import db
+
+
+def init_app(app):
+    """
+    Runs SQLITE_PRAGMAS on every new connection of the app's SQLite
+    engines (primary and replica), other databases are left alone.
+    """
+    pragmas = app.config.get("SQLITE_PRAGMAS") or {}
+    if not pragmas:
+        return
+
+    with app.app_context():
+        engines = list(db.engines.values())
+    if "db_replica" in app.extensions:
+        engines.append(app.extensions["db_replica"])
+
+    for engine in engines:
+        if engine.dialect.name == "sqlite":
+            event.listen(engine, "connect", _pragma_setter(pragmas))
+
+
+def _pragma_setter(pragmas):
+    statements = [f"PRAGMA {name}={value}" for name, value in pragmas.items()]
+
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for statement in statements:
+            cursor.execute(statement)
+        cursor.close()
+
+    return set_pragmas
@@ -0,0 +1,120 @@
+"""
+Replays the benchmark scenarios, runs every SELECT/UPDATE/DELETE they send
+through EXPLAIN QUERY PLAN (SQLite) or EXPLAIN (Postgres) and reports the
+full table scans per endpoint.
+
+    python -m benchmarks.index_advisor --items 100000
+    python -m benchmarks.index_advisor --db /tmp/bench.db --reuse-db --fail-on-scan
+
+Scans that stop at a LIMIT in index order (first page of a list) are not
+reported, they read `limit` rows, not the table.
+"""
+import argparse
+import os
+import re
+import sys
+import tempfile
+from collections import defaultdict
+
+from sqlalchemy import event
+
+from app.db import db
+
+from .run import build_app, send
+from .scenarios import SCENARIOS, BenchContext
+from .seed import Scale
+
+EXPLAINABLE = ("SELECT", "UPDATE", "DELETE")
+
+
+def capture_statements(app, ctx, scenario, requests):
+    """(statement, parameters) of the queries one scenario sends, deduplicated."""
+    seen = {}
+    recording = False
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if recording and not executemany and statement.lstrip().upper().startswith(EXPLAINABLE):
+            seen.setdefault(statement, parameters)
+
+    client = app.test_client()
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        for _ in range(requests):
+            # setup queries of the scenario are not part of the endpoint
+            kwargs = scenario.request(ctx)
+            recording = True
+            send(client, scenario, kwargs)
+            recording = False
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return seen
+
+
+def full_scans(conn, statement, parameters):
+    """Tables the plan of `statement` reads in full."""
+    bounded = re.search(r"\bLIMIT\b", statement, re.IGNORECASE) is not None
+    if conn.dialect.name == "sqlite":
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+        details = [row[-1] for row in rows]
+        if bounded and not any("TEMP B-TREE" in d for d in details):
+            return []
+        return [
+            d.split()[1] for d in details
+            if d.startswith("SCAN ") and "INDEX" not in d and "CONSTANT ROW" not in d
+        ]
+
+    rows = conn.exec_driver_sql(f"EXPLAIN {statement}", parameters).all()
+    details = [row[0] for row in rows]
+    if bounded and not any("Sort" in d for d in details):
+        return []
+    return [m.group(1) for d in details for m in [re.search(r"Seq Scan on (\w+)", d)] if m]
+
+
+def advise(app, scale, requests=3, scenarios=SCENARIOS):
+    """{endpoint: [(table, statement), ...]} for every endpoint with a full scan."""
+    ctx = BenchContext(app, scale)
+    report = defaultdict(list)
+    for scenario in scenarios:
+        statements = capture_statements(app, ctx, scenario, requests)
+        with app.app_context(), db.engine.connect() as conn:
+            for statement, parameters in statements.items():
+                for table in full_scans(conn, statement, parameters):
+                    report[scenario.name].append((table, " ".join(statement.split())))
+    return dict(report)
+
+
+def main(argv=None):
+    defaults = Scale()
+    parser = argparse.ArgumentParser(description="Report full table scans per endpoint.")
+    parser.add_argument("--stores", type=int, default=defaults.stores)
+    parser.add_argument("--items", type=int, default=defaults.items)
+    parser.add_argument("--tags", type=int, default=defaults.tags)
+    parser.add_argument("--db", default=None, help="SQLite file, a temporary one by default")
+    parser.add_argument("--reuse-db", action="store_true")
+    parser.add_argument("--requests", type=int, default=3)
+    parser.add_argument("--fail-on-scan", action="store_true", help="exit 1 when a full scan is found")
+    args = parser.parse_args(argv)
+
+    scale = Scale(stores=args.stores, items=args.items, tags=args.tags)
+    # without --db, the seeded database lives in a directory removed on exit
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = args.db or os.path.join(tmp, "index-advisor.db")
+        app = build_app(db_path, scale, reuse_db=args.reuse_db)
+        report = advise(app, scale, requests=args.requests)
+        with app.app_context():
+            db.engine.dispose()
+
+    if not report:
+        print("No full table scans.")
+        return 0
+    for endpoint, scans in report.items():
+        print(endpoint)
+        for table, statement in scans:
+            print(f"  SCAN {table}: {statement[:160]}")
+    return 1 if args.fail_on_scan else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,195 @@
+"""
+Endpoint benchmarks against a seeded SQLite database.
+
+    python -m benchmarks.run --items 100000 --baseline benchmarks/baseline.json
+    python -m benchmarks.run --items 100000 --baseline benchmarks/baseline.json --update-baseline
+
+Exits with status 1 when a run regresses past --tolerance compared to the
+baseline, so it can gate a performance change in CI.
+"""
+import argparse
+import json
+import math
+import os
+import secrets
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from sqlalchemy import event, inspect
+
+from app import create_app
+from app.db import db
+
+from .scenarios import SCENARIOS, BenchContext, missing_scenarios
+from .seed import Scale, seed
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(samples)
+    rank = math.ceil(pct / 100 * len(ordered))
+    return ordered[min(max(rank, 1), len(ordered)) - 1]
+
+
+def build_app(db_path, scale, reuse_db=False):
+    app = create_app("testing", db_url=f"sqlite:///{db_path}")
+    app.config["JWT_SECRET_KEY"] = secrets.token_hex(32)
+    with app.app_context():
+        if not (reuse_db and os.path.exists(db_path) and inspect(db.engine).has_table("stores")):
+            db.drop_all()
+            db.create_all()
+            seed(scale)
+    return app
+
+
+def send(client, scenario, kwargs):
+    """
+    Sends one scenario request and reads the whole body, so streamed
+    responses (catalog export) are timed to their last byte and closed.
+    """
+    response = client.open(method=scenario.method, buffered=True, **kwargs)
+    response.close()
+    return response
+
+
+def measure(app, ctx, scenario, requests, memory_samples):
+    client = app.test_client()
+    latencies, queries, errors = [], [], 0
+
+    # counted on the engine: X-Query-Count is sent before a streamed body runs its queries
+    count = [0]
+
+    def record(*args):
+        count[0] += 1
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        for _ in range(requests):
+            kwargs = scenario.request(ctx)
+            count[0] = 0
+            start = time.perf_counter()
+            response = send(client, scenario, kwargs)
+            latencies.append((time.perf_counter() - start) * 1000)
+            queries.append(count[0])
+            if response.status_code >= 400:
+                errors += 1
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    peak = 0
+    tracemalloc.start()
+    try:
+        for _ in range(memory_samples):
+            kwargs = scenario.request(ctx)
+            tracemalloc.reset_peak()
+            send(client, scenario, kwargs)
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "queries": max(queries),
+        "peak_kb": round(peak / 1024, 1),
+        "errors": errors,
+    }
+
+
+def run(app, scale, requests=50, memory_samples=3, scenarios=SCENARIOS):
+    missing = missing_scenarios(app, scenarios)
+    if missing:
+        raise SystemExit(f"No benchmark scenario for: {', '.join(f'{m} {r}' for m, r in missing)}")
+
+    ctx = BenchContext(app, scale)
+    endpoints = {s.name: measure(app, ctx, s, requests, memory_samples) for s in scenarios}
+    return {"scale": scale.as_dict(), "requests": requests, "endpoints": endpoints}
+
+
+def compare(results, baseline, tolerance):
+    """Returns one message per metric that got worse than baseline * (1 + tolerance)."""
+    if results["scale"] != baseline["scale"]:
+        raise SystemExit("Baseline was recorded at a different scale, re-run with --update-baseline.")
+
+    regressions = []
+    for name, current in results["endpoints"].items():
+        previous = baseline["endpoints"].get(name)
+        if previous is None:
+            continue
+        # query counts are deterministic, any increase is a regression
+        if current["queries"] > previous["queries"]:
+            regressions.append(f"{name}: queries {previous['queries']} -> {current['queries']}")
+        for metric in ("p50_ms", "p95_ms", "p99_ms", "peak_kb"):
+            if current[metric] > previous[metric] * (1 + tolerance):
+                regressions.append(f"{name}: {metric} {previous[metric]} -> {current[metric]}")
+        if current["errors"] > previous["errors"]:
+            regressions.append(f"{name}: errors {previous['errors']} -> {current['errors']}")
+    return regressions
+
+
+def print_report(results):
+    print(f"{'endpoint':45} {'p50':>9} {'p95':>9} {'p99':>9} {'queries':>8} {'peak kb':>9} {'errors':>7}")
+    for name, r in results["endpoints"].items():
+        print(
+            f"{name:45} {r['p50_ms']:9.2f} {r['p95_ms']:9.2f} {r['p99_ms']:9.2f} "
+            f"{r['queries']:8} {r['peak_kb']:9.1f} {r['errors']:7}"
+        )
+
+
+def parse_args(argv=None):
+    defaults = Scale()
+    parser = argparse.ArgumentParser(description="Benchmark every API endpoint on a seeded SQLite db.")
+    parser.add_argument("--stores", type=int, default=defaults.stores)
+    parser.add_argument("--items", type=int, default=defaults.items)
+    parser.add_argument("--tags", type=int, default=defaults.tags)
+    parser.add_argument("--links-per-item", type=int, default=defaults.links_per_item)
+    parser.add_argument("--skew", type=float, default=defaults.skew, help="Pareto shape of tag popularity")
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--requests", type=int, default=50, help="timed requests per endpoint")
+    parser.add_argument("--memory-samples", type=int, default=3, help="traced requests per endpoint")
+    parser.add_argument("--db", default=os.path.join(tempfile.gettempdir(), "bench.db"))
+    parser.add_argument("--reuse-db", action="store_true", help="skip seeding if --db already exists")
+    parser.add_argument("--output", help="write results JSON here")
+    parser.add_argument("--baseline", help="baseline JSON to compare against")
+    parser.add_argument("--update-baseline", action="store_true", help="overwrite --baseline with this run")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown, 0.25 = 25%%")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    scale = Scale(
+        stores=args.stores, items=args.items, tags=args.tags,
+        links_per_item=args.links_per_item, skew=args.skew, seed=args.seed,
+    )
+    app = build_app(args.db, scale, reuse_db=args.reuse_db)
+    results = run(app, scale, requests=args.requests, memory_samples=args.memory_samples)
+    print_report(results)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline and (args.update_baseline or not os.path.exists(args.baseline)):
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print("\nRegressions:\n  " + "\n  ".join(regressions))
+            return 1
+        print("\nNo regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,230 @@
+import itertools
+import random
+import uuid
+from dataclasses import dataclass
+from typing import Callable
+
+from flask_jwt_extended import create_access_token, create_refresh_token
+
+from app.db import db
+from app.models import StoreModel, ItemModel, TagModel, UserModel
+
+from .seed import BENCH_PASSWORD
+
+
+class BenchContext:
+    """Seeded ids plus helpers that create fresh rows for destructive scenarios."""
+
+    def __init__(self, app, scale):
+        self.app = app
+        self.scale = scale
+        self.rng = random.Random(scale.seed)
+        self._counter = itertools.count()
+        # keeps names unique when several runs share one db (--reuse-db)
+        self._run_id = uuid.uuid4().hex[:8]
+        with app.app_context():
+            self.user_id = UserModel.query.filter_by(username="bench-user").one().user_id
+            self.admin_id = UserModel.query.filter_by(username="bench-admin").one().user_id
+
+    def unique(self, prefix):
+        return f"{prefix}-{self._run_id}-{next(self._counter)}"
+
+    def store_id(self):
+        return self.rng.randint(1, self.scale.stores)
+
+    def item_id(self):
+        return self.rng.randint(1, self.scale.items)
+
+    def tag_id(self):
+        return self.rng.randint(1, self.scale.tags)
+
+    def headers(self, admin=False, refresh=False):
+        create_token = create_refresh_token if refresh else create_access_token
+        with self.app.app_context():
+            token = create_token(identity=str(self.admin_id if admin else self.user_id))
+        return {"Authorization": f"Bearer {token}"}
+
+    def _add(self, obj, key):
+        with self.app.app_context():
+            db.session.add(obj)
+            db.session.commit()
+            return getattr(obj, key)
+
+    def new_store(self, items=0):
+        with self.app.app_context():
+            store = StoreModel(store_name=self.unique("bench-store"))
+            db.session.add(store)
+            db.session.flush()
+            db.session.add_all([
+                ItemModel(item_name=f"bench-item-{n}", item_price=1.0, store_id=store.store_id)
+                for n in range(items)
+            ])
+            db.session.commit()
+            return store.store_id
+
+    def new_item(self, store_id=None):
+        item = ItemModel(item_name=self.unique("bench-item"), item_price=1.0, store_id=store_id or self.store_id())
+        return self._add(item, "item_id")
+
+    def new_tag(self, store_id=None):
+        tag = TagModel(tag_name=self.unique("bench-tag"), store_id=store_id or self.store_id())
+        return self._add(tag, "tag_id")
+
+    def new_user(self):
+        return self._add(UserModel(username=self.unique("bench-user"), password="unused"), "user_id")
+
+    def new_link(self):
+        """Returns (item_id, tag_id) of a fresh, linked pair in the same store."""
+        store_id = self.store_id()
+        item_id, tag_id = self.new_item(store_id), self.new_tag(store_id)
+        with self.app.app_context():
+            item, tag = db.session.get(ItemModel, item_id), db.session.get(TagModel, tag_id)
+            item.tags.append(tag)
+            db.session.commit()
+        return item_id, tag_id
+
+    def new_job(self):
+        # queued only, a store id that does not exist keeps it harmless if a worker runs it
+        return self.app.extensions["job_runner"].store.enqueue("delete_store", {"store_id": -1})
+
+
+@dataclass
+class Scenario:
+    method: str
+    rule: str
+    # builds the test client kwargs for one request, setup work done here is not timed
+    request: Callable[[BenchContext], dict]
+
+    @property
+    def name(self):
+        return f"{self.method} {self.rule}"
+
+
+def _link_request(ctx):
+    store_id = ctx.store_id()
+    return {"path": f"/item/{ctx.new_item(store_id)}/tag/{ctx.new_tag(store_id)}"}
+
+
+def _batch_link_request(ctx, owner):
+    store_id = ctx.store_id()
+    if owner == "item":
+        tag_ids = [ctx.new_tag(store_id) for _ in range(10)]
+        return {"path": f"/item/{ctx.new_item(store_id)}/tags", "json": {"tag_ids": tag_ids}}
+    item_ids = [ctx.new_item(store_id) for _ in range(10)]
+    return {"path": f"/tag/{ctx.new_tag(store_id)}/items", "json": {"item_ids": item_ids}}
+
+
+def _unlink_request(ctx):
+    item_id, tag_id = ctx.new_link()
+    return {"path": f"/item/{item_id}/tag/{tag_id}"}
+
+
+SCENARIOS = [
+    # stores
+    Scenario("GET", "/store", lambda ctx: {"path": "/store"}),
+    Scenario("POST", "/store", lambda ctx: {
+        "path": "/store", "json": {"store_name": ctx.unique("bench-store")}, "headers": ctx.headers(),
+    }),
+    Scenario("PUT", "/store", lambda ctx: {
+        "path": "/store",
+        "json": [{"store_id": ctx.new_store(), "store_name": ctx.unique("bench-store")} for _ in range(20)],
+        "headers": ctx.headers(),
+    }),
+    Scenario("GET", "/store/<int:store_id>", lambda ctx: {"path": f"/store/{ctx.store_id()}"}),
+    Scenario("PUT", "/store/<int:store_id>", lambda ctx: {
+        "path": f"/store/{ctx.new_store()}", "json": {"store_name": ctx.unique("bench-store")},
+    }),
+    Scenario("DELETE", "/store/<int:store_id>", lambda ctx: {"path": f"/store/{ctx.new_store(items=10)}"}),
+    # items
+    Scenario("GET", "/item", lambda ctx: {"path": "/item"}),
+    Scenario("POST", "/item", lambda ctx: {
+        "path": "/item",
+        "json": {"item_name": ctx.unique("bench-item"), "item_price": 9.99, "store_id": ctx.store_id()},
+        "headers": ctx.headers(),
+    }),
+    Scenario("PUT", "/item", lambda ctx: {
+        "path": "/item",
+        "json": [
+            {"item_id": ctx.item_id(), "item_name": ctx.unique("bench-item"), "item_price": 9.99,
+             "store_id": ctx.store_id()}
+            for _ in range(100)
+        ],
+        "headers": ctx.headers(),
+    }),
+    Scenario("POST", "/item/bulk", lambda ctx: {
+        "path": "/item/bulk",
+        "json": [
+            {"item_name": ctx.unique("bench-item"), "item_price": 9.99, "store_id": ctx.store_id()}
+            for _ in range(100)
+        ],
+        "headers": ctx.headers(),
+    }),
+    Scenario("GET", "/item/<int:item_id>", lambda ctx: {"path": f"/item/{ctx.item_id()}"}),
+    Scenario("PUT", "/item/<int:item_id>", lambda ctx: {
+        "path": f"/item/{ctx.item_id()}", "json": {"item_price": 19.99},
+    }),
+    Scenario("DELETE", "/item/<int:item_id>", lambda ctx: {"path": f"/item/{ctx.new_item()}"}),
+    # tags
+    Scenario("GET", "/store/<int:store_id>/tag", lambda ctx: {"path": f"/store/{ctx.store_id()}/tag"}),
+    Scenario("POST", "/store/<int:store_id>/tag", lambda ctx: {
+        "path": f"/store/{ctx.store_id()}/tag", "json": {"tag_name": ctx.unique("bench-tag")},
+    }),
+    Scenario("GET", "/tag", lambda ctx: {"path": "/tag"}),
+    Scenario("GET", "/tag/<int:tag_id>", lambda ctx: {"path": f"/tag/{ctx.tag_id()}"}),
+    Scenario("DELETE", "/tag/<int:tag_id>", lambda ctx: {"path": f"/tag/{ctx.new_tag()}"}),
+    Scenario("POST", "/item/<int:item_id>/tag/<int:tag_id>", _link_request),
+    Scenario("DELETE", "/item/<int:item_id>/tag/<int:tag_id>", _unlink_request),
+    Scenario("POST", "/item/<int:item_id>/tags", lambda ctx: _batch_link_request(ctx, "item")),
+    Scenario("POST", "/tag/<int:tag_id>/items", lambda ctx: _batch_link_request(ctx, "tag")),
+    # users
+    Scenario("POST", "/register", lambda ctx: {
+        "path": "/register", "json": {"username": ctx.unique("bench-user"), "password": BENCH_PASSWORD},
+    }),
+    Scenario("POST", "/register-admin", lambda ctx: {
+        "path": "/register-admin", "json": {"username": ctx.unique("bench-admin"), "password": BENCH_PASSWORD},
+    }),
+    Scenario("POST", "/login", lambda ctx: {
+        "path": "/login", "json": {"username": "bench-user", "password": BENCH_PASSWORD},
+    }),
+    Scenario("POST", "/refresh", lambda ctx: {"path": "/refresh", "headers": ctx.headers(refresh=True)}),
+    Scenario("POST", "/logout", lambda ctx: {"path": "/logout", "headers": ctx.headers()}),
+    Scenario("GET", "/user/<int:user_id>", lambda ctx: {
+        "path": f"/user/{ctx.user_id}", "headers": ctx.headers(admin=True),
+    }),
+    Scenario("DELETE", "/user/<int:user_id>", lambda ctx: {
+        "path": f"/user/{ctx.new_user()}", "headers": ctx.headers(admin=True),
+    }),
+    # catalog
+    Scenario("POST", "/catalog/import", lambda ctx: {
+        "path": "/catalog/import",
+        "data": "store_id,item_name,item_price,tags\n" + "".join(
+            f"{ctx.store_id()},{ctx.unique('bench-item')},9.99,bench-import\n" for _ in range(100)
+        ),
+        "headers": {**ctx.headers(), "Content-Type": "text/csv"},
+    }),
+    Scenario("GET", "/catalog/export", lambda ctx: {
+        "path": f"/catalog/export?store_id={ctx.store_id()}", "headers": ctx.headers(),
+    }),
+    # jobs
+    Scenario("GET", "/jobs/<string:job_id>", lambda ctx: {"path": f"/jobs/{ctx.new_job()}"}),
+    # admin
+    Scenario("GET", "/admin/db-pool", lambda ctx: {"path": "/admin/db-pool", "headers": ctx.headers(admin=True)}),
+    Scenario("GET", "/admin/response-cache", lambda ctx: {
+        "path": "/admin/response-cache", "headers": ctx.headers(admin=True),
+    }),
+]
+
+
+def blueprint_routes(app):
+    """Every (method, rule) served by the API blueprints."""
+    routes = set()
+    for rule in app.url_map.iter_rules():
+        blueprint = rule.endpoint.rpartition(".")[0]
+        if blueprint in app.blueprints and blueprint != "api-docs":
+            routes.update((method, rule.rule) for method in rule.methods - {"HEAD", "OPTIONS"})
+    return routes
+
+
+def missing_scenarios(app, scenarios=SCENARIOS):
+    covered = {(s.method, s.rule) for s in scenarios}
+    return sorted(blueprint_routes(app) - covered)
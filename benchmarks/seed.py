@@ -0,0 +1,100 @@
+import random
+from dataclasses import dataclass, asdict
+
+from passlib.hash import pbkdf2_sha256
+from sqlalchemy import insert
+
+from app.db import db
+from app.models import StoreModel, ItemModel, TagModel, ItemTagModel, UserModel
+
+
+@dataclass
+class Scale:
+    stores: int = 1_000
+    items: int = 1_000_000
+    tags: int = 50_000
+    links_per_item: int = 3
+    skew: float = 1.2
+    seed: int = 42
+
+    def as_dict(self):
+        return asdict(self)
+
+
+BENCH_PASSWORD = "bench-password"
+
+
+def _chunks(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _insert(model, rows, chunk_size):
+    for chunk in _chunks(rows, chunk_size):
+        db.session.execute(insert(model.__table__), chunk)
+        db.session.commit()
+
+
+def _skewed_index(rng, size, skew):
+    """Pareto distributed index in [0, size), low indexes are the popular ones."""
+    return min(int(rng.paretovariate(skew)) - 1, size - 1)
+
+
+def seed(scale: Scale, chunk_size: int = 10_000):
+    """
+    Fills an empty database with `scale` rows using chunked executemany.
+
+    Items and tags are spread round-robin over stores. Each item is linked
+    to up to `links_per_item` tags of its own store, picked with a Pareto
+    distribution so a few tags carry most of the links, like real catalogs.
+    Must run inside an app context.
+    """
+    rng = random.Random(scale.seed)
+    stores, items, tags = scale.stores, scale.items, scale.tags
+
+    _insert(StoreModel, ({"store_id": s, "store_name": f"store-{s}"} for s in range(1, stores + 1)), chunk_size)
+    _insert(
+        TagModel,
+        ({"tag_id": t, "tag_name": f"tag-{t}", "store_id": (t - 1) % stores + 1} for t in range(1, tags + 1)),
+        chunk_size,
+    )
+    _insert(
+        ItemModel,
+        (
+            {
+                "item_id": i,
+                "item_name": f"item-{i}",
+                "item_price": round(rng.uniform(0.5, 500), 2),
+                "store_id": (i - 1) % stores + 1,
+            }
+            for i in range(1, items + 1)
+        ),
+        chunk_size,
+    )
+
+    # tag t belongs to store (t - 1) % stores + 1, so the tags of store s are s, s + stores, ...
+    tags_per_store = max(tags // stores, 1)
+
+    def links():
+        for i in range(1, items + 1):
+            store_id = (i - 1) % stores + 1
+            picked = set()
+            for _ in range(rng.randint(0, scale.links_per_item)):
+                tag_id = store_id + _skewed_index(rng, tags_per_store, scale.skew) * stores
+                if tag_id <= tags and tag_id not in picked:
+                    picked.add(tag_id)
+                    yield {"item_id": i, "tag_id": tag_id}
+
+    _insert(ItemTagModel, links(), chunk_size)
+
+    db.session.add_all([
+        UserModel(username="bench-user", password=pbkdf2_sha256.hash(BENCH_PASSWORD)),
+        UserModel(username="bench-admin", password=pbkdf2_sha256.hash(BENCH_PASSWORD), is_admin=True),
+    ])
+    db.session.commit()
@@ -0,0 +1,117 @@
+"""
+Write throughput of several gunicorn-like worker processes sharing one
+SQLite file, with and without the SQLITE_PRAGMAS profile. Both profiles
+keep foreign_keys and busy_timeout, which correctness needs, so only the
+performance pragmas differ.
+
+    python -m benchmarks.sqlite_writes --workers 3 --writes 500
+
+Each worker is its own process with its own app, like `gunicorn -w 3`,
+and creates items through POST /item, one commit per request.
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+
+from flask_jwt_extended import create_access_token
+
+from app import create_app
+from app.config import SQLITE_PRAGMAS
+from app.db import db
+from app.models import StoreModel, UserModel
+
+from .run import percentile
+
+REQUIRED_PRAGMAS = {name: SQLITE_PRAGMAS[name] for name in ("foreign_keys", "busy_timeout")}
+PROFILES = {"default": REQUIRED_PRAGMAS, "tuned": SQLITE_PRAGMAS}
+
+
+def _make_app(db_path, pragmas):
+    app = create_app("testing", db_url=f"sqlite:///{db_path}", sqlite_pragmas=pragmas)
+    app.config["JWT_SECRET_KEY"] = "sqlite-writes-benchmark-secret-key-0123456789"
+    return app
+
+
+def _worker(db_path, pragmas, worker_id, writes, barrier, results):
+    app = _make_app(db_path, pragmas)
+    client = app.test_client()
+    with app.app_context():
+        headers = {"Authorization": f"Bearer {create_access_token(identity='1')}"}
+
+    latencies, errors = [], 0
+    barrier.wait()
+    for n in range(writes):
+        start = time.perf_counter()
+        response = client.post(
+            "/item",
+            json={"item_name": f"w{worker_id}-{n}", "item_price": 1.0, "store_id": 1},
+            headers=headers,
+        )
+        latencies.append((time.perf_counter() - start) * 1000)
+        errors += response.status_code != 201
+    results.put((latencies, errors, time.perf_counter()))
+
+
+def run_profile(name, workers, writes, db_path):
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    app = _make_app(db_path, PROFILES[name])
+    with app.app_context():
+        db.create_all()
+        db.session.add_all([StoreModel(store_name="bench"), UserModel(username="bench", password="x")])
+        db.session.commit()
+        db.engine.dispose()
+
+    ctx = multiprocessing.get_context("spawn")
+    barrier, results = ctx.Barrier(workers + 1), ctx.Queue()
+    procs = [
+        ctx.Process(target=_worker, args=(db_path, PROFILES[name], w, writes, barrier, results))
+        for w in range(workers)
+    ]
+    for proc in procs:
+        proc.start()
+    barrier.wait()
+    start = time.perf_counter()
+
+    latencies, errors, end = [], 0, start
+    for _ in procs:
+        worker_latencies, worker_errors, finished = results.get()
+        latencies.extend(worker_latencies)
+        errors += worker_errors
+        end = max(end, finished)
+    for proc in procs:
+        proc.join()
+
+    elapsed = end - start
+    return {
+        "profile": name,
+        "writes": len(latencies),
+        "errors": errors,
+        "writes_per_s": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SQLite write throughput with concurrent worker processes.")
+    parser.add_argument("--workers", type=int, default=3)
+    parser.add_argument("--writes", type=int, default=500, help="POST /item requests per worker")
+    parser.add_argument("--profile", choices=[*PROFILES, "both"], default="both")
+    parser.add_argument("--db", default=os.path.join(tempfile.gettempdir(), "sqlite-writes.db"))
+    args = parser.parse_args(argv)
+
+    names = list(PROFILES) if args.profile == "both" else [args.profile]
+    print(f"{'profile':10} {'writes':>7} {'errors':>7} {'writes/s':>10} {'p50 ms':>8} {'p99 ms':>8}")
+    for name in names:
+        r = run_profile(name, args.workers, args.writes, args.db)
+        print(
+            f"{r['profile']:10} {r['writes']:7} {r['errors']:7} {r['writes_per_s']:10} "
+            f"{r['p50_ms']:8} {r['p99_ms']:8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""add indexes on foreign key columns
+
+Revision ID: c4e1d2a7b9f3
+Revises: bf194dabcad1
+Create Date: 2026-10-18 10:12:31.402117
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4e1d2a7b9f3'
+down_revision = 'bf194dabcad1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # items.store_id and tags.store_id back StoreModel.items/tags and store deletes,
+    # item_tag.tag_id backs TagModel.items (item_id is covered by uq_item_tag_pair)
+    with op.batch_alter_table('items', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_items_store_id'), ['store_id'], unique=False)
+
+    with op.batch_alter_table('tags', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_tags_store_id'), ['store_id'], unique=False)
+
+    with op.batch_alter_table('item_tag', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_item_tag_tag_id'), ['tag_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('item_tag', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_item_tag_tag_id'))
+
+    with op.batch_alter_table('tags', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_tags_store_id'))
+
+    with op.batch_alter_table('items', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_items_store_id'))
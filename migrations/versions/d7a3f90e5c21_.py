@@ -0,0 +1,90 @@
+"""item_tag composite primary key
+
+Revision ID: d7a3f90e5c21
+Revises: c4e1d2a7b9f3
+Create Date: 2026-10-18 11:04:52.917340
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd7a3f90e5c21'
+down_revision = 'c4e1d2a7b9f3'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 10000
+
+
+def _copy_links(source, target, key):
+    """Copies (item_id, tag_id) from source to target in keyset batches on `key`."""
+    conn = op.get_bind()
+    last = None
+    while True:
+        where = "" if last is None else f"WHERE {key} > :last"
+        rows = conn.execute(
+            sa.text(f"SELECT {key}, item_id, tag_id FROM {source} {where} ORDER BY {key} LIMIT :size"),
+            {"last": last, "size": BATCH_SIZE},
+        ).all()
+        if not rows:
+            return
+        conn.execute(
+            sa.text(f"INSERT INTO {target} (item_id, tag_id) VALUES (:item_id, :tag_id)"),
+            [{"item_id": row.item_id, "tag_id": row.tag_id} for row in rows],
+        )
+        last = rows[-1][0]
+
+
+def upgrade():
+    op.create_table('item_tag_new',
+    sa.Column('item_id', sa.Integer(), nullable=False),
+    sa.Column('tag_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['item_id'], ['items.item_id'], ),
+    sa.ForeignKeyConstraint(['tag_id'], ['tags.tag_id'], ),
+    sa.PrimaryKeyConstraint('item_id', 'tag_id', name='pk_item_tag'),
+    sqlite_with_rowid=False
+    )
+    _copy_links('item_tag', 'item_tag_new', 'item_tag_id')
+
+    op.drop_table('item_tag')
+    op.rename_table('item_tag_new', 'item_tag')
+    op.create_index('ix_item_tag_tag_id_item_id', 'item_tag', ['tag_id', 'item_id'], unique=False)
+
+
+def downgrade():
+    op.create_table('item_tag_old',
+    sa.Column('item_tag_id', sa.Integer(), nullable=False),
+    sa.Column('item_id', sa.Integer(), nullable=False),
+    sa.Column('tag_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['item_id'], ['items.item_id'], ),
+    sa.ForeignKeyConstraint(['tag_id'], ['tags.tag_id'], ),
+    sa.PrimaryKeyConstraint('item_tag_id'),
+    sa.UniqueConstraint('item_id', 'tag_id', name='uq_item_tag_pair')
+    )
+    # the composite key orders by (item_id, tag_id), walk it by item_id
+    conn = op.get_bind()
+    last = 0
+    while True:
+        rows = conn.execute(
+            sa.text(
+                "SELECT item_id, tag_id FROM item_tag WHERE item_id > :last AND item_id <= "
+                "(SELECT MAX(item_id) FROM (SELECT item_id FROM item_tag WHERE item_id > :last "
+                "ORDER BY item_id LIMIT :size) AS batch)"
+            ),
+            {"last": last, "size": BATCH_SIZE},
+        ).all()
+        if not rows:
+            break
+        conn.execute(
+            sa.text("INSERT INTO item_tag_old (item_id, tag_id) VALUES (:item_id, :tag_id)"),
+            [{"item_id": row.item_id, "tag_id": row.tag_id} for row in rows],
+        )
+        last = max(row.item_id for row in rows)
+
+    op.drop_index('ix_item_tag_tag_id_item_id', table_name='item_tag')
+    op.drop_table('item_tag')
+    op.rename_table('item_tag_old', 'item_tag')
+    with op.batch_alter_table('item_tag', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_item_tag_tag_id'), ['tag_id'], unique=False)
@@ -0,0 +1,56 @@
+"""on delete cascade for store children and item links
+
+Revision ID: e2b8c6f41a90
+Revises: d7a3f90e5c21
+Create Date: 2026-10-18 14:37:10.284615
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2b8c6f41a90'
+down_revision = 'd7a3f90e5c21'
+branch_labels = None
+depends_on = None
+
+# (table, column, referred table, referred column) of every cascading key
+CASCADES = [
+    ('items', 'store_id', 'stores', 'store_id'),
+    ('tags', 'store_id', 'stores', 'store_id'),
+    ('item_tag', 'item_id', 'items', 'item_id'),
+]
+
+# SQLite reflects the existing foreign keys without a name
+NAMING_CONVENTION = {"fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s"}
+
+
+def _fk_name(table, column):
+    for fk in sa.inspect(op.get_bind()).get_foreign_keys(table):
+        if fk['constrained_columns'] == [column]:
+            return fk['name'] or NAMING_CONVENTION['fk'] % {
+                'table_name': table, 'column_0_name': column, 'referred_table_name': fk['referred_table'],
+            }
+    raise LookupError(f"No foreign key on {table}.{column}")
+
+
+def _replace_fks(ondelete):
+    for table, column, referred, referred_column in CASCADES:
+        name = _fk_name(table, column)
+        table_kwargs = {'sqlite_with_rowid': False} if table == 'item_tag' else {}
+        with op.batch_alter_table(
+            table, schema=None, naming_convention=NAMING_CONVENTION, table_kwargs=table_kwargs
+        ) as batch_op:
+            batch_op.drop_constraint(name, type_='foreignkey')
+            batch_op.create_foreign_key(
+                f'fk_{table}_{column}_{referred}', referred, [column], [referred_column], ondelete=ondelete
+            )
+
+
+def upgrade():
+    _replace_fks('CASCADE')
+
+
+def downgrade():
+    _replace_fks(None)
@@ -1,7 +1,4 @@
 import pytest
-import sqlite3
-from sqlalchemy import event
-from sqlalchemy.engine import Engine
 from flask_jwt_extended import create_access_token
 
 from app import create_app
@@ -9,15 +6,6 @@ from app.db import db
 from app.models import UserModel
 
 
-# enforces fk constraint in sqlite
-@event.listens_for(Engine, "connect")
-def set_sqlite_pragma(dbapi_connection, connection_record):
-    if isinstance(dbapi_connection, sqlite3.Connection):
-        cursor = dbapi_connection.cursor()
-        cursor.execute("PRAGMA foreign_keys=ON;")
-        cursor.close()
-
-
 @pytest.fixture()
 def app():
     app = create_app("testing")
@@ -41,6 +29,17 @@ def session(app):
         db.session.remove()
 
 
+@pytest.fixture
+def assert_max_queries():
+    "fails the test when a response ran more statements than its budget"
+    def check(response, budget):
+        count = int(response.headers["X-Query-Count"])
+        assert count <= budget, (
+            f"{response.request.method} {response.request.path} ran {count} queries, budget is {budget}"
+        )
+    return check
+
+
 @pytest.fixture
 def auth_header(session):
     from app.models import UserModel
@@ -0,0 +1,38 @@
+## /admin/db-pool
+
+# test admin gets pool stats
+def test_get_db_pool_stats_as_admin(client, admin_auth_header):
+    response = client.get("/admin/db-pool", headers=admin_auth_header)
+    assert response.status_code == 200
+    assert {"pid", "pool", "status"} <= set(response.json.keys())
+
+
+# test non-admin is rejected
+def test_get_db_pool_stats_requires_admin(client, auth_header):
+    response = client.get("/admin/db-pool", headers=auth_header)
+    assert response.status_code == 401
+    assert response.json["message"] == "Admin privilege required."
+
+
+## /admin/response-cache
+
+# test admin gets response cache counters
+def test_get_response_cache_stats_as_admin(client, admin_auth_header, session):
+    from app.models import StoreModel
+    session.add(StoreModel(store_name="Counted"))
+    session.commit()
+    client.get("/store/1")
+    client.get("/store/1")
+
+    response = client.get("/admin/response-cache", headers=admin_auth_header)
+    assert response.status_code == 200
+    assert response.json["backend"] == "memory"
+    assert response.json["hits"] == 1
+    assert response.json["misses"] == 1
+    assert response.json["entries"] == 1
+
+
+# test non-admin is rejected
+def test_get_response_cache_stats_requires_admin(client, auth_header):
+    response = client.get("/admin/response-cache", headers=auth_header)
+    assert response.status_code == 401
@@ -0,0 +1,194 @@
+import gzip
+import json
+
+from app.models import StoreModel, ItemModel, TagModel, ItemTagModel
+
+
+## /catalog/import
+
+CSV_HEADERS = {"Content-Type": "text/csv"}
+NDJSON_HEADERS = {"Content-Type": "application/x-ndjson"}
+
+
+# test csv import upserts items, tags and links
+def test_import_csv_catalog(client, session, auth_header):
+    store = StoreModel(store_name="Supplier")
+    session.add(store)
+    session.commit()
+    session.add(ItemModel(item_name="Chair", item_price=10.0, store_id=store.store_id))
+    session.commit()
+
+    body = (
+        "store_id,item_name,item_price,tags\n"
+        f"{store.store_id},Chair,12.5,Furniture|Office\n"
+        f"{store.store_id},Desk,80,Furniture\n"
+        f"{store.store_id},Lamp,not-a-price,\n"
+        "999,Ghost,1,\n"
+    )
+    response = client.post("/catalog/import", data=body, headers={**auth_header, **CSV_HEADERS})
+    assert response.status_code == 200
+    report = response.json
+    assert report["rows"] == 4
+    assert report["items_upserted"] == 2
+    assert report["tags_created"] == 2
+    assert report["links_created"] == 3
+    assert report["invalid_rows"] == 1
+    assert report["invalid_store"] == 1
+    assert report["errors"][0]["line"] == 4
+    assert report["rows_per_s"] > 0
+
+    session.expire_all()
+    chair = ItemModel.query.filter_by(item_name="Chair").one()
+    assert chair.item_price == 12.5
+    assert sorted(tag.tag_name for tag in chair.tags) == ["Furniture", "Office"]
+    assert ItemModel.query.count() == 2
+
+
+# test ndjson import in several chunks is idempotent
+def test_import_ndjson_catalog_twice(app, client, session, auth_header):
+    app.config["IMPORT_CHUNK_SIZE"] = 3
+    store = StoreModel(store_name="Feed")
+    session.add(store)
+    session.commit()
+
+    body = "".join(
+        f'{{"store_id": {store.store_id}, "item_name": "item-{n}", "item_price": {n}, "tags": ["t{n % 2}"]}}\n'
+        for n in range(7)
+    ) + "{broken\n"
+    first = client.post("/catalog/import", data=body, headers={**auth_header, **NDJSON_HEADERS})
+    assert first.status_code == 200
+    assert (first.json["items_upserted"], first.json["tags_created"], first.json["links_created"]) == (7, 2, 7)
+    assert first.json["errors"] == [{"line": 8, "errors": ["Not valid JSON."]}]
+
+    second = client.post("/catalog/import", data=body, headers={**auth_header, **NDJSON_HEADERS})
+    assert (second.json["items_upserted"], second.json["tags_created"], second.json["links_created"]) == (7, 0, 0)
+    assert ItemModel.query.count() == 7
+    assert TagModel.query.count() == 2
+    assert ItemTagModel.query.count() == 7
+
+
+# test async import returns a job
+def test_import_catalog_async_returns_202(app, client, session, auth_header, tmp_path):
+    app.config["IMPORT_SPOOL_DIR"] = str(tmp_path)
+    store = StoreModel(store_name="Later")
+    session.add(store)
+    session.commit()
+
+    body = f"store_id,item_name,item_price,tags\n{store.store_id},Sofa,300,\n"
+    response = client.post("/catalog/import?async=true", data=body, headers={**auth_header, **CSV_HEADERS})
+    assert response.status_code == 202
+    job = client.get(response.headers["Location"]).json
+    assert job["status"] == "succeeded"
+    assert job["result"]["items_upserted"] == 1
+    # the spooled body is removed once imported
+    assert list(tmp_path.iterdir()) == []
+
+
+# test import needs a known format
+def test_import_catalog_unknown_format_returns_415(client, auth_header):
+    response = client.post("/catalog/import", data="x", headers={**auth_header, "Content-Type": "text/plain"})
+    assert response.status_code == 415
+
+
+# test import requires a token
+def test_import_catalog_requires_token(client):
+    assert client.post("/catalog/import", data="", headers=CSV_HEADERS).status_code == 401
+
+
+# test the import-catalog command
+def test_import_catalog_command(app, session, tmp_path):
+    store = StoreModel(store_name="Cli")
+    session.add(store)
+    session.commit()
+    path = tmp_path / "catalog.csv"
+    path.write_text(f"store_id,item_name,item_price,tags\n{store.store_id},Pen,1.5,Office\n")
+
+    result = app.test_cli_runner().invoke(args=["import-catalog", str(path)])
+    assert result.exit_code == 0, result.output
+    assert "1 rows in" in result.output
+    assert "1 items upserted" in result.output
+    assert ItemModel.query.filter_by(item_name="Pen").count() == 1
+
+
+## /catalog/export
+
+def _seed_catalog(session):
+    store = StoreModel(store_name="Export")
+    other = StoreModel(store_name="Other")
+    session.add_all([store, other])
+    session.commit()
+    items = [ItemModel(item_name=f"item-{n}", item_price=n + 0.5, store_id=store.store_id) for n in range(5)]
+    tags = [TagModel(tag_name=name, store_id=store.store_id) for name in ("b", "a")]
+    session.add_all([*items, *tags, ItemModel(item_name="elsewhere", item_price=1.0, store_id=other.store_id)])
+    session.commit()
+    session.execute(
+        ItemTagModel.__table__.insert(),
+        [{"item_id": items[0].item_id, "tag_id": tag.tag_id} for tag in tags],
+    )
+    session.commit()
+    return store
+
+
+# test ndjson export in batches
+def test_export_catalog_ndjson(app, client, session, auth_header):
+    app.config["EXPORT_BATCH_SIZE"] = 2
+    store = _seed_catalog(session)
+
+    response = client.get("/catalog/export", headers=auth_header)
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    assert response.is_streamed
+    rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert len(rows) == 6
+    assert rows[0] == {
+        "store_id": store.store_id, "store_name": "Export", "item_id": rows[0]["item_id"],
+        "item_name": "item-0", "item_price": 0.5, "tags": ["a", "b"],
+    }
+    assert [row["item_id"] for row in rows] == sorted(row["item_id"] for row in rows)
+
+
+# test export holds no transaction while a batch is being written out
+def test_export_rows_ends_transaction_between_batches(session):
+    from app.catalog import export_rows
+    _seed_catalog(session)
+
+    rows = export_rows(batch_size=2)
+    next(rows)
+    assert not session().in_transaction()
+    assert len(list(rows)) == 5
+
+
+# test csv export of one store, gzipped, can be imported again
+def test_export_catalog_csv_gzip_round_trips(client, session, auth_header):
+    store = _seed_catalog(session)
+
+    response = client.get(f"/catalog/export?format=csv&gzip=true&store_id={store.store_id}", headers=auth_header)
+    assert response.status_code == 200
+    assert response.mimetype == "application/gzip"
+    assert "Content-Encoding" not in response.headers
+    assert response.headers["Content-Disposition"] == "attachment; filename=catalog.csv.gz"
+    body = gzip.decompress(response.data).decode()
+    lines = body.splitlines()
+    assert lines[0] == "store_id,store_name,item_id,item_name,item_price,tags"
+    assert lines[1].endswith(",item-0,0.5,a|b")
+    assert len(lines) == 6
+
+    again = client.post("/catalog/import", data=body, headers={**auth_header, **CSV_HEADERS})
+    assert again.json["items_upserted"] == 5
+    assert again.json["links_created"] == 0
+
+
+# test export requires a token
+def test_export_catalog_requires_token(client):
+    assert client.get("/catalog/export").status_code == 401
+
+
+# test the export-catalog command
+def test_export_catalog_command(app, session, tmp_path):
+    _seed_catalog(session)
+    path = tmp_path / "catalog.ndjson.gz"
+
+    result = app.test_cli_runner().invoke(args=["export-catalog", str(path), "--gzip"])
+    assert result.exit_code == 0, result.output
+    rows = gzip.decompress(path.read_bytes()).decode().splitlines()
+    assert len(rows) == 6
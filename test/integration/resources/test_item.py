@@ -1,4 +1,5 @@
-from app.models import ItemModel, StoreModel, TagModel
+from app.models import ItemModel, StoreModel, TagModel, ItemTagModel
+from app.pagination import encode_cursor
 
 
 ## /item
@@ -215,6 +216,30 @@ def test_delete_item_by_id_not_found(client):
     assert response.status_code == 404
 
 
+# test delete item removes its tag links without loading them
+def test_delete_item_with_tags_cascades_links(client, session, assert_max_queries):
+    store = StoreModel(store_name="Linked")
+    session.add(store)
+    session.commit()
+
+    item = ItemModel(item_name="Tagged", item_price=5.0, store_id=store.store_id)
+    tags = [TagModel(tag_name=f"tag-{n}", store_id=store.store_id) for n in range(10)]
+    session.add_all([item, *tags])
+    session.commit()
+    item_id = item.item_id
+    session.execute(
+        ItemTagModel.__table__.insert(),
+        [{"item_id": item_id, "tag_id": tag.tag_id} for tag in tags],
+    )
+    session.commit()
+
+    response = client.delete(f"/item/{item_id}")
+    assert response.status_code == 200
+    assert_max_queries(response, 2)
+    assert ItemTagModel.query.filter_by(item_id=item_id).count() == 0
+    assert TagModel.query.count() == 10
+
+
 # test update existing item
 def test_put_item_updates_existing(client, session):
     store = StoreModel(store_name="Store")
@@ -337,3 +362,236 @@ def test_delete_store_cascades_to_items(client, session):
 
     items_remaining = session.query(ItemModel).filter_by(store_id=store.store_id).all()
     assert items_remaining == []
+
+
+# test item list is paginated with a next link
+def test_get_item_list_paginates_with_cursor(client, session):
+    store = StoreModel(store_name="Store")
+    session.add(store)
+    session.commit()
+
+    session.add_all([
+        ItemModel(item_name=f"Item {i}", item_price=1.0, store_id=store.store_id) for i in range(5)
+    ])
+    session.commit()
+
+    response = client.get("/item?limit=2")
+    assert response.status_code == 200
+    assert [item["item_name"] for item in response.json] == ["Item 0", "Item 1"]
+    assert 'rel="next"' in response.headers["Link"]
+
+    seen = [item["item_id"] for item in response.json]
+    while "Link" in response.headers:
+        next_url = response.headers["Link"].split(">")[0].lstrip("<")
+        response = client.get(next_url)
+        assert response.status_code == 200
+        seen.extend(item["item_id"] for item in response.json)
+
+    assert len(seen) == 5
+    assert seen == sorted(seen)
+
+
+# test limit above the configured maximum is rejected
+def test_get_item_list_rejects_limit_above_max(client, app):
+    response = client.get(f"/item?limit={app.config['PAGINATION_MAX_LIMIT'] + 1}")
+    assert response.status_code == 422
+    assert "limit" in response.json["errors"]["query"]
+
+
+# test tampered cursor is rejected
+def test_get_item_list_rejects_invalid_cursor(client):
+    response = client.get("/item?cursor=not-a-cursor")
+    assert response.status_code == 422
+    assert "cursor" in response.json["errors"]["query"]
+
+
+# test cursor past a 64-bit integer is rejected
+def test_get_item_list_rejects_out_of_range_cursor(client):
+    response = client.get(f"/item?cursor={encode_cursor(2**64)}")
+    assert response.status_code == 422
+    assert "cursor" in response.json["errors"]["query"]
+
+
+# test item list runs the same number of queries whatever the row count
+def test_get_item_list_query_count_does_not_grow_with_rows(client, session, assert_max_queries):
+    store = StoreModel(store_name="Store")
+    session.add(store)
+    session.commit()
+
+    tag = TagModel(tag_name="Fresh", store_id=store.store_id)
+    items = [ItemModel(item_name=f"Item {i}", item_price=1.0, store_id=store.store_id) for i in range(10)]
+    for item in items:
+        item.tags.append(tag)
+    session.add_all(items)
+    session.commit()
+
+    response = client.get("/item")
+    assert response.status_code == 200
+    assert all(item["store"]["store_name"] == "Store" for item in response.json)
+    assert all(item["tags"][0]["tag_name"] == "Fresh" for item in response.json)
+    assert_max_queries(response, 2)
+
+
+## /item/bulk
+
+# test bulk create from a json array
+def test_bulk_create_items_from_json_array(client, session, auth_header):
+    store = StoreModel(store_name="Bulk")
+    session.add(store)
+    session.commit()
+    session.add(ItemModel(item_name="taken", item_price=1.0, store_id=store.store_id))
+    session.commit()
+
+    rows = [
+        {"item_name": "a", "item_price": 1.0, "store_id": store.store_id},
+        {"item_name": "taken", "item_price": 2.0, "store_id": store.store_id},
+        {"item_name": "b", "item_price": 3.0, "store_id": 999},
+        {"item_name": "a", "item_price": 4.0, "store_id": store.store_id},
+        {"item_name": "c", "item_price": 5.0, "store_id": store.store_id},
+    ]
+    response = client.post("/item/bulk", json=rows, headers=auth_header)
+    assert response.status_code == 200
+    assert (response.json["created"], response.json["conflict"], response.json["invalid_store"]) == (2, 2, 1)
+    statuses = [result["status"] for result in response.json["results"]]
+    assert statuses == ["created", "conflict", "invalid_store", "conflict", "created"]
+
+    created = response.json["results"][4]
+    assert session.get(ItemModel, created["item_id"]).item_name == "c"
+    assert ItemModel.query.filter_by(store_id=store.store_id).count() == 3
+
+
+# test bulk create from ndjson in several chunks
+def test_bulk_create_items_from_ndjson(app, client, session, auth_header, assert_max_queries):
+    app.config["BULK_CHUNK_SIZE"] = 10
+    store = StoreModel(store_name="Ndjson")
+    session.add(store)
+    session.commit()
+
+    body = "\n".join(
+        f'{{"item_name": "item-{n}", "item_price": 1.5, "store_id": {store.store_id}}}' for n in range(25)
+    )
+    response = client.post(
+        "/item/bulk", data=body + "\n", headers={**auth_header, "Content-Type": "application/x-ndjson"}
+    )
+    assert response.status_code == 200
+    assert response.json["created"] == 25
+    # store and name lookups plus one insert per chunk
+    assert_max_queries(response, 3 * 3 + 2)
+    assert ItemModel.query.count() == 25
+
+
+# test atomic bulk create rolls back when a row is rejected
+def test_bulk_create_items_atomic_rolls_back(client, session, auth_header):
+    store = StoreModel(store_name="Atomic")
+    session.add(store)
+    session.commit()
+
+    rows = [
+        {"item_name": "ok", "item_price": 1.0, "store_id": store.store_id},
+        {"item_name": "bad", "item_price": 1.0, "store_id": 999},
+    ]
+    response = client.post("/item/bulk?atomic=true", json=rows, headers=auth_header)
+    assert response.status_code == 409
+    assert [result["status"] for result in response.json["results"]] == ["rolled_back", "invalid_store"]
+    assert ItemModel.query.count() == 0
+
+
+# test bulk create validates every row
+def test_bulk_create_items_invalid_rows_returns_422(client, auth_header):
+    rows = [{"item_name": "a", "item_price": 1.0, "store_id": 1}, {"item_name": "b"}]
+    response = client.post("/item/bulk", json=rows, headers=auth_header)
+    assert response.status_code == 422
+    assert "1" in response.json["errors"]["json"]
+
+
+# test bulk create rejects bodies that are not arrays or ndjson
+def test_bulk_create_items_bad_body_returns_400(client, auth_header):
+    assert client.post("/item/bulk", json={"item_name": "a"}, headers=auth_header).status_code == 400
+    response = client.post(
+        "/item/bulk", data="{not json}\n", headers={**auth_header, "Content-Type": "application/x-ndjson"}
+    )
+    assert response.status_code == 400
+    assert response.json["message"] == "Line 1 is not valid JSON."
+
+
+# test bulk create row limit
+def test_bulk_create_items_over_limit_returns_413(app, client, auth_header):
+    app.config["BULK_MAX_ROWS"] = 2
+    rows = [{"item_name": f"i{n}", "item_price": 1.0, "store_id": 1} for n in range(3)]
+    assert client.post("/item/bulk", json=rows, headers=auth_header).status_code == 413
+
+
+# test bulk create requires a token
+def test_bulk_create_items_requires_token(client):
+    assert client.post("/item/bulk", json=[]).status_code == 401
+
+
+## PUT /item
+
+# test bulk upsert of items by id
+def test_bulk_put_items_upserts_by_id(client, session, auth_header):
+    store = StoreModel(store_name="Upserts")
+    session.add(store)
+    session.commit()
+    existing = ItemModel(item_name="old", item_price=1.0, store_id=store.store_id)
+    taken = ItemModel(item_name="taken", item_price=1.0, store_id=store.store_id)
+    session.add_all([existing, taken])
+    session.commit()
+    existing_id, store_id = existing.item_id, store.store_id
+
+    rows = [
+        {"item_id": existing_id, "item_name": "renamed", "item_price": 2.0, "store_id": store_id},
+        {"item_id": 500, "item_name": "new", "item_price": 3.0, "store_id": store_id},
+        {"item_id": 501, "item_name": "taken", "item_price": 3.0, "store_id": store_id},
+        {"item_id": 502, "item_name": "nowhere", "item_price": 3.0, "store_id": 999},
+        {"item_id": 503, "item_name": "new", "item_price": 3.0, "store_id": store_id},
+    ]
+    response = client.put("/item", json=rows, headers=auth_header)
+    assert response.status_code == 200
+    assert [result["status"] for result in response.json["results"]] == [
+        "updated", "created", "conflict", "invalid_store", "conflict",
+    ]
+    assert (response.json["created"], response.json["updated"]) == (1, 1)
+
+    session.expire_all()
+    assert session.get(ItemModel, existing_id).item_name == "renamed"
+    assert session.get(ItemModel, 500).item_price == 3.0
+    assert session.get(ItemModel, 501) is None
+
+
+# test atomic bulk upsert rolls back
+def test_bulk_put_items_atomic_rolls_back(client, session, auth_header):
+    store = StoreModel(store_name="Atomic Upserts")
+    session.add(store)
+    session.commit()
+
+    rows = [
+        {"item_id": 700, "item_name": "a", "item_price": 1.0, "store_id": store.store_id},
+        {"item_id": 701, "item_name": "b", "item_price": 1.0, "store_id": 999},
+    ]
+    response = client.put("/item?atomic=true", json=rows, headers=auth_header)
+    assert response.status_code == 409
+    assert [result["status"] for result in response.json["results"]] == ["rolled_back", "invalid_store"]
+    assert session.get(ItemModel, 700) is None
+
+
+# test bulk upsert needs whole items
+def test_bulk_put_items_requires_all_fields(client, auth_header):
+    response = client.put("/item", json=[{"item_id": 1, "item_price": 2.0}], headers=auth_header)
+    assert response.status_code == 422
+
+
+# test single put writes with one statement
+def test_put_item_runs_one_write_statement(client, session, assert_max_queries):
+    store = StoreModel(store_name="One Statement")
+    session.add(store)
+    session.commit()
+
+    created = client.put("/item/42", json={"item_name": "x", "item_price": 1.0, "store_id": store.store_id})
+    assert created.status_code == 200
+    updated = client.put("/item/42", json={"item_price": 2.0})
+    assert updated.status_code == 200
+    assert updated.json["item_price"] == 2.0
+    # the write, then the row expired by the commit, its store and tags for the response
+    assert_max_queries(created, 4)
+    assert_max_queries(updated, 4)
@@ -0,0 +1,66 @@
+from app.models import StoreModel, ItemModel, TagModel, ItemTagModel
+
+
+## /store/<store_id>?async=true and /jobs/<job_id>
+
+# test async store delete returns 202 with the job location
+def test_async_delete_store_returns_202_with_job(client, session):
+    store = StoreModel(store_name="Async Store")
+    session.add(store)
+    session.commit()
+    store_id = store.store_id
+
+    items = [ItemModel(item_name=f"item-{n}", item_price=1.0, store_id=store_id) for n in range(12)]
+    tag = TagModel(tag_name="tag", store_id=store_id)
+    session.add_all([*items, tag])
+    session.commit()
+    session.execute(
+        ItemTagModel.__table__.insert(),
+        [{"item_id": item.item_id, "tag_id": tag.tag_id} for item in items],
+    )
+    session.commit()
+
+    response = client.delete(f"/store/{store_id}?async=true")
+    assert response.status_code == 202
+    assert response.headers["Location"] == f"/jobs/{response.json['job_id']}"
+    assert response.json["kind"] == "delete_store"
+
+    job = client.get(response.headers["Location"])
+    assert job.status_code == 200
+    assert job.json["status"] == "succeeded"
+    assert job.json["progress"] == {"done": 12, "total": 12}
+    assert job.json["result"] == {
+        "store_id": store_id, "store_deleted": True, "items_deleted": 12, "tags_deleted": 1,
+    }
+
+    session.expire_all()
+    assert session.get(StoreModel, store_id) is None
+    assert ItemModel.query.count() == 0
+    assert ItemTagModel.query.count() == 0
+
+
+# test async delete commits in chunks
+def test_async_delete_store_commits_in_chunks(app, client, session):
+    app.config["JOBS_CHUNK_SIZE"] = 5
+    store = StoreModel(store_name="Chunked")
+    session.add(store)
+    session.commit()
+    session.add_all([ItemModel(item_name=f"item-{n}", item_price=1.0, store_id=store.store_id) for n in range(12)])
+    session.commit()
+
+    response = client.delete(f"/store/{store.store_id}?async=true")
+    job = client.get(response.headers["Location"]).json
+    assert job["status"] == "succeeded"
+    assert job["result"]["items_deleted"] == 12
+
+
+# test async delete of a missing store
+def test_async_delete_store_not_found_returns_404(client):
+    assert client.delete("/store/999?async=true").status_code == 404
+
+
+# test get unknown job
+def test_get_job_not_found_returns_404(client):
+    response = client.get("/jobs/does-not-exist")
+    assert response.status_code == 404
+    assert response.json["message"] == "Job not found."
@@ -1,6 +1,6 @@
 import pytest
 
-from app.models import StoreModel, ItemModel, TagModel
+from app.models import StoreModel, ItemModel, TagModel, ItemTagModel
 
 
 ## /store
@@ -177,6 +177,36 @@ def test_delete_store_not_found_returns_404(client):
     assert response.status_code == 404
 
 
+# test delete store removes its items, tags and links in constant statements
+def test_delete_store_cascades_in_constant_queries(client, session, assert_max_queries):
+    store = StoreModel(store_name="Big Store")
+    other = StoreModel(store_name="Other Store")
+    session.add_all([store, other])
+    session.commit()
+    store_id = store.store_id
+
+    items = [ItemModel(item_name=f"item-{n}", item_price=1.0, store_id=store_id) for n in range(40)]
+    tags = [TagModel(tag_name=f"tag-{n}", store_id=store_id) for n in range(5)]
+    kept = ItemModel(item_name="kept", item_price=1.0, store_id=other.store_id)
+    session.add_all([*items, *tags, kept])
+    session.commit()
+    session.execute(
+        ItemTagModel.__table__.insert(),
+        [{"item_id": item.item_id, "tag_id": tag.tag_id} for item in items for tag in tags],
+    )
+    session.commit()
+
+    response = client.delete(f"/store/{store_id}")
+    assert response.status_code == 200
+    assert_max_queries(response, 2)
+
+    session.expire_all()
+    assert ItemModel.query.filter_by(store_id=store_id).count() == 0
+    assert TagModel.query.filter_by(store_id=store_id).count() == 0
+    assert ItemTagModel.query.count() == 0
+    assert ItemModel.query.filter_by(store_id=other.store_id).count() == 1
+
+
 # test update existing store
 def test_put_store_updates_existing_store(client, session):
     store = StoreModel(store_name="Old name")
@@ -214,3 +244,80 @@ def test_put_store_raises_500_on_integrity_error(client, session):
     response = client.put("/store/50", json={"store_name": "Existing"})
     assert response.status_code == 409
     assert "A store with this name already exists." in response.json["message"]
+
+
+# test store list is paginated with a next link
+def test_get_store_list_paginates_with_cursor(client, session):
+    session.add_all([StoreModel(store_name=f"Store {i}") for i in range(3)])
+    session.commit()
+
+    first = client.get("/store?limit=2")
+    assert first.status_code == 200
+    assert len(first.json) == 2
+
+    next_url = first.headers["Link"].split(">")[0].lstrip("<")
+    second = client.get(next_url)
+    assert second.status_code == 200
+    assert [store["store_name"] for store in second.json] == ["Store 2"]
+    assert "Link" not in second.headers
+
+
+# test store detail stays within its query budget
+def test_get_store_by_id_query_budget(client, session, assert_max_queries):
+    store = StoreModel(store_name="Budget")
+    session.add(store)
+    session.commit()
+
+    session.add_all([ItemModel(item_name=f"Item {i}", item_price=1.0, store_id=store.store_id) for i in range(5)])
+    session.commit()
+
+    response = client.get(f"/store/{store.store_id}")
+    assert response.status_code == 200
+    assert_max_queries(response, 3)
+
+
+## PUT /store
+
+# test bulk upsert of stores by id
+def test_bulk_put_stores_upserts_by_id(client, session, auth_header):
+    session.add_all([StoreModel(store_id=1, store_name="one"), StoreModel(store_id=2, store_name="two")])
+    session.commit()
+
+    rows = [
+        {"store_id": 1, "store_name": "first"},
+        {"store_id": 3, "store_name": "three"},
+        {"store_id": 4, "store_name": "two"},
+    ]
+    response = client.put("/store", json=rows, headers=auth_header)
+    assert response.status_code == 200
+    assert [result["status"] for result in response.json["results"]] == ["updated", "created", "conflict"]
+    assert set(response.json) == {"created", "updated", "conflict", "results"}
+
+    session.expire_all()
+    assert session.get(StoreModel, 1).store_name == "first"
+    assert session.get(StoreModel, 3).store_name == "three"
+    assert session.get(StoreModel, 4) is None
+
+
+# test bulk upsert of stores as ndjson
+def test_bulk_put_stores_from_ndjson(client, session, auth_header):
+    body = "\n".join(f'{{"store_id": {n}, "store_name": "store-{n}"}}' for n in range(1, 6))
+    response = client.put(
+        "/store", data=body, headers={**auth_header, "Content-Type": "application/x-ndjson"}
+    )
+    assert response.status_code == 200
+    assert response.json["created"] == 5
+    assert StoreModel.query.count() == 5
+
+
+# test bulk upsert of stores requires a token
+def test_bulk_put_stores_requires_token(client):
+    assert client.put("/store", json=[]).status_code == 401
+
+
+# test single store put writes with one statement
+def test_put_store_runs_one_write_statement(client, assert_max_queries):
+    response = client.put("/store/7", json={"store_name": "seven"})
+    assert response.status_code == 200
+    # the upsert, then the row expired by the commit, its items and tags for the response
+    assert_max_queries(response, 4)
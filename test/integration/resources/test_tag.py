@@ -1,4 +1,4 @@
-from app.models import StoreModel, TagModel, ItemModel
+from app.models import StoreModel, TagModel, ItemModel, ItemTagModel
 
 
 ## /store/<store_id>/tag
@@ -234,6 +234,56 @@ def test_delete_tag_with_items_returns_400(client, session):
     assert "tag is not deleted" in response.json["message"]
 
 
+# test the delete guard does not load the tag's items
+def test_delete_tag_with_many_items_query_count(client, session, assert_max_queries):
+    store = StoreModel(store_name="Store Busy")
+    session.add(store)
+    session.commit()
+
+    tag = TagModel(tag_name="Popular", store_id=store.store_id)
+    items = [ItemModel(item_name=f"item-{n}", item_price=1.0, store_id=store.store_id) for n in range(50)]
+    session.add_all([tag, *items])
+    session.commit()
+    session.execute(
+        ItemTagModel.__table__.insert(),
+        [{"item_id": item.item_id, "tag_id": tag.tag_id} for item in items],
+    )
+    session.commit()
+
+    response = client.delete(f"/tag/{tag.tag_id}")
+    assert response.status_code == 400
+    assert_max_queries(response, 2)
+
+
+# test force delete unlinks the items and deletes the tag
+def test_force_delete_tag_with_items_unlinks_them(client, session, assert_max_queries):
+    store = StoreModel(store_name="Store Force")
+    session.add(store)
+    session.commit()
+
+    tag = TagModel(tag_name="Doomed", store_id=store.store_id)
+    other = TagModel(tag_name="Kept", store_id=store.store_id)
+    items = [ItemModel(item_name=f"item-{n}", item_price=1.0, store_id=store.store_id) for n in range(20)]
+    session.add_all([tag, other, *items])
+    session.commit()
+    tag_id, other_id = tag.tag_id, other.tag_id
+    session.execute(
+        ItemTagModel.__table__.insert(),
+        [{"item_id": item.item_id, "tag_id": t} for item in items for t in (tag_id, other_id)],
+    )
+    session.commit()
+
+    response = client.delete(f"/tag/{tag_id}?force=true")
+    assert response.status_code == 202
+    assert response.json == {"message": "Tag deleted.", "unlinked": 20}
+    assert_max_queries(response, 4)
+
+    session.expire_all()
+    assert session.get(TagModel, tag_id) is None
+    assert ItemTagModel.query.filter_by(tag_id=tag_id).count() == 0
+    assert ItemTagModel.query.filter_by(tag_id=other_id).count() == 20
+
+
 ## /ietm/<item_id>/tag/<tag_id>
 
 # test link tag to item
@@ -348,3 +398,148 @@ def test_unlink_tag_not_associated_with_item_raises_value_error(client, session)
     print(response.json)
 
     assert "Item is not linked to" in response.json["message"]
+
+
+# test tag list is paginated with a next link
+def test_get_tag_list_paginates_with_cursor(client, session):
+    store = StoreModel(store_name="Store")
+    session.add(store)
+    session.commit()
+
+    session.add_all([TagModel(tag_name=f"Tag {i}", store_id=store.store_id) for i in range(3)])
+    session.commit()
+
+    first = client.get("/tag?limit=2")
+    assert first.status_code == 200
+    assert [tag["tag_name"] for tag in first.json] == ["Tag 0", "Tag 1"]
+
+    next_url = first.headers["Link"].split(">")[0].lstrip("<")
+    second = client.get(next_url)
+    assert [tag["tag_name"] for tag in second.json] == ["Tag 2"]
+    assert "Link" not in second.headers
+
+
+# test tag list runs the same number of queries whatever the row count
+def test_get_tag_list_query_count_does_not_grow_with_rows(client, session, assert_max_queries):
+    store = StoreModel(store_name="Store")
+    session.add(store)
+    session.commit()
+
+    item = ItemModel(item_name="Apple", item_price=1.0, store_id=store.store_id)
+    tags = [TagModel(tag_name=f"Tag {i}", store_id=store.store_id) for i in range(10)]
+    item.tags.extend(tags)
+    session.add(item)
+    session.commit()
+
+    response = client.get("/tag")
+    assert response.status_code == 200
+    assert all(tag["store"]["store_name"] == "Store" for tag in response.json)
+    assert all(tag["items"][0]["item_name"] == "Apple" for tag in response.json)
+    assert_max_queries(response, 2)
+
+
+# test linking the same tag twice returns 409
+def test_link_tag_to_item_twice_returns_409(client, session):
+    store = StoreModel(store_name="Twice Store")
+    session.add(store)
+    session.commit()
+
+    item = ItemModel(item_name="Lamp", item_price=12.0, store_id=store.store_id)
+    tag = TagModel(tag_name="Lighting", store_id=store.store_id)
+    session.add_all([item, tag])
+    session.commit()
+
+    assert client.post(f"/item/{item.item_id}/tag/{tag.tag_id}").status_code == 201
+    response = client.post(f"/item/{item.item_id}/tag/{tag.tag_id}")
+    assert response.status_code == 409
+    assert response.json["message"] == "Item is already linked to Lighting."
+    assert ItemTagModel.query.filter_by(item_id=item.item_id).count() == 1
+
+
+# test link and unlink cost does not grow with the item's tags
+def test_link_and_unlink_query_count_does_not_grow_with_tags(client, session, assert_max_queries):
+    store = StoreModel(store_name="Many Tags")
+    session.add(store)
+    session.commit()
+
+    item = ItemModel(item_name="Desk", item_price=80.0, store_id=store.store_id)
+    tags = [TagModel(tag_name=f"tag-{n}", store_id=store.store_id) for n in range(30)]
+    session.add_all([item, *tags])
+    session.commit()
+    session.execute(
+        ItemTagModel.__table__.insert(),
+        [{"item_id": item.item_id, "tag_id": tag.tag_id} for tag in tags[1:]],
+    )
+    session.commit()
+
+    unlink = client.delete(f"/item/{item.item_id}/tag/{tags[1].tag_id}")
+    assert unlink.status_code == 200
+    assert_max_queries(unlink, 3)
+
+    link = client.post(f"/item/{item.item_id}/tag/{tags[0].tag_id}")
+    assert link.status_code == 201
+    # item, tag, the insert, then store and tags for the response
+    assert_max_queries(link, 5)
+
+
+## /item/<item_id>/tags and /tag/<tag_id>/items
+
+def _batch_fixture(session):
+    store = StoreModel(store_name="Batch")
+    other = StoreModel(store_name="Batch Other")
+    session.add_all([store, other])
+    session.commit()
+    item = ItemModel(item_name="Shelf", item_price=30.0, store_id=store.store_id)
+    tags = [TagModel(tag_name=f"tag-{n}", store_id=store.store_id) for n in range(4)]
+    foreign = TagModel(tag_name="foreign", store_id=other.store_id)
+    session.add_all([item, *tags, foreign])
+    session.commit()
+    session.add(ItemTagModel(item_id=item.item_id, tag_id=tags[0].tag_id))
+    session.commit()
+    return item, tags, foreign
+
+
+# test batch linking tags to an item
+def test_link_tags_to_item_in_batch(client, session, assert_max_queries):
+    item, tags, foreign = _batch_fixture(session)
+    tag_ids = [tag.tag_id for tag in tags]
+
+    response = client.post(
+        f"/item/{item.item_id}/tags", json={"tag_ids": tag_ids + [foreign.tag_id, 9999, tag_ids[1]]}
+    )
+    assert response.status_code == 200
+    assert response.json["linked"] == tag_ids[1:]
+    assert response.json["skipped"] == [
+        {"id": tag_ids[0], "reason": "already_linked"},
+        {"id": foreign.tag_id, "reason": "other_store"},
+        {"id": 9999, "reason": "not_found"},
+    ]
+    # item store, tag lookup and one insert
+    assert_max_queries(response, 3)
+    assert ItemTagModel.query.filter_by(item_id=item.item_id).count() == 4
+
+
+# test batch linking items to a tag
+def test_link_items_to_tag_in_batch(client, session):
+    item, tags, _ = _batch_fixture(session)
+    second = ItemModel(item_name="Bench", item_price=20.0, store_id=item.store_id)
+    session.add(second)
+    session.commit()
+
+    response = client.post(f"/tag/{tags[0].tag_id}/items", json={"item_ids": [item.item_id, second.item_id]})
+    assert response.status_code == 200
+    assert response.json == {
+        "linked": [second.item_id],
+        "skipped": [{"id": item.item_id, "reason": "already_linked"}],
+    }
+
+
+# test batch linking on missing item or tag
+def test_batch_link_missing_owner_returns_404(client):
+    assert client.post("/item/9999/tags", json={"tag_ids": [1]}).status_code == 404
+    assert client.post("/tag/9999/items", json={"item_ids": [1]}).status_code == 404
+
+
+# test batch linking needs ids
+def test_batch_link_empty_ids_returns_422(client):
+    assert client.post("/item/1/tags", json={"tag_ids": []}).status_code == 422
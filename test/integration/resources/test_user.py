@@ -172,3 +172,169 @@ def test_post_required_auth(client):
     assert response.status_code == 401
     assert response.json["description"] == "Request does not contain an access token."
     assert response.json["error"] == "authorization_required"
+
+
+# test logout in one worker is seen by another worker sharing the blocklist
+def test_logout_is_shared_between_workers(monkeypatch, tmp_path):
+    from app import create_app
+    from app.db import db
+
+    monkeypatch.setattr("app.config.TestingConfig.BLOCKLIST_BACKEND", "sqlite", raising=False)
+    monkeypatch.setattr("app.config.TestingConfig.BLOCKLIST_SQLITE_PATH", str(tmp_path / "bl.db"), raising=False)
+    db_url = f"sqlite:///{tmp_path / 'data.db'}"
+    worker_1, worker_2 = create_app("testing", db_url=db_url), create_app("testing", db_url=db_url)
+
+    with worker_1.app_context():
+        db.create_all()
+        user = UserModel(username="shared", password="testpass", is_admin=True)
+        db.session.add(user)
+        db.session.commit()
+        headers = {"Authorization": f"Bearer {create_access_token(identity=str(user.user_id))}"}
+
+    assert worker_2.test_client().get("/user/1", headers=headers).status_code == 200
+    assert worker_1.test_client().post("/logout", headers=headers).status_code == 200
+    response = worker_2.test_client().get("/user/1", headers=headers)
+    assert response.status_code == 401
+    assert "Token has been revoked" in response.json["msg"]
+
+
+# test login reports hash queue wait time
+def test_login_reports_hash_timing(client):
+    client.post("/register", json={"username": "timed", "password": "secret"})
+    response = client.post("/login", json={"username": "timed", "password": "secret"})
+    assert response.status_code == 200
+    assert "hash-queue;dur=" in response.headers["Server-Timing"]
+
+
+# test login is rejected with 503 when the hash queue is full
+def test_login_returns_503_when_hash_queue_is_full(client, app):
+    client.post("/register", json={"username": "busy", "password": "secret"})
+    hasher = app.extensions["password_hasher"]
+    while hasher._slots.acquire(blocking=False):
+        pass
+
+    response = client.post("/login", json={"username": "busy", "password": "secret"})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == str(app.config["PASSWORD_HASH_RETRY_AFTER"])
+
+
+# test login still succeeds when the hash queue fills up before the rehash
+def test_login_skips_rehash_when_hash_queue_is_full(client, session, app, monkeypatch):
+    from passlib.hash import pbkdf2_sha256
+
+    user = UserModel(username="legacy-busy", password=pbkdf2_sha256.using(rounds=1000).hash("secret"))
+    session.add(user)
+    session.commit()
+    old_hash = user.password
+
+    hasher = app.extensions["password_hasher"]
+    verify = hasher.verify
+
+    def verify_then_fill_queue(password, hashed):
+        valid = verify(password, hashed)
+        while hasher._slots.acquire(blocking=False):
+            pass
+        return valid
+
+    monkeypatch.setattr(hasher, "verify", verify_then_fill_queue)
+
+    response = client.post("/login", json={"username": "legacy-busy", "password": "secret"})
+    assert response.status_code == 200
+    assert "access_token" in response.json
+
+    session.refresh(user)
+    assert user.password == old_hash
+
+
+# test login upgrades a hash made with other rounds
+def test_login_rehashes_password_with_configured_rounds(client, session, app):
+    from passlib.hash import pbkdf2_sha256
+
+    user = UserModel(username="legacy", password=pbkdf2_sha256.using(rounds=1000).hash("secret"))
+    session.add(user)
+    session.commit()
+
+    response = client.post("/login", json={"username": "legacy", "password": "secret"})
+    assert response.status_code == 200
+
+    session.refresh(user)
+    assert pbkdf2_sha256.from_string(user.password).rounds == app.config["PASSWORD_HASH_ROUNDS"]
+    assert pbkdf2_sha256.verify("secret", user.password)
+
+
+## /refresh
+
+# test login returns a refresh token
+def test_login_returns_refresh_token(client):
+    client.post("/register", json={"username": "refresher", "password": "secret"})
+    response = client.post("/login", json={"username": "refresher", "password": "secret"})
+    assert response.status_code == 200
+    assert "refresh_token" in response.json
+
+
+# test refresh rotates tokens and keeps the admin claim without a db lookup
+def test_refresh_returns_new_pair_and_keeps_admin_claim(client, assert_max_queries):
+    client.post("/register-admin", json={"username": "admin", "password": "secret"})
+    login = client.post("/login", json={"username": "admin", "password": "secret"}).json
+
+    response = client.post("/refresh", headers={"Authorization": f"Bearer {login['refresh_token']}"})
+    assert response.status_code == 200
+    assert response.json["refresh_token"] != login["refresh_token"]
+    assert_max_queries(response, 0)
+
+    admin_headers = {"Authorization": f"Bearer {response.json['access_token']}"}
+    assert client.get("/user/1", headers=admin_headers).status_code == 200
+
+
+# test refresh fails once the user is deleted
+def test_refresh_after_user_deleted_fails(client):
+    client.post("/register-admin", json={"username": "leaving", "password": "secret"})
+    login = client.post("/login", json={"username": "leaving", "password": "secret"}).json
+    access = {"Authorization": f"Bearer {login['access_token']}"}
+    assert client.delete("/user/1", headers=access).status_code == 200
+
+    response = client.post("/refresh", headers={"Authorization": f"Bearer {login['refresh_token']}"})
+    assert response.status_code == 404
+
+
+# test refresh picks up a demoted admin
+def test_refresh_after_demotion_drops_admin_claim(client, session):
+    from app.models import UserModel
+    client.post("/register-admin", json={"username": "demoted", "password": "secret"})
+    login = client.post("/login", json={"username": "demoted", "password": "secret"}).json
+    user = session.get(UserModel, 1)
+    user.is_admin = False
+    session.commit()
+
+    response = client.post("/refresh", headers={"Authorization": f"Bearer {login['refresh_token']}"})
+    assert response.status_code == 200
+    headers = {"Authorization": f"Bearer {response.json['access_token']}"}
+    assert client.get("/user/1", headers=headers).status_code == 401
+
+
+# test a used refresh token cannot be used again
+def test_refresh_token_is_revoked_after_use(client):
+    client.post("/register", json={"username": "rotate", "password": "secret"})
+    login = client.post("/login", json={"username": "rotate", "password": "secret"}).json
+    headers = {"Authorization": f"Bearer {login['refresh_token']}"}
+
+    assert client.post("/refresh", headers=headers).status_code == 200
+    response = client.post("/refresh", headers=headers)
+    assert response.status_code == 401
+    assert "Token has been revoked" in response.json["msg"]
+
+
+# test access tokens cannot refresh
+def test_refresh_rejects_access_token(client, auth_header):
+    response = client.post("/refresh", headers=auth_header)
+    assert response.status_code == 401
+
+
+# test logout revokes a refresh token
+def test_logout_revokes_refresh_token(client):
+    client.post("/register", json={"username": "leaver", "password": "secret"})
+    login = client.post("/login", json={"username": "leaver", "password": "secret"}).json
+    headers = {"Authorization": f"Bearer {login['refresh_token']}"}
+
+    assert client.post("/logout", headers=headers).status_code == 200
+    assert client.post("/refresh", headers=headers).status_code == 401
@@ -0,0 +1,100 @@
+import pytest
+
+from benchmarks.index_advisor import advise
+from benchmarks.run import build_app, run, compare, percentile
+from benchmarks.scenarios import missing_scenarios
+from benchmarks.seed import Scale
+
+
+TINY = Scale(stores=3, items=30, tags=6, links_per_item=2)
+
+
+@pytest.fixture(scope="module")
+def bench_app(tmp_path_factory):
+    return build_app(str(tmp_path_factory.mktemp("bench") / "bench.db"), TINY)
+
+
+def test_every_blueprint_route_has_a_scenario(bench_app):
+    """
+    GIVEN the registered API blueprints
+    WHEN the benchmark scenarios are matched against the url map
+    THEN no route is left unbenchmarked
+    """
+    assert missing_scenarios(bench_app) == []
+
+
+def test_run_reports_metrics_for_every_endpoint(bench_app):
+    """
+    GIVEN a tiny seeded db
+    WHEN the harness runs
+    THEN each endpoint reports latency percentiles, queries and peak memory without errors
+    """
+    results = run(bench_app, TINY, requests=2, memory_samples=1)
+    for name, metrics in results["endpoints"].items():
+        assert metrics["errors"] == 0, name
+        assert metrics["p50_ms"] <= metrics["p95_ms"] <= metrics["p99_ms"]
+        assert metrics["peak_kb"] > 0
+
+    assert compare(results, results, tolerance=0) == []
+
+
+def test_compare_flags_regressions():
+    """
+    GIVEN a baseline and a slower run with more queries
+    WHEN they are compared
+    THEN both regressions are reported, and changes within tolerance are not
+    """
+    metrics = {"p50_ms": 1.0, "p95_ms": 2.0, "p99_ms": 3.0, "queries": 2, "peak_kb": 10.0, "errors": 0}
+    baseline = {"scale": TINY.as_dict(), "endpoints": {"GET /item": metrics}}
+    slower = {
+        "scale": TINY.as_dict(),
+        "endpoints": {"GET /item": {**metrics, "p95_ms": 2.2, "p99_ms": 9.0, "queries": 3}},
+    }
+
+    regressions = compare(slower, baseline, tolerance=0.25)
+    assert regressions == ["GET /item: queries 2 -> 3", "GET /item: p99_ms 3.0 -> 9.0"]
+
+
+def test_percentile_nearest_rank():
+    samples = list(range(1, 101))
+    assert percentile(samples, 50) == 50
+    assert percentile(samples, 99) == 99
+    assert percentile([7], 95) == 7
+
+
+def test_index_advisor_finds_no_full_scans(bench_app):
+    """
+    GIVEN the models with their foreign key indexes
+    WHEN the index advisor replays every scenario
+    THEN no endpoint reads a whole table
+    """
+    assert advise(bench_app, TINY, requests=1) == {}
+
+
+def test_sqlite_writes_app_leaves_testing_config_alone(tmp_path):
+    """
+    GIVEN the write benchmark builds an app with its own pragma profile
+    WHEN the app is created
+    THEN the app uses the profile and TestingConfig keeps its own pragmas
+    """
+    from sqlalchemy import text
+
+    from app.config import TestingConfig
+    from app.db import db
+    from benchmarks.sqlite_writes import PROFILES, _make_app
+
+    before = TestingConfig.SQLITE_PRAGMAS
+    app = _make_app(str(tmp_path / "writes.db"), PROFILES["default"])
+    assert app.config["SQLITE_PRAGMAS"] == PROFILES["default"]
+    assert TestingConfig.SQLITE_PRAGMAS is before
+    assert "SQLITE_PRAGMAS" not in vars(TestingConfig)
+    with app.app_context():
+        assert db.session.execute(text("PRAGMA foreign_keys")).scalar() == 1
+
+
+def test_sqlite_writes_profiles_only_differ_in_performance_pragmas():
+    from benchmarks.sqlite_writes import PROFILES
+
+    for pragmas in PROFILES.values():
+        assert pragmas["foreign_keys"] == "ON"
+        assert "busy_timeout" in pragmas
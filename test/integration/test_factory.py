@@ -110,3 +110,18 @@ def test_testing_config_sets_jwt_secret_key():
     """
     app = create_app("testing")
     assert app.config["JWT_SECRET_KEY"] == "test_secret"
+
+
+@pytest.mark.parametrize(
+        "env, profile",
+        [("development", "threaded"), ("testing", "test"), ("production", "sync-worker")]
+)
+def test_pool_profile_per_config(env, profile):
+    """
+    GIVEN each config class
+    WHEN create_app is called
+    THEN its pool profile is selected
+    """
+    app = create_app(env)
+    assert app.config["SQLALCHEMY_POOL_PROFILE"] == profile
+    assert "SQLALCHEMY_ENGINE_OPTIONS" in app.config
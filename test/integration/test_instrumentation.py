@@ -0,0 +1,40 @@
+from app import create_app
+from app.models import StoreModel
+
+
+def test_response_reports_query_count_and_server_timing(client, session):
+    """
+    GIVEN a request that reads from the db
+    WHEN the response comes back
+    THEN it carries the statement count and db time headers
+    """
+    store = StoreModel(store_name="Store")
+    session.add(store)
+    session.commit()
+
+    response = client.get(f"/store/{store.store_id}")
+    assert response.status_code == 200
+    assert int(response.headers["X-Query-Count"]) >= 1
+    assert response.headers["Server-Timing"].startswith("db;dur=")
+
+
+def test_response_without_queries_reports_zero(client):
+    """
+    GIVEN a route that never touches the db
+    WHEN it is requested
+    THEN the query count header is 0
+    """
+    response = client.get("/")
+    assert response.headers["X-Query-Count"] == "0"
+
+
+def test_instrumentation_can_be_disabled(monkeypatch):
+    """
+    GIVEN SQL_INSTRUMENTATION is turned off
+    WHEN a request is served
+    THEN no query headers are added
+    """
+    monkeypatch.setattr("app.config.TestingConfig.SQL_INSTRUMENTATION", False, raising=False)
+    app = create_app("testing")
+    response = app.test_client().get("/")
+    assert "X-Query-Count" not in response.headers
@@ -0,0 +1,81 @@
+import pytest
+
+from app import create_app
+from app.db import db
+from app.models import StoreModel
+from app.routing import STICKY_COOKIE
+
+
+@pytest.fixture()
+def replica_app(tmp_path):
+    app = create_app(
+        "testing",
+        db_url=f"sqlite:///{tmp_path / 'primary.db'}",
+        replica_url=f"sqlite:///{tmp_path / 'replica.db'}",
+    )
+    replica = app.extensions["db_replica"]
+    with app.app_context():
+        db.create_all()
+        db.metadata.create_all(replica)
+        # rows differ between the two files, so each response shows which one served it
+        db.session.add(StoreModel(store_id=1, store_name="on primary"))
+        db.session.commit()
+        with replica.begin() as conn:
+            conn.execute(StoreModel.__table__.insert(), {"store_id": 1, "store_name": "on replica"})
+    return app
+
+
+def test_get_reads_from_replica(replica_app):
+    """
+    GIVEN a replica is configured
+    WHEN a client that never wrote sends a GET
+    THEN it is served from the replica
+    """
+    response = replica_app.test_client().get("/store/1")
+    assert response.json["store_name"] == "on replica"
+
+
+def test_writes_go_to_primary_and_client_sticks_to_it(replica_app):
+    """
+    GIVEN a replica is configured
+    WHEN a client writes
+    THEN the write lands on the primary and its next reads come from the primary
+    """
+    client = replica_app.test_client()
+    response = client.put("/store/1", json={"store_name": "renamed"})
+    assert response.status_code == 200
+    assert response.json["store_name"] == "renamed"
+    assert client.get_cookie(STICKY_COOKIE) is not None
+
+    assert client.get("/store/1").json["store_name"] == "renamed"
+
+    # a client without the cookie still reads the (lagging) replica
+    assert replica_app.test_client().get("/store/1").json["store_name"] == "on replica"
+
+
+def test_lagging_replica_is_not_cached_after_a_write(replica_app):
+    """
+    GIVEN a replica that has not caught up with a write yet
+    WHEN a client that did not write reads the row
+    THEN the replica's row is served but not cached, until the sticky window is over
+    """
+    replica_app.test_client().put("/store/1", json={"store_name": "renamed"})
+
+    reader = replica_app.test_client()
+    assert reader.get("/store/1").json["store_name"] == "on replica"
+    assert reader.get("/store/1").headers["X-Cache"] == "MISS"
+
+
+def test_sticky_window_expires(replica_app):
+    client = replica_app.test_client()
+    client.put("/store/1", json={"store_name": "renamed"})
+    client.set_cookie(STICKY_COOKIE, "0")
+    assert client.get("/store/1").json["store_name"] == "on replica"
+
+
+def test_without_replica_everything_uses_primary(client, session):
+    session.add(StoreModel(store_name="only one"))
+    session.commit()
+    response = client.get("/store")
+    assert response.json[0]["store_name"] == "only one"
+    assert "Set-Cookie" not in client.post("/store", json={"store_name": "x"}).headers
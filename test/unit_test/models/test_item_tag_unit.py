@@ -13,3 +13,17 @@ def test_constructor():
     assert isinstance(item_tag.item_id, int)
     assert item_tag.tag_id == 2
     assert isinstance(item_tag.tag_id, int)
+
+
+def test_primary_key_is_item_tag_pair():
+    """
+    GIVEN the ItemTagModel table
+    WHEN its primary key and indexes are inspected
+    THEN the key is (item_id, tag_id) with a reverse (tag_id, item_id) index
+    """
+    table = ItemTagModel.__table__
+    assert [column.name for column in table.primary_key] == ["item_id", "tag_id"]
+    assert "item_tag_id" not in table.c
+    assert [
+        [column.name for column in index.columns] for index in table.indexes
+    ] == [["tag_id", "item_id"]]
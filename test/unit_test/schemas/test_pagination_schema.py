@@ -0,0 +1,32 @@
+import pytest
+
+from marshmallow import ValidationError
+from app.pagination import encode_cursor, decode_cursor
+from app.schemas import CursorPageArgsSchema
+
+
+# test cursor round trip
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor(42)) == 42
+
+
+# test garbage cursor is rejected
+@pytest.mark.parametrize("cursor", ["", "abc", encode_cursor("42"), encode_cursor(-1), encode_cursor(2**63)])
+def test_decode_cursor_rejects_invalid_values(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+# test load decodes cursor into the key to resume after
+def test_cursor_page_args_schema_loads_cursor(app):
+    with app.test_request_context():
+        result = CursorPageArgsSchema().load({"limit": 10, "cursor": encode_cursor(7)})
+    assert result == {"limit": 10, "cursor": 7}
+
+
+# test limit must be positive
+def test_cursor_page_args_schema_rejects_zero_limit(app):
+    with app.test_request_context():
+        with pytest.raises(ValidationError) as err:
+            CursorPageArgsSchema().load({"limit": 0})
+    assert "limit" in err.value.messages
@@ -0,0 +1,58 @@
+import time
+
+from flask_jwt_extended import create_access_token, decode_token
+
+from app.auth_cache import TTLCache
+from app.models import UserModel
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_ttl_cache_entry_expires():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1, expires_at=time.time() - 1)
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_decoded_token_is_served_from_cache(session, monkeypatch):
+    user = UserModel(username="cached", password="x")
+    session.add(user)
+    session.commit()
+
+    calls = []
+    import flask_jwt_extended.jwt_manager as jwt_manager
+    real_decode = jwt_manager._decode_jwt
+    monkeypatch.setattr(jwt_manager, "_decode_jwt", lambda **kw: calls.append(1) or real_decode(**kw))
+
+    token = create_access_token(identity=str(user.user_id))
+    first, second = decode_token(token), decode_token(token)
+
+    assert first == second
+    assert len(calls) == 1
+
+
+def test_admin_flag_is_cached_and_invalidated_on_update(app, session):
+    user = UserModel(username="flag", password="x", is_admin=True)
+    session.add(user)
+    session.commit()
+
+    token = create_access_token(identity=str(user.user_id))
+    assert decode_token(token)["is_admin"] is True
+    assert app.extensions["admin_flag_cache"].get(str(user.user_id)) is True
+
+    user.is_admin = False
+    session.commit()
+    assert app.extensions["admin_flag_cache"].get(str(user.user_id)) is None
+
+    token = create_access_token(identity=str(user.user_id))
+    assert decode_token(token)["is_admin"] is False
@@ -0,0 +1,52 @@
+import time
+
+import pytest
+
+from app.blocklist import MemoryBlocklist, SQLiteBlocklist
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return MemoryBlocklist()
+    return SQLiteBlocklist(str(tmp_path / "blocklist.db"), cache_size=2)
+
+
+def test_added_jti_is_blocked(store):
+    store.add("jti-1", time.time() + 60)
+    assert "jti-1" in store
+    assert "jti-2" not in store
+
+
+def test_expired_jti_is_not_blocked(store):
+    store.add("jti-1", time.time() - 1)
+    assert "jti-1" not in store
+
+
+def test_expired_entries_are_purged(store):
+    store.add("old", time.time() - 1)
+    store._next_purge = 0
+    store.add("new", time.time() + 60)
+    assert len(store) == 1
+
+
+def test_sqlite_blocklist_is_shared_between_instances(tmp_path):
+    """
+    GIVEN two workers with their own SQLiteBlocklist on the same file
+    WHEN one of them revokes a token
+    THEN the other sees it on its next check
+    """
+    path = str(tmp_path / "blocklist.db")
+    worker_1, worker_2 = SQLiteBlocklist(path), SQLiteBlocklist(path)
+    assert "jti-1" not in worker_2
+
+    worker_1.add("jti-1", time.time() + 60)
+    assert "jti-1" in worker_2
+
+
+def test_sqlite_blocklist_front_cache_is_bounded(tmp_path):
+    store = SQLiteBlocklist(str(tmp_path / "blocklist.db"), cache_size=2)
+    for n in range(5):
+        store.add(f"jti-{n}", time.time() + 60)
+    assert len(store._cache) == 2
+    assert all(f"jti-{n}" in store for n in range(5))
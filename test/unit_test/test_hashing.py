@@ -0,0 +1,75 @@
+import pytest
+from flask import g
+from passlib.hash import pbkdf2_sha256
+
+from app.models import UserModel
+from app.hashing import PasswordHasher, PasswordHasherBusy
+
+
+def test_inline_hasher_round_trip(app):
+    hasher = PasswordHasher(workers=0)
+    with app.test_request_context():
+        hashed = hasher.hash("secret")
+        assert hasher.verify("secret", hashed)
+        assert not hasher.verify("wrong", hashed)
+    assert hasher.stats["calls"] == 3
+
+
+def test_inline_hasher_splits_wait_and_hash_time(app):
+    """
+    GIVEN an inline hasher, which never waits for a process
+    WHEN it hashes with enough rounds to take a while
+    THEN the time is reported as hash time, not as queue wait
+    """
+    hasher = PasswordHasher(workers=0, rounds=200000)
+    with app.test_request_context():
+        hasher.hash("secret")
+        (wait_ms, hash_ms), = g.hash_timing
+    assert wait_ms < 5
+    assert hash_ms > 10
+    assert hasher.stats["wait_max_ms"] == wait_ms
+
+
+def test_pool_hasher_round_trip(app):
+    hasher = PasswordHasher(workers=1, rounds=200000)
+    try:
+        with app.test_request_context():
+            hashed = hasher.hash("secret")
+            assert hasher.verify("secret", hashed)
+            timings = g.hash_timing
+    finally:
+        hasher.shutdown()
+    # the first call also waits for the process to start, the hash itself is timed apart
+    assert all(hash_ms > 10 for _, hash_ms in timings)
+    assert timings[1][0] < timings[1][1]
+    assert hasher.stats["wait_max_ms"] == max(wait_ms for wait_ms, _ in timings)
+
+
+def test_full_queue_rejects_immediately(app):
+    hasher = PasswordHasher(workers=0, max_queue=0)
+    hasher._slots.acquire()
+    with app.test_request_context():
+        with pytest.raises(PasswordHasherBusy):
+            hasher.hash("secret")
+    assert hasher.stats["rejected"] == 1
+
+
+def test_needs_rehash_compares_rounds():
+    hasher = PasswordHasher(rounds=1000)
+    assert not hasher.needs_rehash(pbkdf2_sha256.using(rounds=1000).hash("secret"))
+    assert hasher.needs_rehash(pbkdf2_sha256.using(rounds=2000).hash("secret"))
+    assert hasher.needs_rehash("plain-text")
+
+
+def test_hash_report_counts_users_per_parameters(app, session):
+    session.add_all([
+        UserModel(username="old-1", password=pbkdf2_sha256.using(rounds=1000).hash("x")),
+        UserModel(username="old-2", password=pbkdf2_sha256.using(rounds=1000).hash("x")),
+        UserModel(username="new", password=pbkdf2_sha256.using(rounds=app.config["PASSWORD_HASH_ROUNDS"]).hash("x")),
+    ])
+    session.commit()
+
+    result = app.test_cli_runner().invoke(args=["hash-report"])
+    assert result.exit_code == 0
+    assert "pbkdf2-sha256 rounds=1000: 2 users\n" in result.output
+    assert f"rounds={app.config['PASSWORD_HASH_ROUNDS']}: 1 users (target)" in result.output
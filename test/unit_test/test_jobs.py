@@ -0,0 +1,154 @@
+import threading
+import time
+
+import pytest
+from flask import Flask
+
+from app.db import db
+from app.jobs import HANDLERS, JobRunner, JobStore, job_handler
+
+
+@pytest.fixture
+def store(tmp_path):
+    return JobStore(str(tmp_path / "jobs.db"), stale_after=60, max_attempts=2)
+
+
+@pytest.fixture
+def echo_handler():
+    @job_handler("echo")
+    def echo(params, progress):
+        progress(1, 1)
+        return {"echo": params["value"]}
+
+    yield echo
+    HANDLERS.pop("echo")
+
+
+def test_claim_returns_oldest_queued_job_once(store):
+    """
+    GIVEN two queued jobs
+    WHEN workers claim jobs
+    THEN they get the oldest first and no job twice
+    """
+    first = store.enqueue("echo", {"value": 1})
+    second = store.enqueue("echo", {"value": 2})
+
+    assert store.claim("worker-a") == (first, "echo", {"value": 1})
+    assert store.claim("worker-b") == (second, "echo", {"value": 2})
+    assert store.claim("worker-c") is None
+    assert store.get(first)["status"] == "running"
+
+
+def test_stale_running_job_is_reclaimed_after_restart(store):
+    """
+    GIVEN a job claimed by a worker that stopped sending progress
+    WHEN another worker claims after stale_after seconds
+    THEN it gets the job, and the old worker can no longer update it
+    """
+    job_id = store.enqueue("echo", {"value": 1})
+    store.claim("dead-worker")
+    assert store.claim("worker-b") is None
+
+    store._connection().execute("UPDATE jobs SET heartbeat = ?", (time.time() - 120,))
+    assert store.claim("worker-b") == (job_id, "echo", {"value": 1})
+    assert store.finish(job_id, "dead-worker", {}) is False
+    assert store.finish(job_id, "worker-b", {"ok": True}) is True
+
+    job = store.get(job_id)
+    assert job["status"] == "succeeded"
+    assert job["result"] == {"ok": True}
+    assert job["attempts"] == 2
+
+
+def test_job_is_failed_after_max_attempts(store):
+    """
+    GIVEN a job that keeps losing its worker
+    WHEN it has been claimed max_attempts times
+    THEN it is marked failed instead of claimed again
+    """
+    job_id = store.enqueue("echo", {"value": 1})
+    for owner in ("a", "b"):
+        store.claim(owner)
+        store._connection().execute("UPDATE jobs SET heartbeat = ?", (time.time() - 120,))
+
+    assert store.claim("c") is None
+    assert store.get(job_id)["status"] == "failed"
+
+
+def test_runner_threads_run_submitted_jobs(store, echo_handler):
+    """
+    GIVEN a runner with one worker thread
+    WHEN a job is submitted
+    THEN the thread runs it and stores the result
+    """
+    runner = JobRunner(Flask(__name__), store, workers=1, poll_interval=0.05)
+    job_id = runner.submit("echo", value="hi")
+
+    deadline = time.time() + 5
+    while store.get(job_id)["status"] != "succeeded" and time.time() < deadline:
+        time.sleep(0.02)
+    job = store.get(job_id)
+    assert job["status"] == "succeeded"
+    assert job["result"] == {"echo": "hi"}
+    assert job["progress"] == {"done": 1, "total": 1}
+
+
+def test_running_job_without_progress_is_not_reclaimed(tmp_path):
+    """
+    GIVEN a handler that runs longer than stale_after without reporting progress
+    WHEN another worker claims meanwhile
+    THEN it gets nothing, the runner kept the heartbeat fresh
+    """
+    store = JobStore(str(tmp_path / "jobs.db"), stale_after=0.3)
+    started, release = threading.Event(), threading.Event()
+
+    @job_handler("slow")
+    def slow(params, progress):
+        started.set()
+        release.wait(5)
+        return {}
+
+    try:
+        runner = JobRunner(Flask(__name__), store, workers=0)
+        job_id = store.enqueue("slow", {})
+        worker = threading.Thread(target=runner.run_next, args=("worker-a",))
+        worker.start()
+        started.wait(5)
+        time.sleep(0.6)
+        assert store.claim("worker-b") is None
+        release.set()
+        worker.join()
+    finally:
+        HANDLERS.pop("slow")
+
+    job = store.get(job_id)
+    assert job["status"] == "succeeded"
+    assert job["attempts"] == 1
+
+
+def test_runner_records_handler_errors(store):
+    """
+    GIVEN a handler that raises
+    WHEN the job runs inline
+    THEN the job is failed with the error message
+    """
+    @job_handler("boom")
+    def boom(params, progress):
+        raise RuntimeError("no luck")
+
+    try:
+        app = Flask(__name__)
+        app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+        db.init_app(app)
+        job_id = JobRunner(app, store, workers=0).submit("boom")
+    finally:
+        HANDLERS.pop("boom")
+
+    job = store.get(job_id)
+    assert job["status"] == "failed"
+    assert job["error"] == "RuntimeError: no luck"
+
+
+def test_submit_unknown_kind_raises(store):
+    with pytest.raises(ValueError):
+        JobRunner(Flask(__name__), store, workers=0).submit("nope")
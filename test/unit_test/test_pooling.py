@@ -0,0 +1,38 @@
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.pooling import InstrumentedQueuePool, engine_options, pool_stats
+
+
+def test_engine_options_for_server_database():
+    options = engine_options("sync-worker", "postgresql+psycopg2://user:pass@db/app")
+    assert options["pool_size"] == 1
+    assert options["pool_pre_ping"] is True
+    assert options["poolclass"] is InstrumentedQueuePool
+
+
+def test_engine_options_for_sqlite_drop_queue_pool_settings():
+    options = engine_options("threaded", "sqlite:///data.db")
+    assert set(options) <= {"pool_pre_ping", "pool_recycle"}
+
+
+def test_unknown_profile_raises_value_error():
+    with pytest.raises(ValueError):
+        engine_options("nope", "sqlite://")
+
+
+def test_instrumented_pool_reports_checkouts_and_overflow(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}", poolclass=InstrumentedQueuePool, pool_size=1, max_overflow=1
+    )
+    with engine.connect() as first, engine.connect() as second:
+        first.execute(text("SELECT 1"))
+        second.execute(text("SELECT 1"))
+        stats = pool_stats(engine)
+        assert stats["checked_out"] == 2
+        assert stats["overflow"] == 1
+
+    stats = pool_stats(engine)
+    assert stats["checkouts"] == 2
+    assert stats["peak_checked_out"] == 2
+    assert stats["wait_max_ms"] >= 0
@@ -0,0 +1,298 @@
+import os
+import time
+
+from app import create_app
+from app.config import TestingConfig
+from app.db import db
+from app.models import ItemModel, StoreModel, TagModel
+from app.response_cache import (
+    EVERYTHING, MemoryResponseCache, MmapResponseCache, SQLiteResponseCache, _hash, dependencies
+)
+
+
+def test_memory_cache_evicts_least_recently_used_past_max_bytes():
+    cache = MemoryResponseCache(maxsize=10, max_bytes=8, ttl=60)
+    cache.set("a", b"1234", "application/json", set(), 0)
+    cache.set("b", b"1234", "application/json", set(), 0)
+    cache.get("a")
+    cache.set("c", b"1234", "application/json", set(), 0)
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+
+
+def test_memory_cache_entry_expires():
+    cache = MemoryResponseCache(ttl=0)
+    cache.set("a", b"{}", "application/json", set(), 0)
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_memory_cache_drops_entries_of_invalidated_dependencies_only():
+    cache = MemoryResponseCache()
+    cache.set("item", b"{}", "application/json", {"item_id:1", "store_id:1"}, 0)
+    cache.set("other", b"{}", "application/json", {"item_id:2", "store_id:2"}, 0)
+    cache.invalidate({"store_id:1"})
+    assert cache.get("item") is None
+    assert cache.get("other") is not None
+    cache.invalidate({EVERYTHING})
+    assert len(cache) == 0
+
+
+def test_response_read_before_a_write_is_not_cached():
+    """
+    GIVEN a response read before a concurrent write invalidated the cache
+    WHEN it is stored
+    THEN it is dropped, it may show the rows as they were before the write
+    """
+    cache = MemoryResponseCache()
+    generation = cache.generation
+    cache.invalidate({"item_id:1"})
+    cache.set("item", b"{}", "application/json", {"item_id:1"}, generation)
+    assert cache.get("item") is None
+
+
+def test_replica_read_is_not_cached_while_the_replica_may_lag(tmp_path):
+    """
+    GIVEN a cache allowing a replica to lag 0.05s and an invalidated dependency
+    WHEN a response showing it is stored
+    THEN it is refused if read from the replica within 0.05s, stored otherwise
+    """
+    caches = [
+        MemoryResponseCache(replica_lag=0.05),
+        SQLiteResponseCache(str(tmp_path / "responses.db"), replica_lag=0.05),
+        MmapResponseCache(str(tmp_path / "responses.mmap"), slots=8, slot_bytes=512, stamps=64, replica_lag=0.05),
+    ]
+    for cache in caches:
+        cache.invalidate({"item_id:1"})
+        cache.set("lagging", b"{}", "application/json", {"item_id:1"}, cache.generation, replica=True)
+        cache.set("other", b"{}", "application/json", {"item_id:2"}, cache.generation, replica=True)
+        cache.set("primary", b"{}", "application/json", {"item_id:1"}, cache.generation)
+        assert cache.get("lagging") is None
+        assert cache.get("other") is not None
+        assert cache.get("primary") is not None
+
+        time.sleep(0.06)
+        cache.set("lagging", b"{}", "application/json", {"item_id:1"}, cache.generation, replica=True)
+        assert cache.get("lagging") is not None
+
+
+def test_sqlite_cache_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "responses.db")
+    writer, reader = SQLiteResponseCache(path), SQLiteResponseCache(path)
+    writer.set("item", b"{}", "application/json", {"item_id:1"}, writer.generation)
+    assert reader.get("item") == (b"{}", "application/json")
+    reader.invalidate({"item_id:1"})
+    assert writer.get("item") is None
+
+
+def test_sqlite_cache_evicts_past_maxsize(tmp_path):
+    cache = SQLiteResponseCache(str(tmp_path / "responses.db"), maxsize=2)
+    for key in "abc":
+        cache.set(key, b"{}", "application/json", {f"item_id:{key}"}, cache.generation)
+        time.sleep(0.001)
+    assert len(cache) == 2
+    assert cache.get("a") is None
+
+
+def test_dependencies_of_a_body():
+    body = {"item_id": 1, "store": {"store_id": 2}, "tags": [{"tag_id": 3}, {"tag_id": 4}]}
+    assert dependencies(body) == {"item_id:1", "store_id:2", "tag_id:3", "tag_id:4"}
+
+
+def _catalog(session):
+    store = StoreModel(store_name="Cached")
+    session.add(store)
+    session.commit()
+    item = ItemModel(item_name="Lamp", item_price=10.0, store_id=store.store_id)
+    tag = TagModel(tag_name="Light", store_id=store.store_id)
+    session.add_all([item, tag])
+    session.commit()
+    return store.store_id, item.item_id, tag.tag_id
+
+
+def test_get_is_served_from_cache(client, session):
+    _, item_id, _ = _catalog(session)
+    first = client.get(f"/item/{item_id}")
+    second = client.get(f"/item/{item_id}")
+    assert first.headers["X-Cache"] == "MISS"
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.headers["X-Query-Count"] == "0"
+    assert second.json == first.json
+
+
+def test_write_invalidates_every_response_showing_the_row(client, session):
+    """
+    GIVEN cached responses of a store, its item and its tag
+    WHEN the store is renamed
+    THEN all three show the new name
+    """
+    store_id, item_id, tag_id = _catalog(session)
+    paths = [f"/store/{store_id}", f"/item/{item_id}", f"/tag/{tag_id}"]
+    for path in paths:
+        client.get(path)
+
+    client.put(f"/store/{store_id}", json={"store_name": "Renamed"})
+
+    assert client.get(paths[0]).json["store_name"] == "Renamed"
+    assert client.get(paths[1]).json["store"]["store_name"] == "Renamed"
+    assert client.get(paths[2]).json["store"]["store_name"] == "Renamed"
+
+
+def test_unrelated_write_keeps_the_cache(client, session):
+    store_id, item_id, _ = _catalog(session)
+    client.get(f"/item/{item_id}")
+    session.add(StoreModel(store_name="Elsewhere"))
+    session.commit()
+    assert client.get(f"/item/{item_id}").headers["X-Cache"] == "HIT"
+
+
+def test_link_invalidates_item_and_tag(client, session):
+    _, item_id, tag_id = _catalog(session)
+    client.get(f"/item/{item_id}")
+    client.get(f"/tag/{tag_id}")
+
+    client.post(f"/item/{item_id}/tag/{tag_id}")
+
+    assert [tag["tag_id"] for tag in client.get(f"/item/{item_id}").json["tags"]] == [tag_id]
+    assert [item["item_id"] for item in client.get(f"/tag/{tag_id}").json["items"]] == [item_id]
+
+
+def test_new_item_invalidates_its_store(client, session, auth_header):
+    store_id, _, _ = _catalog(session)
+    client.get(f"/store/{store_id}")
+    client.post("/item", json={"item_name": "Desk", "item_price": 5.0, "store_id": store_id}, headers=auth_header)
+    assert len(client.get(f"/store/{store_id}").json["items"]) == 2
+
+
+def test_bulk_write_invalidates_everything(client, session, auth_header):
+    store_id, item_id, _ = _catalog(session)
+    client.get(f"/item/{item_id}")
+    client.put(
+        "/item",
+        json=[{"item_id": item_id, "item_name": "Lamp", "item_price": 99.0, "store_id": store_id}],
+        headers=auth_header,
+    )
+    assert client.get(f"/item/{item_id}").json["item_price"] == 99.0
+
+
+def test_deleted_row_is_not_served(client, session):
+    _, item_id, _ = _catalog(session)
+    client.get(f"/item/{item_id}")
+    client.delete(f"/item/{item_id}")
+    assert client.get(f"/item/{item_id}").status_code == 404
+
+
+def test_mmap_cache_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "responses.mmap")
+    writer = MmapResponseCache(path, slots=8, slot_bytes=512, stamps=64)
+    reader = MmapResponseCache(path, slots=8, slot_bytes=512, stamps=64)
+    writer.set("item", b"{}", "application/json", {"item_id:1"}, writer.generation)
+    assert reader.get("item") == (b"{}", "application/json")
+
+    reader.invalidate({"item_id:2"})
+    assert writer.get("item") is not None
+    reader.invalidate({"item_id:1"})
+    assert writer.get("item") is None
+
+
+def test_mmap_cache_epoch_invalidates_everything(tmp_path):
+    cache = MmapResponseCache(str(tmp_path / "responses.mmap"), slots=8, slot_bytes=512, stamps=64)
+    for key in "ab":
+        cache.set(key, b"{}", "application/json", set(), cache.generation)
+    cache.invalidate({EVERYTHING})
+    assert len(cache) == 0
+
+
+def test_mmap_cache_evicts_oldest_slot_of_a_full_bucket(tmp_path):
+    cache = MmapResponseCache(str(tmp_path / "responses.mmap"), slots=4, slot_bytes=512, stamps=64)
+    for n in range(5):
+        cache.set(f"key-{n}", b"{}", "application/json", set(), cache.generation)
+    assert len(cache) == 4
+    assert cache.get("key-0") is None
+    assert cache.get("key-4") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_mmap_cache_skips_responses_larger_than_a_slot(tmp_path):
+    cache = MmapResponseCache(str(tmp_path / "responses.mmap"), slots=4, slot_bytes=128, stamps=64)
+    cache.set("big", b"x" * 128, "application/json", set(), cache.generation)
+    assert cache.get("big") is None
+
+
+def test_mmap_cache_recovers_a_slot_left_mid_write(tmp_path):
+    """
+    GIVEN a slot whose writer was killed mid-write, leaving an odd sequence number
+    WHEN the key is stored again
+    THEN the slot ends up readable with an even sequence number
+    """
+    cache = MmapResponseCache(str(tmp_path / "responses.mmap"), slots=4, slot_bytes=512, stamps=64)
+    cache.set("item", b"old", "application/json", set(), cache.generation)
+    # the written slot of the key's bucket, its sequence number left odd like a crash would
+    offset = next(
+        offset for offset in cache._bucket(_hash("item"))[1] if cache.STAMP.unpack_from(cache._mm, offset)[0]
+    )
+    cache.STAMP.pack_into(cache._mm, offset, 5)
+    assert cache.get("item") is None
+
+    for body in (b"new", b"newer"):
+        cache.set("item", body, "application/json", set(), cache.generation)
+        assert cache.STAMP.unpack_from(cache._mm, offset)[0] % 2 == 0
+        assert cache.get("item") == (body, "application/json")
+
+
+def test_mmap_cache_stores_before_any_read(tmp_path):
+    cache = MmapResponseCache(str(tmp_path / "responses.mmap"), slots=4, slot_bytes=512, stamps=64)
+    cache.set("item", b"{}", "application/json", {"item_id:1"}, 0)
+    assert cache.get("item") == (b"{}", "application/json")
+
+
+def test_mmap_cache_slot_with_torn_lengths_is_a_miss(tmp_path):
+    """
+    GIVEN a slot whose header lengths read past the end of the slot, like a read torn by a writer
+    WHEN the key is read
+    THEN it is a miss instead of an error
+    """
+    cache = MmapResponseCache(str(tmp_path / "responses.mmap"), slots=4, slot_bytes=512, stamps=64)
+    cache.set("item", b"{}", "application/json", {"item_id:1"}, cache.generation)
+    offset = next(
+        offset for offset in cache._bucket(_hash("item"))[1] if cache.STAMP.unpack_from(cache._mm, offset)[0]
+    )
+    fields = list(cache.SLOT.unpack_from(cache._mm, offset))
+    fields[7] = 0xFFFF
+    cache.SLOT.pack_into(cache._mm, offset, *fields)
+    assert cache.get("item") is None
+
+
+def test_mmap_cache_counters_cover_forked_workers(tmp_path):
+    """
+    GIVEN a cache created before a fork, like gunicorn --preload
+    WHEN the child process reads an entry the parent stored
+    THEN it hits, and its hit shows up in the parent's stats
+    """
+    cache = MmapResponseCache(str(tmp_path / "responses.mmap"), slots=8, slot_bytes=512, stamps=64)
+    cache.set("item", b"{}", "application/json", set(), cache.generation)
+
+    pid = os.fork()
+    if pid == 0:
+        os._exit(0 if cache.get("item") is not None else 1)
+    _, status = os.waitpid(pid, 0)
+
+    assert os.waitstatus_to_exitcode(status) == 0
+    assert cache.stats()["hits"] == 1
+
+
+def test_app_serves_from_mmap_backend(tmp_path, monkeypatch):
+    monkeypatch.setattr(TestingConfig, "RESPONSE_CACHE_BACKEND", "mmap", raising=False)
+    monkeypatch.setattr(TestingConfig, "RESPONSE_CACHE_MMAP_PATH", str(tmp_path / "responses.mmap"), raising=False)
+    app = create_app("testing")
+    client = app.test_client()
+    with app.app_context():
+        db.create_all()
+        db.session.add(StoreModel(store_name="Mapped"))
+        db.session.commit()
+
+    assert client.get("/store/1").headers["X-Cache"] == "MISS"
+    assert client.get("/store/1").headers["X-Cache"] == "HIT"
+    client.put("/store/1", json={"store_name": "Remapped"})
+    assert client.get("/store/1").json["store_name"] == "Remapped"
@@ -0,0 +1,21 @@
+from sqlalchemy import text
+
+from app import create_app
+from app.db import db
+
+
+def test_pragmas_are_applied_to_sqlite_connections(tmp_path):
+    app = create_app("testing", db_url=f"sqlite:///{tmp_path / 'tuned.db'}")
+    with app.app_context():
+        conn = db.session.connection()
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert conn.execute(text("PRAGMA foreign_keys")).scalar() == 1
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == app.config["SQLITE_PRAGMAS"]["busy_timeout"]
+
+
+def test_pragmas_can_be_turned_off(tmp_path, monkeypatch):
+    monkeypatch.setattr("app.config.TestingConfig.SQLITE_PRAGMAS", {})
+    app = create_app("testing", db_url=f"sqlite:///{tmp_path / 'plain.db'}")
+    with app.app_context():
+        assert db.session.connection().execute(text("PRAGMA journal_mode")).scalar() == "delete"